@@ -3,10 +3,17 @@ import time
 import math
 import logging
 import os
-from .bot import GridTradingBot, logger 
+from .bot import GridTradingBot, logger, POSITION_LIMIT
 from .avellaneda_utils import auto_calculate_params
 from dotenv import load_dotenv
 from .ucb_manager import UCBManager
+from .contextual_bandit import LinUCBManager, context_vector
+from .intensity_estimator import IntensityEstimator
+from .trade_tape import TradeTape
+from .loop_monitor import install_fast_event_loop
+from .rest_transport import request_class
+from .risk_guard import RiskGuard
+from .quote_ladder import build_ladder
 
 load_dotenv()
 
@@ -19,6 +26,15 @@ LAYER_SPREAD = 0.0005     # 0.05% (Outer Entry)
 TP_SPREAD = 0.0002        # 0.02% (Inner TP - Priority Close)
 STOP_LOSS_SPREAD = 0.002  # 0.2% (Dynamic Baseline)
 MAX_ENTRY_SPREAD = 0.0005 # 0.05% Max
+INTENSITY_FIT_INTERVAL = 1.0 # Refit order-arrival intensity (eta) at most every 1s
+OFI_WINDOW = 5            # Order-flow imbalance window (s)
+OFI_SKEW = 0.0002         # Max reserve shift at full imbalance (0.02%)
+OFI_MIN_TRADES = 10       # Ignore OFI on a thin tape
+QUEUE_JOIN_LIMIT = 50     # Queue (x our size) above which we step one tick ahead
+TP_REFRESH_MIN_INTERVAL = 2.0 # Min gap between fill-driven TP refreshes of one side (s)
+UCB_SHADOW = True         # Score every UCB arm each interval on virtual quotes (shadow_arms.py)
+BANDIT_MODE = "linucb"    # Gamma selection: "ucb1" (context-free) or "linucb" (conditioned on sigma / RSI / funding)
+MARKET_DATA_URLS = []     # Extra public feeds raced against the primary WS (e.g. [WEBSOCKET_URL])
 
 API_KEY = os.getenv("GATEIO_TESTNET_KEY")
 API_SECRET = os.getenv("GATEIO_TESTNET_SECRET")
@@ -39,9 +55,11 @@ class AvellanedaGridBot(GridTradingBot):
     def __init__(self, api_key, api_secret, coin_name, grid_spacing, initial_quantity, leverage, 
                  take_profit_spacing=None, gamma=AVE_GAMMA, eta=0.0, sigma=0.0, T_end=AVE_T_END,
                  trend_alpha=0.0, funding_rate=0.0, taker_fee_rate=0.0005, testnet=False,
-                 order_layers=ORDER_LAYERS, layer_spread=LAYER_SPREAD):
+                 order_layers=ORDER_LAYERS, layer_spread=LAYER_SPREAD, market_data_urls=None,
+                 market_data_hub=None, account_name="default"):
         
-        super().__init__(api_key, api_secret, coin_name, grid_spacing, initial_quantity, leverage, take_profit_spacing, testnet=testnet)
+        super().__init__(api_key, api_secret, coin_name, grid_spacing, initial_quantity, leverage, take_profit_spacing, testnet=testnet,
+                         market_data_urls=market_data_urls, market_data_hub=market_data_hub, account_name=account_name)
         
         self.gamma = gamma          
         self.eta = eta              
@@ -54,21 +72,38 @@ class AvellanedaGridBot(GridTradingBot):
         self.high_1m = 0.0
         self.low_1m = 0.0
         self.rsi_val = 50.0
+        self.intensity = IntensityEstimator() # Live eta from the public trade tape
+        self.trade_tape = TradeTape()         # Rolling order-flow features
         
         # [NEW] UCB Attributes
-        self.ucb_manager = UCBManager()
+        self.ucb_manager = LinUCBManager() if BANDIT_MODE == "linucb" else UCBManager()
+        self.bandit_context = None # Context the current arm was selected under
         self.last_equity = 0.0
+        self.last_pnl = 0.0
         
         self.order_layers = order_layers
         self.layer_spread = layer_spread
         self.tp_spread = TP_SPREAD # Is 0.0002 (Inner)
         self.sl_spread = STOP_LOSS_SPREAD
+        self.sl_floor = STOP_LOSS_SPREAD
+        self.max_entry_spread = MAX_ENTRY_SPREAD
+        self.position_limit = POSITION_LIMIT # Per side, contracts (caps the entry ladder)
+        self.risk_guard = RiskGuard()
         self.dynamic_refresh_time = 10 # Default 10s Baseline
+        self.tp_pending = {}        # side -> time of a fill its TP hasn't caught up with
+        self.tp_refreshed_at = {'long': 0.0, 'short': 0.0}
         self.inventory = 0          
         self.best_bid = 0           
         self.best_ask = 0           
+        self.reserve_price = 0.0
+        self.last_ofi = 0.0
         
-        logger.info(f"Avellaneda Strategic Bot (FR+RSI+Trend+UCB). Layers={order_layers}, MaxSpread={MAX_ENTRY_SPREAD}")
+        self.shadow_arms = None
+        if UCB_SHADOW:
+            from .shadow_arms import ShadowArms # Imported here: shadow_arms builds on this module
+            self.shadow_arms = ShadowArms(self, self.ucb_manager.arms)
+        
+        logger.info(f"Avellaneda Strategic Bot (FR+RSI+Trend+UCB). Layers={order_layers}, MaxSpread={self.max_entry_spread}")
 
     async def _get_total_equity(self):
         """Helper to estimate Total Equity (Balance + Unlimited PnL)"""
@@ -92,6 +127,8 @@ class AvellanedaGridBot(GridTradingBot):
         # Initial wait to let bot start and equity settle
         await asyncio.sleep(10)
         self.last_equity = await self._get_total_equity()
+        self.last_pnl = self.pnl.net_pnl
+        self.bandit_context = context_vector(self.sigma, self.rsi_val, self.funding_rate)
         logger.info(f"[UCB] Initial Equity Baseline: {self.last_equity:.4f}")
 
         while True:
@@ -99,47 +136,113 @@ class AvellanedaGridBot(GridTradingBot):
                 await asyncio.sleep(interval)
                 loop = asyncio.get_running_loop()
                 
-                # 1. Calculate Reward (Change in Equity)
+                # 1. Calculate Reward (Change in fill-based Net PnL, fees included)
                 current_equity = await self._get_total_equity()
-                reward = current_equity - self.last_equity
-                
-                # 2. Update UCB Manager
-                self.ucb_manager.update(reward)
-                
-                # 3. Select New Gamma
-                self.gamma = self.ucb_manager.select_arm()
-                self.last_equity = current_equity
+                if self.latest_price: self.pnl.mark(self.latest_price)
+                current_pnl = self.pnl.net_pnl
+                reward = current_pnl - self.last_pnl
                 
-                logger.info(f"[UCB] Interval Result: Reward={reward:.4f} | New Gamma={self.gamma}")
+                # 2. Update the bandit under the context the arm was selected for: the traded arm
+                #    from the real PnL change, the others from their shadow copies when enabled
+                traded_arm = self.ucb_manager.current_arm
+                shadow_rewards = self.shadow_arms.collect(self.latest_price) if self.shadow_arms else {}
+                arm_rewards = {**shadow_rewards, traded_arm: reward}
+                if traded_arm in shadow_rewards:
+                    logger.info(f"[Shadow] Gamma={traded_arm} real {reward:.4f} vs shadow {shadow_rewards[traded_arm]:.4f} "
+                                f"(bias {shadow_rewards[traded_arm] - reward:+.4f})")
+                if shadow_rewards: self.ucb_manager.update_many(arm_rewards, self.bandit_context)
+                else: self.ucb_manager.update(reward, context=self.bandit_context)
+                if self.recorder:
+                    for arm, arm_reward in arm_rewards.items():
+                        self.recorder.record("ucb", ts=time.time(), arm=arm, reward=arm_reward,
+                                             count=self.ucb_manager.counts[arm], value=self.ucb_manager.values[arm],
+                                             selected=arm == traded_arm, shadow=self.shadow_arms is not None,
+                                             sigma=self.sigma, rsi=self.rsi_val, funding_rate=self.funding_rate,
+                                             shadow_reward=shadow_rewards.get(arm))
+                self._journal("ucb", self.ucb_manager.to_dict())
 
-                # 4. Standard Param Update
+                # 3. Standard Param Update
                 new_sigma, new_eta, new_alpha, new_funding, new_rsi, new_h, new_l = await loop.run_in_executor(
                     None, auto_calculate_params, self.coin_name, self.taker_fee_rate
                 )
                 self.sigma = new_sigma
-                self.eta = new_eta
+                if not self.intensity.ready:
+                    self.eta = new_eta # Fallback until the tape fit is live
                 self.trend_alpha = new_alpha 
                 self.funding_rate = new_funding
                 self.rsi_val = new_rsi
                 self.high_1m = new_h
                 self.low_1m = new_l
                 
+                # 4. Select New Gamma for the fresh context
+                self.bandit_context = context_vector(self.sigma, self.rsi_val, self.funding_rate)
+                self.gamma = self.ucb_manager.select_arm(self.bandit_context)
+                self.last_equity = current_equity
+                self.last_pnl = current_pnl
+                
+                logger.info(f"[UCB] Interval Result: Reward={reward:.4f} | New Gamma={self.gamma}")
+                
                 # 5. Dynamic Parameter Adjustment (New)
                 self._calculate_dynamic_params()
+                self._journal("params", self._param_state())
                 
-                logger.info(f"Brain Update: Sigma={self.sigma:.4f}, RSI={self.rsi_val:.1f}, FR={self.funding_rate:.6f}")
+                logger.info(f"Brain Update: Sigma={self.sigma:.4f}, Eta={self.eta:.2f}, RSI={self.rsi_val:.1f}, FR={self.funding_rate:.6f}")
                 logger.info(f"Dynamic Params: SL={self.sl_spread:.2%}, Refresh={self.dynamic_refresh_time}s")
+                tape = self.trade_tape.features(self.trade_tape.exchange_time(time.time()))
+                logger.info("Tape: " + " | ".join(f"{w}s OFI={f['ofi']:+.2f} Rate={f['trade_rate']:.1f}/s" for w, f in tape.items()))
             except Exception as e:
                 logger.error(f"Brain Update Fail: {e}")
                 await asyncio.sleep(60) 
 
+    # ---------- State Journal ----------
+    JOURNAL_PARAMS = ("gamma", "eta", "sigma", "trend_alpha", "funding_rate", "rsi_val",
+                      "high_1m", "low_1m", "sl_spread", "dynamic_refresh_time")
+
+    def _param_state(self):
+        return {k: getattr(self, k) for k in self.JOURNAL_PARAMS}
+
+    def _load_params(self, params):
+        # Stale market params are worse than the fresh ones main() just computed
+        if not self.journal_fresh: return
+        for k in self.JOURNAL_PARAMS:
+            if k in params: setattr(self, k, params[k])
+
+    def _journal_state(self):
+        state = super()._journal_state()
+        state["ucb"] = self.ucb_manager.to_dict()
+        state["params"] = self._param_state()
+        return state
+
+    def _restore_state(self, state):
+        super()._restore_state(state)
+        if "ucb" in state: self.ucb_manager.load_dict(state["ucb"])
+        if "params" in state: self._load_params(state["params"])
+
+    def _replay_event(self, kind, data):
+        if kind == "ucb": self.ucb_manager.load_dict(data)
+        elif kind == "params": self._load_params(data)
+        else: super()._replay_event(kind, data)
+
+    def on_public_trade(self, ts, price, size):
+        if self.best_bid_price and self.best_ask_price:
+            mid = (self.best_bid_price + self.best_ask_price) * 0.5
+        else:
+            mid = self.latest_price
+        self.intensity.add(ts, price, mid)
+        self.trade_tape.add(ts, size, time.time())
+        if self.shadow_arms: self.shadow_arms.on_trade(price, size)
+
+        if ts - self.intensity.last_fit >= INTENSITY_FIT_INTERVAL:
+            k = self.intensity.fit(ts)
+            if k: self.eta = k
+
     def _calculate_dynamic_params(self):
         """Calculate Dynamic Stop Loss and Refresh Time based on Volatility (Sigma)"""
         # Dynamic Stop Loss
         # Formula: SL = Sigma * 0.5 (Clamped 0.2% - 1.0%)
         # Logic: High Vol -> Wider SL (avoid wicks). Low Vol -> Tight SL (scalp).
         target_sl = self.sigma * 0.5
-        self.sl_spread = max(0.002, min(target_sl, 0.01))
+        self.sl_spread = max(self.sl_floor, min(target_sl, 0.01))
         
         # Dynamic Refresh Time
         # Formula: High Vol (>1%) -> 10s. Low Vol -> 30s.
@@ -179,7 +282,15 @@ class AvellanedaGridBot(GridTradingBot):
         # Trend Alpha Impact (5m Trend)
         trend_impact = self.trend_alpha * 2.0 
         
-        self.reserve_price = price + trend_impact + rsi_bias - inv_term
+        # --- STRATEGY 3: Order Flow Imbalance (Trade Tape) ---
+        # Net taker buying => Bias Up, net taker selling => Bias Down
+        tape = self.trade_tape.features(self.trade_tape.exchange_time(time.time()))[OFI_WINDOW]
+        ofi_bias = 0
+        self.last_ofi = tape["ofi"] if tape["count"] >= OFI_MIN_TRADES else 0.0
+        if tape["count"] >= OFI_MIN_TRADES:
+             ofi_bias = price * OFI_SKEW * tape["ofi"]
+        
+        self.reserve_price = price + trend_impact + rsi_bias + ofi_bias - inv_term
 
         try:
             term1 = 0.5 * self.gamma * (self.sigma**2) * T
@@ -195,7 +306,7 @@ class AvellanedaGridBot(GridTradingBot):
                  delta_price = delta_pct * price
 
             # SAFETY CLAMP (0.02% Limit)
-            max_allowed_delta = price * MAX_ENTRY_SPREAD
+            max_allowed_delta = price * self.max_entry_spread
             delta_price = min(delta_price, max_allowed_delta)
 
             min_delta = price * 0.0001
@@ -210,73 +321,132 @@ class AvellanedaGridBot(GridTradingBot):
     def update_mid_price(self, side, price):
         self._calculate_avellaneda_prices(price)
 
-    async def _long_mindset_logic(self, latest_price):
-        """Long Mindset"""
-        if self.long_position > 0:
-            # Use Dynamic SL Spread
-            sl_price = self.long_entry_price * (1 - self.sl_spread)
-            if latest_price < sl_price:
-                logger.warning(f"[LONG] STOP LOSS: {latest_price} < {sl_price} (SL={self.sl_spread:.2%})")
-                await self.place_order('sell', latest_price*0.99, self.long_position, True, 'long')
-                return 
-
-        await self.cancel_orders_for_side('long', for_tp=False)
-        
-        # 1. Maker Guard (0.01% - Covers Fees)
+    def _queue_aware_price(self, side, price, latest_price):
+        """Step one tick inside a deep queue if the book is synced and we stay a maker."""
+        book = self.order_book
+        if not book.synced or self.tick_size <= 0: return price
+        tick = self.tick_size
         min_dist = latest_price * 0.0001
-        safe_bid = min(self.best_bid, latest_price - min_dist)
-        
-        # 2. Tunnel Clamp (Ensure Bid is not too low)
-        min_allowed_bid = latest_price * (1 - MAX_ENTRY_SPREAD)
-        safe_bid = max(safe_bid, min_allowed_bid)
-        
-        base_bid = safe_bid
-        for i in range(self.order_layers):
-            p = base_bid * (1 - i * self.layer_spread)
-            if p <= 0: continue 
-            await self.place_order('buy', p, self.long_initial_quantity, False, 'long')
-
-        await self.cancel_orders_for_side('long', for_tp=True)
-        if self.long_position > 0:
-            target_tp = self.long_entry_price * (1 + self.tp_spread)
-            maker_tp = max(target_tp, latest_price * 1.0005)
-            await self.place_order('sell', maker_tp, self.long_position, True, 'long')
 
-    async def _short_mindset_logic(self, latest_price):
-        """Short Mindset"""
-        if self.short_position > 0:
-            # Use Dynamic SL Spread
-            sl_price = self.short_entry_price * (1 + self.sl_spread)
-            if latest_price > sl_price:
-                logger.warning(f"[SHORT] STOP LOSS: {latest_price} > {sl_price} (SL={self.sl_spread:.2%})")
-                await self.place_order('buy', latest_price*1.01, self.short_position, True, 'short')
-                return 
-
-        await self.cancel_orders_for_side('short', for_tp=False)
-        
+        if side == 'buy':
+            level = math.floor(price / tick + 1e-9) * tick
+            level = round(level, self.price_precision)
+            if book.depth_at('buy', level) <= QUEUE_JOIN_LIMIT * self.long_initial_quantity: return price
+            improved = round(level + tick, self.price_precision)
+            best_ask = book.best_ask()
+            if improved > latest_price - min_dist or (best_ask and improved >= best_ask): return price
+        else:
+            level = math.ceil(price / tick - 1e-9) * tick
+            level = round(level, self.price_precision)
+            if book.depth_at('sell', level) <= QUEUE_JOIN_LIMIT * self.short_initial_quantity: return price
+            improved = round(level - tick, self.price_precision)
+            best_bid = book.best_bid()
+            if improved < latest_price + min_dist or (best_bid and improved <= best_bid): return price
+        return improved
+
+    def on_market_tick(self):
+        # Long exits at the bid, short exits at the ask
+        self._risk_check('long', self.best_bid_price or self.latest_price)
+        self._risk_check('short', self.best_ask_price or self.latest_price)
+        if self.shadow_arms: self.shadow_arms.on_tick(self.latest_price, time.time())
+
+    def _strategy_state(self):
+        return self.reserve_price, self.gamma, self.sigma
+
+    def _strategy_report_lines(self):
+        if not self.shadow_arms: return []
+        return ["\n  Shadow Arms (UCB):"] + self.shadow_arms.report_lines()
+
+    def _risk_check(self, side, price):
+        """Fires the stop exit if hit; True while new entries on this side are blocked."""
+        now = time.time()
+        if side == 'long':
+            fire = self.risk_guard.check('long', self.long_position, self.long_entry_price, price, self.sl_spread, now)
+        else:
+            fire = self.risk_guard.check('short', self.short_position, self.short_entry_price, price, self.sl_spread, now)
+        if fire:
+            asyncio.create_task(self._stop_loss_exit(side, price))
+        return self.risk_guard.entries_blocked(side, now)
+
+    async def _stop_loss_exit(self, side, price):
+        # Exit first (highest priority), then pull this side's resting entries
+        try:
+            if side == 'long':
+                logger.warning(f"[LONG] STOP LOSS: {price} < {self.long_entry_price * (1 - self.sl_spread)} (SL={self.sl_spread:.2%})")
+                await self.place_order('sell', price*0.99, self.long_position, True, 'long')
+            else:
+                logger.warning(f"[SHORT] STOP LOSS: {price} > {self.short_entry_price * (1 + self.sl_spread)} (SL={self.sl_spread:.2%})")
+                await self.place_order('buy', price*1.01, self.short_position, True, 'short')
+            await self.cancel_orders_for_side(side, for_tp=False)
+        except Exception as e:
+            logger.error(f"Stop Loss Exit Error ({side}): {e}")
+
+    def _entry_ladder(self, side, latest_price):
+        """Entry ladder for one side as (prices, sizes) arrays (pure pricing, shared with the offline simulators)."""
         # 1. Maker Guard (0.01% - Covers Fees)
         min_dist = latest_price * 0.0001
+        if side == 'long':
+            safe_bid = min(self.best_bid, latest_price - min_dist)
+            
+            # 2. Tunnel Clamp (Ensure Bid is not too low)
+            min_allowed_bid = latest_price * (1 - self.max_entry_spread)
+            safe_bid = max(safe_bid, min_allowed_bid)
+            
+            # 3. Queue Awareness (L2 Book)
+            base = self._queue_aware_price('buy', safe_bid, latest_price)
+            return build_ladder('buy', base, self.order_layers, self.layer_spread, self.tick_size,
+                                self.long_initial_quantity, self.inventory, self.long_position,
+                                self.position_limit, self.gamma, self.sigma, bound=min_allowed_bid)
         safe_ask = max(self.best_ask, latest_price + min_dist)
         
         # 2. Tunnel Clamp (Ensure Ask is not too high)
-        max_allowed_ask = latest_price * (1 + MAX_ENTRY_SPREAD)
+        max_allowed_ask = latest_price * (1 + self.max_entry_spread)
         safe_ask = min(safe_ask, max_allowed_ask)
         
-        base_ask = safe_ask
-        for i in range(self.order_layers):
-            p = base_ask * (1 + i * self.layer_spread)
-            if p <= 0: continue
-            await self.place_order('sell', p, self.short_initial_quantity, False, 'short')
-
-        await self.cancel_orders_for_side('short', for_tp=True)
-        if self.short_position > 0:
-            target_tp = self.short_entry_price * (1 - self.tp_spread)
-            maker_tp = min(target_tp, latest_price * 0.9995)
-            await self.place_order('buy', maker_tp, self.short_position, True, 'short')
+        # 3. Queue Awareness (L2 Book)
+        base = self._queue_aware_price('sell', safe_ask, latest_price)
+        return build_ladder('sell', base, self.order_layers, self.layer_spread, self.tick_size,
+                            self.short_initial_quantity, self.inventory, self.short_position,
+                            self.position_limit, self.gamma, self.sigma, bound=max_allowed_ask)
+
+    def _tp_price(self, side, latest_price):
+        if side == 'long':
+            target_tp = self.long_entry_price * (1 + self.tp_spread)
+            return max(target_tp, latest_price * 1.0005)
+        target_tp = self.short_entry_price * (1 - self.tp_spread)
+        return min(target_tp, latest_price * 0.9995)
+
+    async def _long_mindset_logic(self, latest_price):
+        """Long Mindset"""
+        # Stop Loss (Dynamic SL Spread) lives in the per-tick Risk Guard
+        if self._risk_check('long', latest_price): return
+
+        prices, sizes = self._entry_ladder('long', latest_price)
+        await self.requote_side('long', False, [('buy', p, q, False, 'long') for p, q in zip(prices.tolist(), sizes.tolist())])
+        await self._requote_tp('long', latest_price)
+
+    async def _short_mindset_logic(self, latest_price):
+        """Short Mindset"""
+        # Stop Loss (Dynamic SL Spread) lives in the per-tick Risk Guard
+        if self._risk_check('short', latest_price): return
+
+        prices, sizes = self._entry_ladder('short', latest_price)
+        await self.requote_side('short', False, [('sell', p, q, False, 'short') for p, q in zip(prices.tolist(), sizes.tolist())])
+        await self._requote_tp('short', latest_price)
+
+    async def _requote_tp(self, side, latest_price):
+        position = self.long_position if side == 'long' else self.short_position
+        tp = [('sell' if side == 'long' else 'buy', self._tp_price(side, latest_price), position, True, side)] if position > 0 else []
+        await self.requote_side(side, True, tp)
     
     async def manage_grid_orders(self, latest_price):
         try:
             self.update_mid_price(None, latest_price)
+            if self.recorder:
+                self.recorder.record("quotes", ts=time.time(), price=latest_price, reserve_price=self.reserve_price,
+                                     bid=self.best_bid, ask=self.best_ask, inventory=self.inventory, gamma=self.gamma,
+                                     sigma=self.sigma, eta=self.eta, rsi=self.rsi_val, trend_alpha=self.trend_alpha,
+                                     funding_rate=self.funding_rate, ofi=self.last_ofi)
             # Parallel Execution
             await asyncio.gather(
                 self._long_mindset_logic(latest_price),
@@ -285,18 +455,44 @@ class AvellanedaGridBot(GridTradingBot):
         except Exception as e:
             logger.error(f"Dual-Mindset Error: {e}")
 
+    async def on_private_events(self, events):
+        # A fill only marks its side's TP as stale; the ladders keep the throttled refresh
+        for kind, fill in events:
+            if kind != "fill": continue
+            ro = fill.get("reduce_only")
+            if ro is None: sides = ('long', 'short')
+            else: sides = ('long' if (fill['side'] == 'buy') != ro else 'short',)
+            for side in sides: self.tp_pending.setdefault(side, time.time())
+
+    async def _refresh_pending_tps(self):
+        """Re-places the TP of a side with a fill, once positions reflect it, at most every TP_REFRESH_MIN_INTERVAL."""
+        now = time.time()
+        synced_at = max(self.position_pushed_at, self.last_position_update_time)
+        for side, filled_at in list(self.tp_pending.items()):
+            if synced_at < filled_at or now - self.tp_refreshed_at[side] < TP_REFRESH_MIN_INTERVAL: continue
+            del self.tp_pending[side]
+            self.tp_refreshed_at[side] = now
+            if self._risk_check(side, self.latest_price): continue
+            await self._requote_tp(side, self.latest_price)
+
     async def adjust_grid_strategy(self):
         if not self.latest_price: return
         # Check Dynamic Refresh Throttle
         if time.time() - self.last_long_order_time > self.dynamic_refresh_time: 
+            # The full refresh re-places both TPs; keep only fills positions haven't caught up with
+            synced_at = max(self.position_pushed_at, self.last_position_update_time)
+            self.tp_pending = {side: t for side, t in self.tp_pending.items() if t > synced_at}
             await self.manage_grid_orders(self.latest_price)
             self.last_long_order_time = time.time()
+        elif self.tp_pending:
+            await self._refresh_pending_tps()
 
-    async def run(self):
+    async def _clean_stale_orders(self):
         logger.info("--- BOT STARTUP: Cleaning Stale Orders ---")
         try:
             # Try efficient single call
-            await self.exchange.cancel_all_orders(self.ccxt_symbol)
+            with request_class("order"):
+                await self.exchange.cancel_all_orders(self.ccxt_symbol)
             logger.info("All open orders cancelled.")
         except Exception as e:
             logger.warning(f"cancel_all_orders failed ({e}), switching to manual Loop...")
@@ -307,6 +503,22 @@ class AvellanedaGridBot(GridTradingBot):
                 logger.info(f"Manually cancelled {len(orders)} stale orders.")
             except Exception as e2:
                 logger.error(f"Failed to clear orders: {e2}")
+        self.open_orders = {}
+
+    async def run(self):
+        adopted = False
+        if self.recover_state() and self.journal_fresh and self.open_orders:
+            logger.info("--- BOT STARTUP: Adopting Resting Orders (journal) ---")
+            try:
+                with request_class("order"):
+                    await self.adopt_resting_orders()
+                adopted = True
+            except Exception as e:
+                logger.warning(f"Order adoption failed ({e}), cleaning instead")
+        if not adopted:
+            await self._clean_stale_orders()
+        else:
+            self.last_long_order_time = time.time() # Adopted quotes stand until the normal refresh
         
         asyncio.create_task(self.update_parameters_periodically())
         await super().run()
@@ -325,7 +537,8 @@ async def main():
         gamma=AVE_GAMMA, eta=AVE_ETA, sigma=AVE_SIGMA, T_end=AVE_T_END,
         trend_alpha=TREND_ALPHA, funding_rate=FUNDING_RATE, taker_fee_rate=Taker_Fee_Rate,
         testnet=USE_TESTNET,
-        order_layers=ORDER_LAYERS, layer_spread=LAYER_SPREAD
+        order_layers=ORDER_LAYERS, layer_spread=LAYER_SPREAD,
+        market_data_urls=MARKET_DATA_URLS
     )
     bot.high_1m = H1
     bot.low_1m = L1
@@ -334,6 +547,7 @@ async def main():
     await bot.run()
 
 if __name__ == "__main__":
+    install_fast_event_loop()
     try: asyncio.run(main())
     except KeyboardInterrupt: pass
     except Exception as e: logger.critical(f"FATAL: {e}")
@@ -10,10 +10,24 @@ import hmac
 import hashlib
 import time
 import ccxt.async_support as ccxt
-import math
 import os
+import random
 import datetime
+from collections import OrderedDict
 from dotenv import load_dotenv
+from .feed_racer import FeedRacer, RACED_CHANNELS
+from .pnl_engine import PnLEngine
+from .order_book import L2OrderBook, ORDER_BOOK_DEPTH
+from .profiler import install_profiler_signal
+from .loop_monitor import LoopLagMonitor
+from .rest_transport import RestTransport, REQUEST_CLASS, request_class
+from .ws_trading import WsOrderGateway, WsTransportError, WsOrderTimeout, WsApiError
+from .state_journal import StateJournal
+from .columnar_log import ColumnarRecorder
+from .mailbox import ConflatingMailbox
+from .contract_rules import build_rule_table, SNAP_EPS
+from .rate_limit_broker import create_broker, rate_priority, RATE_PRIORITY
+from .state_publisher import create_publisher
 
 load_dotenv()
 
@@ -40,6 +54,27 @@ SYNC_TIME = 1
 ORDER_FIRST_TIME = 1  
 STRATEGY_THROTTLE_INTERVAL = 2 
 REPORT_INTERVAL = 300 
+USE_WS_ORDERS = True  # Place/cancel over the WebSocket API, REST as fallback
+ORDER_BATCH_MAX = 10  # Orders per batch request (Gate futures batch limit)
+USE_STATE_JOURNAL = True        # Journal fills / orders / params to log/ and recover them on restart
+JOURNAL_ADOPT_MAX_AGE = 300     # Adopt resting orders / restore params only if the journal is this fresh (s)
+JOURNAL_TRADES_KEPT = 1000      # trade_history tail kept in snapshots
+ORDER_RO_KEPT = 1024            # order_id -> reduce_only entries remembered for fill classification
+PNL_RECONCILE_QUIET = 2.0       # Skip PnL / position reconciliation within this long of a fill (pushes may lag) (s)
+USE_COLUMNAR_LOG = True         # Fills / quotes / UCB updates to Parquet under log/columnar (needs pyarrow)
+USE_SHARED_RATE_LIMIT = True    # One REST budget per account across every bot process on this host
+USE_STATE_PUBLISHER = True      # Live state snapshot in shared memory for local monitors (state_publisher.py)
+# WebSocket Reconnect Settings
+WS_RECONNECT_BASE_DELAY = 0.1   # First retry within ~100ms
+WS_RECONNECT_MAX_DELAY = 5      # Backoff ceiling (s)
+WS_SUBSCRIBE_TIMEOUT = 3        # Re-send un-acked subscriptions after this (s)
+WS_SUBSCRIBE_MAX_RETRIES = 3    # Re-sends without an ack before the connection is recycled
+WS_SUBSCRIBE_REJECT_RETRIES = 3 # Re-sends of an error-acked channel per connection (backoff from WS_SUBSCRIBE_TIMEOUT)
+MARKET_FEED_STAGGER = 0.25      # Delay between redundant feed connects (s)
+MARKET_FEED_STALL_TIMEOUT = 10  # Reconnect a redundant feed silent for this long (s)
+PUBLIC_CHANNELS = ["futures.tickers", "futures.book_ticker", "futures.trades", "futures.order_book_update"]
+PRIVATE_CHANNELS = ["futures.positions", "futures.orders", "futures.usertrades", "futures.balances"]
+WS_CHANNELS = PUBLIC_CHANNELS + PRIVATE_CHANNELS
 
 script_name = os.path.splitext(os.path.basename(__file__))[0]
 os.makedirs("log", exist_ok=True)
@@ -54,19 +89,71 @@ logging.basicConfig(
 logger = logging.getLogger()
 
 
+def load_accounts():
+    """
+    Accounts to trade, as (name, api_key, api_secret).
+    Multi-account: GATEIO_ACCOUNTS=main,sub1 with <NAME>_API_KEY / <NAME>_API_SECRET per name.
+    Otherwise the single API_KEY / API_SECRET pair above.
+    """
+    names = [n.strip() for n in os.getenv("GATEIO_ACCOUNTS", "").split(",") if n.strip()]
+    if not names:
+        return [("default", API_KEY, API_SECRET)]
+    accounts = []
+    for name in names:
+        key = os.getenv(f"{name.upper()}_API_KEY")
+        secret = os.getenv(f"{name.upper()}_API_SECRET")
+        if not key or not secret:
+            logger.warning(f"Account {name}: missing {name.upper()}_API_KEY / {name.upper()}_API_SECRET, skipped")
+            continue
+        accounts.append((name, key, secret))
+    return accounts
+
+
+def subscription_payload(channel, ws_symbol):
+    if channel == "futures.balances":
+        return ["USDT"]
+    if channel == "futures.order_book_update":
+        return [ws_symbol, "100ms", str(ORDER_BOOK_DEPTH)]
+    return [ws_symbol]
+
+
 class CustomGate(ccxt.gate):
-    def fetch(self, url, method='GET', headers=None, body=None):
+    transport = None # RestTransport: per-class keep-alive pools and timeouts
+    rate_broker = None # RateLimitBroker: host-wide budget replacing ccxt's per-process limiter
+
+    async def throttle(self, cost=None):
+        if self.rate_broker is None:
+            return await super().throttle(cost)
+        await self.rate_broker.acquire(cost or 1, RATE_PRIORITY.get())
+
+    async def fetch(self, url, method='GET', headers=None, body=None):
         if headers is None: headers = {}
         headers['X-Gate-Channel-Id'] = 'laohuoji'
         headers['Accept'] = 'application/json'
         headers['Content-Type'] = 'application/json'
-        return super().fetch(url, method, headers, body)
+        if self.transport is not None:
+            # Both are read by the base fetch before its first await, so this is per-request
+            cls = REQUEST_CLASS.get()
+            self.session = self.transport.session_for(cls)
+            self.timeout = self.transport.timeout_for(cls)
+        return await super().fetch(url, method, headers, body)
+
+    async def close(self):
+        if self.transport is not None:
+            await self.transport.close()
+            self.transport = None
+        if self.rate_broker is not None:
+            self.rate_broker.close()
+            self.rate_broker = None
+        await super().close()
 
 
 class GridTradingBot:
-    def __init__(self, api_key, api_secret, coin_name, grid_spacing, initial_quantity, leverage, take_profit_spacing=None, testnet=False):
+    def __init__(self, api_key, api_secret, coin_name, grid_spacing, initial_quantity, leverage, take_profit_spacing=None, testnet=False, market_data_urls=None,
+                 market_data_hub=None, account_name="default"):
         self.api_key = api_key
         self.api_secret = api_secret
+        self.account_name = account_name
         self.coin_name = coin_name
         self.grid_spacing = grid_spacing
         self.take_profit_spacing = take_profit_spacing or grid_spacing
@@ -86,6 +173,9 @@ class GridTradingBot:
         # Async exchange init (must happen in run/await)
         self.exchange = self._create_exchange_instance()
         self.price_precision = 2 
+        self.tick_size = 0.01
+        self.contract_size = 1.0
+        self.contract_rules = None # ContractRules of this symbol, set once markets are loaded
 
         self.long_initial_quantity = initial_quantity
         self.short_initial_quantity = initial_quantity
@@ -102,7 +192,11 @@ class GridTradingBot:
         self.buy_short_orders = 0
         self.last_position_update_time = 0
         self.last_orders_update_time = 0
+        self.position_pushed_at = 0     # Last futures.positions update over WS
+        self.position_fetched_at = 0    # Last successful REST position fetch
+        self.last_fill_at = 0
         self.latest_price = 0
+        self.mark_price = 0             # Exchange mark price (ticker), reference of the order price band
         self.best_bid_price = None
         self.best_ask_price = None
         
@@ -112,6 +206,48 @@ class GridTradingBot:
         self.trade_history = [] 
         self.total_fees_paid = 0.0
         self.last_strategy_run_time = 0.0
+        self.pnl = PnLEngine()
+        self.order_book = L2OrderBook()
+        self._book_snapshot_task = None
+        self.profiler = None
+        self.loop_monitor = LoopLagMonitor()
+        self.rest_transport = None
+        self.order_reduce_only = OrderedDict() # order_id -> is_reduce_only (bounded), from placement and order pushes
+        self.mailbox = ConflatingMailbox()     # Socket reader -> strategy task
+        self.open_orders = {}                  # order_id -> {side, price, left, reduce_only}
+
+        # Crash recovery (journal + snapshots under log/)
+        self.journal = StateJournal(f"{coin_name}-{account_name}") if USE_STATE_JOURNAL else None
+        self.recorder = ColumnarRecorder(f"{coin_name}-{account_name}") if USE_COLUMNAR_LOG else None
+        self.journal_loaded = False
+        self.state_recovered = False
+        self.journal_fresh = False
+        self.state_publisher = create_publisher(f"{coin_name}-{account_name}") if USE_STATE_PUBLISHER else None
+
+        # WebSocket session state
+        self.ws_subscriptions = {}      # channel -> acked (bool)
+        self.ws_failed_channels = {}    # channel -> error: still rejected after this connection's retries
+        self.ws_rejects = {}            # channel -> error acks on the current connection
+        self.ws_conn = None
+        self.ws_reconnect_attempt = 0
+        self.ws_gap_started_at = None   # Set while the private stream is down
+        self.pending_resync = set()     # Private channels to resync once re-acked
+
+        # Order entry over the WebSocket API (own authenticated socket)
+        self.ws_orders = WsOrderGateway(self.ws_url, api_key, api_secret) if USE_WS_ORDERS else None
+
+        # Shared public feed (multi-account): this socket then carries private channels only
+        self.market_data_hub = market_data_hub
+        if market_data_hub is not None:
+            market_data_hub.register(self)
+            market_data_urls = None
+
+        # Redundant market data feeds, raced against the primary socket
+        self.market_data_urls = list(market_data_urls or [])
+        self.feed_racer = None
+        if self.market_data_urls:
+            self.feed_racer = FeedRacer()
+            self.feed_racer.register("primary", self.ws_url)
 
     def _create_exchange_instance(self):
         exchange = CustomGate({
@@ -126,10 +262,20 @@ class GridTradingBot:
         })
         if self.testnet:
             exchange.set_sandbox_mode(True)
+        if USE_SHARED_RATE_LIMIT:
+            # Same refill as ccxt's own limiter, but one bucket for all processes on this account
+            exchange.rate_broker = create_broker(f"{self.api_key}:{self.testnet}", 1000 / exchange.rateLimit)
         return exchange
 
     async def _initialize_exchange_conn(self):
         try:
+            # Explicit keep-alive pools, warm before the first order needs them
+            ping_url = f"{self.exchange.urls['api']['public']['futures']}/futures/usdt/contracts/{self.ws_symbol}"
+            self.rest_transport = RestTransport(self.exchange, ping_url)
+            await self.rest_transport.install()
+            self.exchange.transport = self.rest_transport
+            await self.rest_transport.prewarm()
+
             await self.exchange.load_markets()
             try:
                 await self.exchange.set_position_mode(True, self.ccxt_symbol)
@@ -139,10 +285,17 @@ class GridTradingBot:
                 if "NO_CHANGE" not in str(e):
                     logger.warning(f"設置 Hedge Mode 失敗: {e}")
             
-            # Fetch precision
-            markets = await self.exchange.fetch_markets()
-            symbol_info = next(market for market in markets if market["symbol"] == self.ccxt_symbol)
-            self.price_precision = int(-math.log10(float(symbol_info["precision"]["price"])))
+            # Contract rules (tick / lot / size limits / price band / leverage), precomputed once
+            rules = build_rule_table(self.exchange.markets)[self.ccxt_symbol]
+            self.contract_rules = rules
+            self.price_precision = rules.price_precision
+            self.tick_size = rules.tick
+            self.contract_size = rules.contract_size
+            self.pnl.contract_size = self.contract_size
+            leverage = rules.clamp_leverage(self.leverage)
+            if leverage != self.leverage:
+                logger.warning(f"Leverage {self.leverage} outside {rules.leverage_min}-{rules.leverage_max}, using {leverage}")
+                self.leverage = leverage
 
         except Exception as e:
             logger.error(f"初始化 Exchange 連線失敗: {e}")
@@ -172,6 +325,7 @@ class GridTradingBot:
                     short_position = abs(contracts)
                     short_entry = entry_price
 
+        self.position_fetched_at = time.time()
         return long_position, long_entry, short_position, short_entry
 
     async def check_orders_status(self):
@@ -185,71 +339,227 @@ class GridTradingBot:
         sell_long_orders_count = 0
         sell_short_orders_count = 0
         buy_short_orders_count = 0
+        resting = {}
 
         for order in orders:
             if not order.get('info') or 'left' not in order['info']: continue
             left = abs(float(order['info'].get('left', '0')))
             ro = order.get('reduceOnly')
             side = order.get('side')
+            resting[str(order['id'])] = {"side": side, "price": float(order.get('price') or 0), "left": left,
+                                         "reduce_only": bool(ro)}
             
             if ro and side == 'sell': sell_long_orders_count = left
             elif ro and side == 'buy': buy_short_orders_count = left
             elif not ro and side == 'buy': buy_long_orders_count = left
             elif not ro and side == 'sell': sell_short_orders_count = left
 
+        self.open_orders = resting # Authoritative resting set for requote diffs (pushes can be missed)
         return buy_long_orders_count, sell_long_orders_count, sell_short_orders_count, buy_short_orders_count
 
     async def run(self):
+        self.recover_state()
+        if self.market_data_hub is None: # Per process: a hub arms the profiler / loop monitor once for all its bots
+            self.profiler = install_profiler_signal()
         await self._initialize_exchange_conn()
         await self._update_initial_balance() # Fetch Initial Balance via REST
         self.long_position, self.long_entry_price, self.short_position, self.short_entry_price = await self.get_position()
         logger.info(f"Init Positions: Long {self.long_position} (@{self.long_entry_price}), Short {self.short_position} (@{self.short_entry_price})")
+        self.pnl.seed(self.long_position, self.long_entry_price, self.short_position, self.short_entry_price)
 
         self.buy_long_orders, self.sell_long_orders, self.sell_short_orders, self.buy_short_orders = await self.check_orders_status()
         
         asyncio.create_task(self.reporting_loop())
+        asyncio.create_task(self.strategy_loop())
+        if self.market_data_hub is None:
+            asyncio.create_task(self.loop_monitor.run())
+        if self.rest_transport:
+            asyncio.create_task(self.rest_transport.keepalive_loop())
+        if self.ws_orders:
+            asyncio.create_task(self.ws_orders.run())
+        for i, url in enumerate(self.market_data_urls):
+            asyncio.create_task(self.run_market_feed(f"feed{i+1}", url, (i + 1) * MARKET_FEED_STAGGER))
 
         while True:
             try:
                 await self.connect_websocket()
             except Exception as e:
                 logger.error(f"WebSocket Error: {e}")
-                await asyncio.sleep(5)
+            # Keep the REST session alive; only the socket is rebuilt
+            if self.ws_gap_started_at is None:
+                self.ws_gap_started_at = time.time()
+            delay = self._reconnect_delay()
+            self.ws_reconnect_attempt += 1
+            logger.warning(f"WS reconnect #{self.ws_reconnect_attempt} in {delay*1000:.0f}ms")
+            await asyncio.sleep(delay)
+
+    def _reconnect_delay(self):
+        """Full-jitter exponential backoff: first retry is near-instant."""
+        cap = min(WS_RECONNECT_MAX_DELAY, WS_RECONNECT_BASE_DELAY * (2 ** self.ws_reconnect_attempt))
+        return random.uniform(0, cap)
 
     async def connect_websocket(self):
         # FIX: Keepalive settings
         async with websockets.connect(self.ws_url, ping_interval=20, ping_timeout=20) as websocket:
+            if self.ws_gap_started_at is not None:
+                self.pending_resync = {"futures.positions", "futures.orders", "futures.balances"}
+            self.ws_conn = websocket
             await self.subscribe_all(websocket)
-            while True:
-                try:
-                    message = await websocket.recv()
-                    data = json.loads(message)
-                    channel = data.get("channel")
-
-                    if channel == "futures.tickers":
-                        await self.handle_ticker_update(message)
-                    elif channel == "futures.positions":
-                        await self.handle_position_update(message)
-                    elif channel == "futures.orders":
-                        await self.handle_order_update(message)
-                    elif channel == "futures.usertrades":
-                        await self.handle_usertrades_update(message) 
-                    elif channel == "futures.book_ticker":
-                        await self.handle_book_ticker_update(message)
-                    elif channel == "futures.balances":
-                        await self.handle_balance_update(message)
-                except Exception as e:
-                    logger.error(f"WS Msg Error: {e}")
-                    break
-        try: await self.exchange.close()
-        except: pass
+            watchdog = asyncio.create_task(self._subscription_watchdog(websocket))
+            try:
+                while True:
+                    message = await websocket.recv() # ConnectionClosed -> reconnect
+                    try:
+                        await self._dispatch_message(message)
+                    except Exception as e:
+                        logger.error(f"WS Msg Error: {e}")
+            finally:
+                watchdog.cancel()
+
+    async def run_market_feed(self, feed_id, url, start_delay=0):
+        """Public-only connection whose ticker/book updates race the primary socket."""
+        self.feed_racer.register(feed_id, url)
+        await asyncio.sleep(start_delay)
+        attempt = 0
+        while True:
+            try:
+                async with websockets.connect(url, ping_interval=20, ping_timeout=20) as websocket:
+                    await asyncio.gather(*(self.send_sub(websocket, chan) for chan in RACED_CHANNELS))
+                    attempt = 0
+                    while True:
+                        message = await asyncio.wait_for(websocket.recv(), MARKET_FEED_STALL_TIMEOUT)
+                        try:
+                            await self._dispatch_message(message, feed_id)
+                        except Exception as e:
+                            logger.error(f"[{feed_id}] Msg Error: {e}")
+            except Exception as e:
+                logger.warning(f"[{feed_id}] Feed Error: {e!r}")
+            cap = min(WS_RECONNECT_MAX_DELAY, WS_RECONNECT_BASE_DELAY * (2 ** attempt))
+            attempt += 1
+            await asyncio.sleep(random.uniform(0, cap))
+
+    async def _dispatch_message(self, message, feed_id="primary"):
+        await self._dispatch(json.loads(message), feed_id)
+
+    async def _dispatch(self, data, feed_id="primary"):
+        """Routes one parsed message; handlers take the dict, so each message is decoded once."""
+        channel = data.get("channel")
+
+        if self.feed_racer and channel in RACED_CHANNELS and data.get("event") == "update":
+            if not self.feed_racer.accept(feed_id, channel, data): return
+        elif feed_id != "primary":
+            return # Redundant feeds only carry market data
+
+        if data.get("event") == "subscribe":
+            self._handle_subscribe_ack(channel, data)
+        elif channel == "futures.tickers":
+            await self.handle_ticker_update(data)
+        elif channel == "futures.positions":
+            await self.handle_position_update(data)
+        elif channel == "futures.orders":
+            await self.handle_order_update(data)
+        elif channel == "futures.usertrades":
+            await self.handle_usertrades_update(data) 
+        elif channel == "futures.book_ticker":
+            await self.handle_book_ticker_update(data)
+        elif channel == "futures.balances":
+            await self.handle_balance_update(data)
+        elif channel == "futures.trades":
+            await self.handle_trades_update(data)
+        elif channel == "futures.order_book_update":
+            await self.handle_order_book_update(data)
+
+    def _handle_subscribe_ack(self, channel, data):
+        if channel not in self.ws_subscriptions: return
+        if data.get("error"):
+            # May be transient (signature / clock skew on the signed time): re-send with backoff,
+            # a few times per connection. Past that the channel counts as rejected until a later
+            # connection gets it acked; a rejected private channel halts quoting (no fills seen).
+            n = self.ws_rejects[channel] = self.ws_rejects.get(channel, 0) + 1
+            if n <= WS_SUBSCRIBE_REJECT_RETRIES:
+                delay = WS_SUBSCRIBE_TIMEOUT * 2 ** (n - 1)
+                logger.warning(f"Subscribe {channel} rejected ({data['error']}), retry {n} in {delay}s")
+                asyncio.create_task(self._resubscribe_later(self.ws_conn, channel, delay))
+                return
+            self.ws_failed_channels[channel] = data["error"]
+            del self.ws_subscriptions[channel]
+            if channel in PRIVATE_CHANNELS:
+                logger.critical(f"ALERT: Subscribe {channel} still rejected, quoting halted, reconnecting: {data['error']}")
+                if self.ws_conn: asyncio.create_task(self.ws_conn.close()) # Next connection retries
+                return
+            logger.critical(f"ALERT: Subscribe {channel} still rejected, disabled until reconnect: {data['error']}")
+        else:
+            self.ws_subscriptions[channel] = True
+            self.ws_rejects.pop(channel, None)
+            if self.ws_failed_channels.pop(channel, None) is not None:
+                logger.info(f"Subscribe {channel} accepted again")
+
+        # Targeted resync: only the private state that may have changed during the gap,
+        # fetched after the stream is live again so nothing falls between the two.
+        if channel in self.pending_resync:
+            self.pending_resync.discard(channel)
+            asyncio.create_task(self._resync_channel(channel))
+
+        if all(self.ws_subscriptions.values()) and not self.private_channels_rejected():
+            if self.ws_gap_started_at is not None:
+                logger.info(f"WS Recovered in {time.time() - self.ws_gap_started_at:.2f}s")
+                self.ws_gap_started_at = None
+            self.ws_reconnect_attempt = 0
+
+    async def _sync_positions(self):
+        """REST position fetch; the PnL engine's books are reconciled to it (fills may have been misclassified)."""
+        fetched_before = self.position_fetched_at
+        self.long_position, self.long_entry_price, self.short_position, self.short_entry_price = await self.get_position()
+        self.last_position_update_time = time.time()
+        if self.position_fetched_at == fetched_before: return # Fetch failed: cached values, nothing to compare
+        if time.time() - self.last_fill_at < PNL_RECONCILE_QUIET: return # A fill may not be in one side yet
+        if self.pnl.reconcile(self.long_position, self.long_entry_price, self.short_position, self.short_entry_price):
+            logger.warning(f"PnL books reconciled to exchange positions: L {self.long_position} / S {self.short_position}")
+
+    async def _resubscribe_later(self, websocket, channel, delay):
+        await asyncio.sleep(delay)
+        if websocket is self.ws_conn and channel in self.ws_subscriptions:
+            try:
+                await self.send_sub(websocket, channel)
+            except websockets.ConnectionClosed:
+                pass # Reconnect re-subscribes everything
+
+    def private_channels_rejected(self):
+        return [c for c in self.ws_failed_channels if c in PRIVATE_CHANNELS]
+
+    async def _resync_channel(self, channel):
+        try:
+            if channel == "futures.positions":
+                await self._sync_positions()
+            elif channel == "futures.orders":
+                self.buy_long_orders, self.sell_long_orders, self.sell_short_orders, self.buy_short_orders = await self.check_orders_status()
+                self.last_orders_update_time = time.time()
+            elif channel == "futures.balances":
+                await self._update_initial_balance()
+            logger.info(f"Resynced {channel} after WS gap")
+        except Exception as e:
+            logger.error(f"Resync {channel} Error: {e}")
+
+    async def _subscription_watchdog(self, websocket):
+        for attempt in range(WS_SUBSCRIBE_MAX_RETRIES + 1):
+            await asyncio.sleep(WS_SUBSCRIBE_TIMEOUT)
+            # Error-acked channels are re-sent on their own backoff (_resubscribe_later)
+            missing = [c for c, acked in self.ws_subscriptions.items() if not acked and c not in self.ws_rejects]
+            if not missing: return
+            if attempt == WS_SUBSCRIBE_MAX_RETRIES: break
+            logger.warning(f"Un-acked subscriptions, re-sending: {missing}")
+            await asyncio.gather(*(self.send_sub(websocket, c) for c in missing))
+        logger.error(f"Subscriptions still un-acked after {WS_SUBSCRIBE_MAX_RETRIES} re-sends, reconnecting: {missing}")
+        await websocket.close() # recv() raises ConnectionClosed -> normal reconnect path
 
     def _generate_sign(self, message):
         return hmac.new(self.api_secret.encode("utf-8"), message.encode("utf-8"), hashlib.sha512).hexdigest()
 
     async def subscribe_all(self, websocket):
-        for chan in ["futures.tickers", "futures.positions", "futures.orders", "futures.usertrades", "futures.book_ticker", "futures.balances"]:
-            await self.send_sub(websocket, chan)
+        channels = PRIVATE_CHANNELS if self.market_data_hub else WS_CHANNELS
+        self.ws_rejects = {} # Fresh retry budget per connection; rejected channels are tried again
+        self.ws_subscriptions = {chan: False for chan in channels}
+        await asyncio.gather(*(self.send_sub(websocket, chan) for chan in channels))
 
     async def send_sub(self, websocket, channel):
         t = int(time.time())
@@ -257,7 +567,7 @@ class GridTradingBot:
         sign = self._generate_sign(msg)
         payload = {
             "time": t, "channel": channel, "event": "subscribe",
-            "payload": [self.ws_symbol] if channel != "futures.balances" else ["USDT"],
+            "payload": subscription_payload(channel, self.ws_symbol),
             "auth": {"method": "api_key", "KEY": self.api_key, "SIGN": sign},
         }
         await websocket.send(json.dumps(payload))
@@ -269,51 +579,106 @@ class GridTradingBot:
             self.balance["USDT"] = {"balance": float(balances.get("USDT", {}).get("total", 0)), "change": 0}
             if self.start_balance_usdt is None:
                 self.start_balance_usdt = self.balance["USDT"]["balance"]
+                self._journal("start", {"balance": self.start_balance_usdt, "time": self.start_time})
             logger.info(f"Initial Balance Loaded: {self.start_balance_usdt:.2f} USDT")
         except Exception as e:
             logger.error(f"Failed to fetch initial balance: {e}")
 
-    async def handle_balance_update(self, message):
-        data = json.loads(message)
+    async def handle_balance_update(self, data):
         if data.get("event") == "update":
             for bal in data.get("result", []):
                 curr = bal.get("currency", "")
                 self.balance[curr] = {"balance": float(bal.get("balance",0)), "change": float(bal.get("change",0))}
                 if curr == "USDT" and self.start_balance_usdt is None:
                     self.start_balance_usdt = float(bal.get("balance",0))
+                    self._journal("start", {"balance": self.start_balance_usdt, "time": self.start_time})
+            self._publish_state()
 
-    async def handle_ticker_update(self, message):
-        data = json.loads(message)
+    async def handle_ticker_update(self, data):
         if data.get("event") == "update":
             res = data["result"][0]
             if "mark_price" in res and res["mark_price"]:
-                self.latest_price = float(res["mark_price"])
+                self.latest_price = self.mark_price = float(res["mark_price"])
             else:
                 self.latest_price = float(res["last"])
+            self.pnl.mark(self.latest_price)
+            self.on_market_tick()
+            self.mailbox.post_latest("ticker", self.latest_price)
+            self._publish_state()
 
-            if time.time() - self.last_strategy_run_time < STRATEGY_THROTTLE_INTERVAL: return 
-            self.last_strategy_run_time = time.time()
+    async def strategy_loop(self):
+        """All order I/O runs here, fed by the mailbox, so the socket reader never waits on REST."""
+        while True:
+            events, latest = await self.mailbox.get()
+            try:
+                if events: await self.on_private_events(events)
+                if "ticker" in latest: await self.on_ticker()
+            except Exception as e:
+                logger.error(f"Strategy Error: {e}")
+            self._publish_state() # REST syncs, requotes and parameter changes land here
 
-            if time.time() - self.last_position_update_time > SYNC_TIME:
-                self.long_position, self.long_entry_price, self.short_position, self.short_entry_price = await self.get_position()
-                self.last_position_update_time = time.time()
+    async def on_ticker(self):
+        if time.time() - self.last_strategy_run_time < STRATEGY_THROTTLE_INTERVAL: return 
+        self.last_strategy_run_time = time.time()
 
-            if time.time() - self.last_orders_update_time > SYNC_TIME:
-                self.buy_long_orders, self.sell_long_orders, self.sell_short_orders, self.buy_short_orders = await self.check_orders_status()
-                self.last_orders_update_time = time.time()
+        if time.time() - self.last_position_update_time > SYNC_TIME:
+            await self._sync_positions()
+
+        if time.time() - self.last_orders_update_time > SYNC_TIME:
+            self.buy_long_orders, self.sell_long_orders, self.sell_short_orders, self.buy_short_orders = await self.check_orders_status()
+            self.last_orders_update_time = time.time()
+
+        if self.private_channels_rejected():
+            return # Fills / orders unseen: quoting stays off until the channel is acked again
+        await self.adjust_grid_strategy()
 
-            await self.adjust_grid_strategy()
+    async def on_private_events(self, events):
+        """Hook: fills / order updates in arrival order, none dropped (kind, data)."""
+        pass
 
-    async def handle_book_ticker_update(self, message):
-        data = json.loads(message)
+    async def handle_book_ticker_update(self, data):
         if data.get("event") == "update":
             r = data["result"]
             if r:
                 self.best_bid_price = float(r.get("b", 0))
                 self.best_ask_price = float(r.get("a", 0))
+                self.on_market_tick()
+                self._publish_state()
+
+    def on_market_tick(self):
+        """Runs on every price update, before any throttling. Must stay O(1) and non-blocking."""
+        pass
+
+    async def handle_trades_update(self, data):
+        if data.get("event") == "update":
+            for t in data["result"]:
+                ts = t.get("create_time_ms", time.time()*1000) / 1000
+                self.on_public_trade(ts, float(t.get("price", 0)), float(t.get("size", 0)))
+
+    def on_public_trade(self, ts, price, size):
+        """Public tape hook (size > 0: taker buy, size < 0: taker sell)."""
+        pass
+
+    async def handle_order_book_update(self, data):
+        if data.get("event") == "update":
+            if not self.order_book.on_update(data["result"]):
+                logger.warning(f"Order Book Gap (last id {self.order_book.last_update_id}), resnapshotting")
+            if self.order_book.needs_snapshot and self._book_snapshot_task is None:
+                self._book_snapshot_task = asyncio.create_task(self._snapshot_order_book())
+
+    async def _snapshot_order_book(self):
+        try:
+            snapshot = await self.exchange.public_futures_get_settle_order_book({
+                'settle': 'usdt', 'contract': self.ws_symbol,
+                'limit': ORDER_BOOK_DEPTH, 'with_id': 'true',
+            })
+            self.order_book.apply_snapshot(snapshot)
+        except Exception as e:
+            logger.error(f"Order Book Snapshot Error: {e}")
+        finally:
+            self._book_snapshot_task = None
 
-    async def handle_position_update(self, message):
-        data = json.loads(message)
+    async def handle_position_update(self, data):
         if data.get("event") == "update":
             for pos in data["result"]:
                 if pos.get("mode") == "dual_long":
@@ -322,23 +687,31 @@ class GridTradingBot:
                 else:
                     self.short_position = abs(float(pos.get("size", 0)))
                     self.short_entry_price = float(pos.get("entry_price", 0))
+            self.position_pushed_at = time.time()
+            self._publish_state()
 
-    async def handle_order_update(self, message):
-        data = json.loads(message)
+    async def handle_order_update(self, data):
         if data.get("event") == "update":
             for o in data["result"]:
                 if 'is_reduce_only' not in o: continue
                 size = o.get('size', 0)
                 ro = o.get('is_reduce_only', False)
+                if 'id' in o:
+                    self._remember_reduce_only(o['id'], ro)
+                    order = {"id": str(o['id']), "side": 'buy' if size > 0 else 'sell', "price": float(o.get('price', 0)),
+                             "left": abs(o.get('left', 0)), "reduce_only": ro, "status": o.get('status')}
+                    self._apply_order(order)
+                    self._journal("order", order)
+                    self.mailbox.post_event("order", order)
                 if size > 0:
                     if ro: self.buy_short_orders = abs(o.get('left', 0))
                     else: self.buy_long_orders = abs(o.get('left', 0))
                 else:
                     if ro: self.sell_long_orders = abs(o.get('left', 0))
                     else: self.sell_short_orders = abs(o.get('left', 0))
+            self._publish_state()
 
-    async def handle_usertrades_update(self, message):
-        data = json.loads(message)
+    async def handle_usertrades_update(self, data):
         if data.get("event") == "update":
             for t in data["result"]:
                 # Normalize Gate.io data (size -> side/amount)
@@ -353,12 +726,141 @@ class GridTradingBot:
                     'amount': amount,
                     'price': price,
                     'fee': float(t.get('fee', 0)),
+                    'reduce_only': self.order_reduce_only.get(str(t.get('order_id'))),
                     'timestamp': t.get('create_time_ms', time.time()*1000)
                 }
                 
-                self.trade_history.append(normalized_trade)
-                self.total_fees_paid += normalized_trade['fee']
+                self._apply_fill(normalized_trade)
+                self._journal("fill", normalized_trade)
+                self.mailbox.post_event("fill", normalized_trade)
+                if self.recorder:
+                    self.recorder.record("fills", ts=float(normalized_trade['timestamp']) / 1000, side=side, amount=amount,
+                                         price=price, fee=normalized_trade['fee'], reduce_only=normalized_trade['reduce_only'],
+                                         order_id=str(t.get('order_id')))
                 logger.info(f"Fill: {side} {amount} @ {price}")
+            self._publish_state()
+
+    def _remember_reduce_only(self, order_id, reduce_only):
+        if order_id is None: return
+        self.order_reduce_only[str(order_id)] = bool(reduce_only)
+        if len(self.order_reduce_only) > ORDER_RO_KEPT: self.order_reduce_only.popitem(last=False)
+
+    def _apply_fill(self, trade):
+        self.last_fill_at = time.time()
+        self.trade_history.append(trade)
+        self.total_fees_paid += trade['fee']
+        self.pnl.on_fill(trade['side'], trade['amount'], trade['price'], trade['fee'], trade['reduce_only'])
+
+    def _apply_order(self, order):
+        if order.get("status") == "open" and order["left"] > 0:
+            self.open_orders[order["id"]] = {k: order[k] for k in ("side", "price", "left", "reduce_only")}
+        else:
+            self.open_orders.pop(order["id"], None)
+
+    # ---------- Live state (shared memory) ----------
+    def _strategy_state(self):
+        """Hook: (reserve_price, gamma, sigma) from the strategy subclass."""
+        return 0.0, 0.0, 0.0
+
+    def _publish_state(self):
+        if not self.state_publisher: return
+        bids = asks = 0
+        bid_qty = ask_qty = top_bid = top_ask = 0.0
+        for o in self.open_orders.values():
+            if o["side"] == 'buy':
+                bids += 1
+                bid_qty += o["left"]
+                if o["price"] > top_bid: top_bid = o["price"]
+            else:
+                asks += 1
+                ask_qty += o["left"]
+                if not top_ask or o["price"] < top_ask: top_ask = o["price"]
+        pnl = self.pnl
+        balance = self.balance.get("USDT", {}).get("balance", 0.0)
+        ws = self.ws_orders
+        self.state_publisher.publish((
+            time.time(), self.latest_price or 0.0, self.best_bid_price or 0.0, self.best_ask_price or 0.0,
+            self.long_position, self.long_entry_price, self.short_position, self.short_entry_price,
+            *self._strategy_state(),
+            balance, balance + pnl.unrealized, pnl.net_pnl, pnl.realized, pnl.unrealized, self.total_fees_paid,
+            bids, asks, bid_qty, ask_qty, top_bid, top_ask,
+            self.loop_monitor.percentile(99), self.loop_monitor.stalls,
+            ws.latency_sum / ws.ok * 1000 if ws and ws.ok else 0.0, ws.sent if ws else 0,
+            self.mailbox.posted, self.mailbox.conflated,
+        ))
+
+    # ---------- State Journal (crash recovery) ----------
+    def _journal(self, kind, data):
+        if not self.journal: return
+        try:
+            self.journal.append(kind, data)
+            if self.journal.snapshot_due:
+                self.journal.snapshot(self._journal_state(), background=True) # File write + fsync off the WS handler
+        except Exception as e:
+            logger.error(f"Journal Error: {e}")
+
+    def _journal_state(self):
+        """Everything the journal rebuilds, as one compact snapshot (subclasses extend)."""
+        return {
+            "start_balance_usdt": self.start_balance_usdt,
+            "start_time": self.start_time,
+            "total_fees_paid": self.total_fees_paid,
+            "trade_history": self.trade_history[-JOURNAL_TRADES_KEPT:],
+            "pnl": self.pnl.to_dict(),
+            "open_orders": self.open_orders,
+            "order_reduce_only": list(self.order_reduce_only.items()),
+        }
+
+    def _restore_state(self, state):
+        self.start_balance_usdt = state.get("start_balance_usdt")
+        self.start_time = state.get("start_time", self.start_time)
+        self.total_fees_paid = state.get("total_fees_paid", 0.0)
+        self.trade_history = state.get("trade_history", [])
+        self.pnl.load_dict(state.get("pnl", {}))
+        self.open_orders = state.get("open_orders", {})
+        self.order_reduce_only = OrderedDict(state.get("order_reduce_only", []))
+
+    def _replay_event(self, kind, data):
+        if kind == "fill": self._apply_fill(data)
+        elif kind == "order": self._apply_order(data)
+        elif kind == "start": self.start_balance_usdt, self.start_time = data["balance"], data["time"]
+
+    def recover_state(self):
+        """Snapshot + journal replay, once, before any exchange call. True if prior state was found."""
+        if self.journal_loaded or not self.journal: return self.state_recovered
+        self.journal_loaded = True
+        state, events = self.journal.recover()
+        if state is None and not events: return False
+        self.state_recovered = True
+
+        self.journal_fresh = self.journal.age() < JOURNAL_ADOPT_MAX_AGE
+        if state is not None: self._restore_state(state)
+        for kind, data in events:
+            try:
+                self._replay_event(kind, data)
+            except Exception as e:
+                logger.error(f"Journal Replay Error ({kind}): {e}")
+        self.journal.snapshot(self._journal_state()) # Fold the replayed tail in
+        logger.info(f"Recovered state: {len(self.trade_history)} trades, fees {self.total_fees_paid:.4f}, "
+                    f"{len(self.open_orders)} resting orders (journal age {self.journal.age():.0f}s)")
+        return True
+
+    async def adopt_resting_orders(self):
+        """Keep journaled orders that are still resting on the exchange; cancel anything unknown."""
+        orders = await self.exchange.fetch_open_orders(self.ccxt_symbol)
+        live = set()
+        cancelled = 0
+        for o in orders:
+            oid = str(o['id'])
+            if oid in self.open_orders:
+                live.add(oid)
+                self.open_orders[oid]["left"] = abs(float((o.get('info') or {}).get('left', o.get('remaining') or 0)))
+            else:
+                await self.cancel_order(oid)
+                cancelled += 1
+        for oid in list(self.open_orders):
+            if oid not in live: self.open_orders.pop(oid)
+        logger.info(f"Adopted {len(live)} resting orders, cancelled {cancelled} unknown")
 
     async def reporting_loop(self):
         while True:
@@ -366,6 +868,10 @@ class GridTradingBot:
             try: self._generate_report()
             except Exception as e: logger.error(f"Report Error: {e}")
 
+    def _strategy_report_lines(self):
+        """Hook: extra report sections from the strategy subclass."""
+        return []
+
     def _generate_report(self):
         # 1. Basic Time Stats
         now = time.time()
@@ -374,21 +880,14 @@ class GridTradingBot:
         start_str = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(start))
         now_str = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(now))
         
-        # 2. Trade Statistics
-        trades = self.trade_history
-        # Simple safeguard if empty
-        if not trades:
-            buys, sells = [], []
-        else:
-            buys = [t for t in trades if t.get('side') == 'buy']
-            sells = [t for t in trades if t.get('side') == 'sell']
-        
-        buy_vol_base = sum([float(t['amount']) for t in buys])
-        sell_vol_base = sum([float(t['amount']) for t in sells]) * -1
+        # 2. Trade Statistics (running totals from the PnL engine, no history rescan)
+        pnl = self.pnl
+        buy_vol_base = pnl.buy_base
+        sell_vol_base = pnl.sell_base * -1
         
         # Approximate USDT volume (price * amount)
-        buy_vol_quote = sum([float(t['amount'])*float(t['price']) for t in buys]) * -1
-        sell_vol_quote = sum([float(t['amount'])*float(t['price']) for t in sells])
+        buy_vol_quote = pnl.buy_quote * -1
+        sell_vol_quote = pnl.sell_quote
         
         avg_buy_price = (abs(buy_vol_quote) / buy_vol_base) if buy_vol_base > 0 else 0
         avg_sell_price = (sell_vol_quote / abs(sell_vol_base)) if sell_vol_base else 0
@@ -409,11 +908,11 @@ class GridTradingBot:
         lines.append(f"Start Time: {start_str}")
         lines.append(f"Current Time: {now_str}")
         lines.append(f"Duration: {duration}")
-        lines.append(f"\nExchange: gate_io / {self.coin_name}-USDT")
+        lines.append(f"\nExchange: gate_io / {self.coin_name}-USDT ({self.account_name})")
         
         lines.append("\n  Trades:")
         lines.append(f"    {'':<20} {'buy':>10} {'sell':>10} {'total':>10}")
-        lines.append(f"    {'Number of trades':<20} {len(buys):>10} {len(sells):>10} {len(trades):>10}")
+        lines.append(f"    {'Number of trades':<20} {pnl.buy_count:>10} {pnl.sell_count:>10} {pnl.buy_count+pnl.sell_count:>10}")
         lines.append(f"    {'Total vol (COIN)':<20} {buy_vol_base:>10.4f} {sell_vol_base:>10.4f} {buy_vol_base+sell_vol_base:>10.4f}")
         lines.append(f"    {'Total vol (USDT)':<20} {buy_vol_quote:>10.2f} {sell_vol_quote:>10.2f} {total_vol_quote:>10.2f}")
         lines.append(f"    {'Avg price':<20} {avg_buy_price:>10.4f} {avg_sell_price:>10.4f} {'-':>10}")
@@ -426,7 +925,46 @@ class GridTradingBot:
         lines.append(f"    {'Current portfolio value':<25} {cur_usdt:>10.2f} USDT")
         lines.append(f"    {'Fees paid':<25} {self.total_fees_paid:>10.4f} USDT")
         lines.append(f"    {'Total PnL':<25} {total_pnl:>10.4f} USDT")
+        lines.append(f"    {'Realized PnL (gross)':<25} {pnl.realized:>10.4f} USDT")
+        lines.append(f"    {'Unrealized PnL':<25} {pnl.unrealized:>10.4f} USDT")
+        lines.append(f"    {'Net PnL (fills)':<25} {pnl.net_pnl:>10.4f} USDT")
         lines.append(f"    {'Return %':<25} {return_pct:>10.2f} %")
+
+        if self.ws_failed_channels:
+            lines.append("\n  WS Subscriptions Rejected (retried on reconnect):")
+            lines.extend(f"    {c:<25} {e}" for c, e in self.ws_failed_channels.items())
+
+        if self.rest_transport:
+            lines.append("\n  REST Pools:")
+            lines.extend(self.rest_transport.report_lines())
+
+        if self.contract_rules:
+            lines.append("\n  Order Pre-validation:")
+            lines.extend(self.contract_rules.report_lines())
+
+        broker = getattr(self.exchange, "rate_broker", None)
+        if broker:
+            lines.append("\n  Shared Rate Limit:")
+            lines.extend(broker.report_lines())
+
+        if self.ws_orders:
+            lines.append("\n  WS Orders:")
+            lines.extend(self.ws_orders.report_lines())
+
+        if self.recorder:
+            lines.append("\n  Data Export:")
+            lines.extend(self.recorder.report_lines())
+
+        lines.append("\n  Strategy Mailbox:")
+        lines.extend(self.mailbox.report_lines())
+
+        lines.append("\n  Event Loop:")
+        lines.extend(self.loop_monitor.report_lines())
+
+        if self.feed_racer:
+            lines.append("\n  Market Feeds:")
+            lines.extend(self.feed_racer.report_lines())
+        lines.extend(self._strategy_report_lines())
         lines.append("="*50 + "\n")
 
         # Log block
@@ -435,34 +973,161 @@ class GridTradingBot:
     async def cancel_orders_for_side(self, position_side, for_tp=False):
         try:
             orders = await self.exchange.fetch_open_orders(self.ccxt_symbol)
+            targets = []
             for order in orders:
                 is_reduce = order['reduceOnly']
                 side = order['side']
                 if position_side == 'long':
                     if for_tp:
-                        if is_reduce and side == 'sell': await self.cancel_order(order['id'])
+                        if is_reduce and side == 'sell': targets.append(order['id'])
                     else:
-                        if not is_reduce and side == 'buy': await self.cancel_order(order['id'])
+                        if not is_reduce and side == 'buy': targets.append(order['id'])
                 elif position_side == 'short':
                     if for_tp:
-                        if is_reduce and side == 'buy': await self.cancel_order(order['id'])
+                        if is_reduce and side == 'buy': targets.append(order['id'])
                     else:
-                        if not is_reduce and side == 'sell': await self.cancel_order(order['id'])
+                        if not is_reduce and side == 'sell': targets.append(order['id'])
+            # A whole ladder side is cancelled concurrently, not one round-trip per level
+            await asyncio.gather(*(self.cancel_order(oid) for oid in targets))
         except Exception as e:
             logger.error(f"Cancel Side Error: {e}")
 
+    def _side_orders(self, position_side, for_tp):
+        """Resting orders of one ladder: entries (buy long / sell short) or TPs (reduce-only closes)."""
+        side = ('buy' if position_side == 'long' else 'sell') if not for_tp else ('sell' if position_side == 'long' else 'buy')
+        return {oid: o for oid, o in self.open_orders.items() if o["side"] == side and bool(o["reduce_only"]) == for_tp}
+
+    async def requote_side(self, position_side, for_tp, orders):
+        """
+        Moves one ladder to orders ([(side, price, quantity, is_reduce_only, position_side)]):
+        resting orders whose price and size already match a wanted level are kept (queue
+        position too), the rest are cancelled and only the missing levels are placed.
+        """
+        wanted = []
+        for side, price, quantity, is_reduce_only, ps in orders:
+            v = self._vet_order(side, price, quantity, is_reduce_only)
+            if v is not None: wanted.append((side, v[0], v[1], is_reduce_only, ps))
+        resting = self._side_orders(position_side, for_tp)
+        keep, missing = set(), []
+        for order in wanted:
+            match = next((oid for oid, o in resting.items() if oid not in keep
+                          and round(o["price"] - order[1], self.price_precision) == 0
+                          and abs(o["left"] - order[2]) < 1e-9), None)
+            if match is None: missing.append(order)
+            else: keep.add(match)
+        stale = [oid for oid in resting if oid not in keep]
+        await asyncio.gather(*(self.cancel_order(oid) for oid in stale))
+        for oid in stale: self.open_orders.pop(oid, None) # Don't match against it again before its push lands
+        if missing: await self.place_orders(missing)
+
     async def cancel_order(self, order_id):
-        try: await self.exchange.cancel_order(order_id, self.ccxt_symbol)
+        if self.ws_orders and self.ws_orders.ready:
+            try:
+                await self.ws_orders.cancel_order(order_id)
+                return
+            except WsApiError: return # e.g. already filled / cancelled
+            except (WsTransportError, WsOrderTimeout) as e:
+                logger.warning(f"WS Cancel failed ({e}), REST fallback")
+        try:
+            with request_class("order"), rate_priority():
+                await self.exchange.cancel_order(order_id, self.ccxt_symbol)
         except: pass
 
+    def _ws_order_param(self, side, price, quantity, is_reduce_only):
+        # Already lot-snapped by _vet_order; snap again rather than truncate whatever reaches here unvetted
+        size = self.contract_rules.snap_size(quantity) if self.contract_rules else int(quantity + SNAP_EPS)
+        return {
+            "contract": self.ws_symbol,
+            "size": size if side == 'buy' else -size,
+            "price": f"{price:.{self.price_precision}f}",
+            "tif": "gtc",
+            "reduce_only": bool(is_reduce_only),
+            "text": "t-nm",
+        }
+
+    def _vet_order(self, side, price, quantity, is_reduce_only):
+        """Snap / validate against the contract rules locally; None means the exchange would reject it."""
+        if self.contract_rules is None: return price, quantity
+        position = (self.long_position if side == 'sell' else self.short_position) if is_reduce_only else None
+        return self.contract_rules.check(side, price, quantity, is_reduce_only,
+                                         self.mark_price or self.latest_price, position)
+
     async def place_order(self, side, price, quantity, is_reduce_only=False, position_side=None):
+        vetted = self._vet_order(side, price, quantity, is_reduce_only)
+        if vetted is None: return
+        await self._send_order(side, *vetted, is_reduce_only, position_side)
+
+    async def _send_order(self, side, price, quantity, is_reduce_only, position_side):
+        if self.ws_orders and self.ws_orders.ready:
+            try:
+                res = await self.ws_orders.place_order(self._ws_order_param(side, price, quantity, is_reduce_only))
+                if isinstance(res, dict): self._remember_reduce_only(res.get("id"), is_reduce_only)
+                return
+            except WsApiError as e:
+                logger.error(f"Order Error ({side} @ {price}): {e}")
+                return
+            except WsOrderTimeout as e:
+                # Outcome unknown: resending could double the position; next refresh reconciles
+                logger.warning(f"WS Order unconfirmed ({side} @ {price}): {e}")
+                return
+            except WsTransportError as e:
+                logger.warning(f"WS Order not sent ({e}), REST fallback")
         try:
-            params = {'reduce_only': is_reduce_only}
-            if position_side:
-                params['positionSide'] = position_side.lower()
-            await self.exchange.create_order(self.ccxt_symbol, 'limit', side, quantity, price, params)
+            params = self._rest_order_params(is_reduce_only, position_side)
+            with request_class("order"), rate_priority(is_reduce_only):
+                res = await self.exchange.create_order(self.ccxt_symbol, 'limit', side, quantity, price, params)
+            self._remember_reduce_only((res or {}).get("id"), is_reduce_only)
         except ccxt.BaseError as e:
             logger.error(f"Order Error ({side} @ {price}): {e}")
 
+    def _rest_order_params(self, is_reduce_only, position_side):
+        params = {'reduce_only': is_reduce_only}
+        if position_side:
+            params['positionSide'] = position_side.lower()
+        return params
+
+    async def place_orders(self, orders):
+        """orders: [(side, price, quantity, is_reduce_only, position_side)], sent as batches of ORDER_BATCH_MAX."""
+        vetted = []
+        for side, price, quantity, is_reduce_only, position_side in orders:
+            v = self._vet_order(side, price, quantity, is_reduce_only)
+            if v is not None: vetted.append((side, v[0], v[1], is_reduce_only, position_side))
+        orders = vetted
+        if not orders: return
+        if len(orders) == 1:
+            await self._send_order(*orders[0])
+            return
+        batches = [orders[i:i + ORDER_BATCH_MAX] for i in range(0, len(orders), ORDER_BATCH_MAX)]
+        await asyncio.gather(*(self._place_batch(b) for b in batches))
+
+    async def _place_batch(self, batch):
+        if self.ws_orders and self.ws_orders.ready:
+            try:
+                results = await self.ws_orders.batch_place([self._ws_order_param(s, p, q, ro) for s, p, q, ro, _ in batch])
+                for (side, price, _, ro, _), r in zip(batch, results or []):
+                    if not isinstance(r, dict): continue
+                    if r.get("succeeded") is False:
+                        logger.error(f"Order Error ({side} @ {price}): {r.get('label')} {r.get('message', '')}")
+                    else:
+                        self._remember_reduce_only(r.get("id"), ro)
+                return
+            except WsApiError as e:
+                logger.error(f"Batch Order Error ({len(batch)} orders): {e}")
+                return
+            except WsOrderTimeout as e:
+                logger.warning(f"WS Batch unconfirmed ({len(batch)} orders): {e}")
+                return
+            except WsTransportError as e:
+                logger.warning(f"WS Batch not sent ({e}), REST fallback")
+        try:
+            requests = [{"symbol": self.ccxt_symbol, "type": "limit", "side": s, "amount": q, "price": p,
+                         "params": self._rest_order_params(ro, ps)} for s, p, q, ro, ps in batch]
+            with request_class("order"), rate_priority(all(o[3] for o in batch)):
+                results = await self.exchange.create_orders(requests)
+            for (_, _, _, ro, _), r in zip(batch, results or []):
+                if isinstance(r, dict): self._remember_reduce_only(r.get("id"), ro)
+        except ccxt.BaseError as e:
+            logger.error(f"Batch Order Error ({len(batch)} orders): {e}")
+
     # Abstract methods
     async def adjust_grid_strategy(self): pass
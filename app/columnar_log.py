@@ -0,0 +1,146 @@
+import os
+import time
+import queue
+import atexit
+import logging
+import threading
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError: # Optional: recording is disabled without it
+    pa = pq = None
+
+logger = logging.getLogger("Columnar_Log")
+
+COLUMNAR_DIR = "log/columnar"
+COLUMNAR_BATCH_ROWS = 5000        # Hand a batch to the writer at this many rows...
+COLUMNAR_FLUSH_INTERVAL = 60      # ...or this often (s)
+COLUMNAR_ROTATE_INTERVAL = 900    # New file per table this often (s); a crash loses at most the open file
+COLUMNAR_QUEUE_MAX = 64           # Batches waiting for the writer before new ones are dropped
+
+# Table -> ((column, arrow type), ...)
+TABLES = {
+    "fills": (("ts", "float64"), ("side", "string"), ("amount", "float64"), ("price", "float64"),
+              ("fee", "float64"), ("reduce_only", "bool_"), ("order_id", "string")),
+    "quotes": (("ts", "float64"), ("price", "float64"), ("reserve_price", "float64"), ("bid", "float64"),
+               ("ask", "float64"), ("inventory", "float64"), ("gamma", "float64"), ("sigma", "float64"),
+               ("eta", "float64"), ("rsi", "float64"), ("trend_alpha", "float64"), ("funding_rate", "float64"),
+               ("ofi", "float64")),
+    "ucb": (("ts", "float64"), ("arm", "float64"), ("reward", "float64"), ("count", "int64"), ("value", "float64"),
+            ("selected", "bool_"), ("shadow", "bool_"), ("sigma", "float64"), ("rsi", "float64"),
+            ("funding_rate", "float64"), ("shadow_reward", "float64")),
+}
+
+
+def load_table(table, directory=COLUMNAR_DIR):
+    """All finished files of one table as a single pyarrow Table (e.g. .to_pandas() for analysis)."""
+    return pq.read_table(os.path.join(directory, table))
+
+
+class ColumnarRecorder:
+    """
+    Buffers rows column-wise in memory (one list per column, no per-row objects
+    kept) and hands full batches to a background thread, which writes them as
+    Parquet row groups. Files rotate every COLUMNAR_ROTATE_INTERVAL; the file being
+    written is hidden (dot-prefixed) and renamed when closed, so load_table()
+    only ever sees complete files.
+    """
+
+    def __init__(self, name, directory=COLUMNAR_DIR):
+        self.name = name
+        self.directory = directory
+        self.enabled = pa is not None
+        self.rows_written = 0
+        self.batches_dropped = 0
+        if not self.enabled:
+            logger.warning("pyarrow not installed: columnar fill / quote / UCB log disabled")
+            return
+
+        self.schemas = {t: pa.schema([(c, getattr(pa, typ)()) for c, typ in cols]) for t, cols in TABLES.items()}
+        self._buffers = {t: {c: [] for c, _ in cols} for t, cols in TABLES.items()}
+        self._rows = {t: 0 for t in TABLES}
+        self._last_flush = time.time()
+        self._queue = queue.Queue(maxsize=COLUMNAR_QUEUE_MAX)
+        self._writers = {}    # table -> (ParquetWriter, hidden path, final path, opened at)
+        self._thread = threading.Thread(target=self._writer_loop, name="columnar-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def record(self, table, **row):
+        if not self.enabled: return
+        cols = self._buffers[table]
+        for c, values in cols.items():
+            values.append(row.get(c))
+        self._rows[table] += 1
+        if self._rows[table] >= COLUMNAR_BATCH_ROWS or time.time() - self._last_flush >= COLUMNAR_FLUSH_INTERVAL:
+            self.flush()
+
+    def flush(self):
+        if not self.enabled: return
+        self._last_flush = time.time()
+        for table, cols in self._buffers.items():
+            if not self._rows[table]: continue
+            self._buffers[table] = {c: [] for c in cols}
+            self._rows[table] = 0
+            try:
+                self._queue.put_nowait((table, cols))
+            except queue.Full:
+                self.batches_dropped += 1
+
+    # ---------- Writer thread ----------
+    def _writer_loop(self):
+        while True:
+            try:
+                item = self._queue.get(timeout=COLUMNAR_FLUSH_INTERVAL)
+            except queue.Empty:
+                item = None
+            try:
+                if item is StopIteration:
+                    self._close_writers()
+                    return
+                if item is not None:
+                    table, cols = item
+                    self._write(table, pa.Table.from_pydict(cols, schema=self.schemas[table]))
+                self._rotate_due()
+            except Exception as e:
+                logger.error(f"Columnar Write Error: {e}")
+
+    def _write(self, table, batch):
+        entry = self._writers.get(table)
+        if entry is None:
+            folder = os.path.join(self.directory, table)
+            os.makedirs(folder, exist_ok=True)
+            fname = f"{table}-{self.name}-{time.strftime('%Y%m%d-%H%M%S')}.parquet"
+            hidden, final = os.path.join(folder, "." + fname), os.path.join(folder, fname)
+            entry = (pq.ParquetWriter(hidden, self.schemas[table], compression="zstd"), hidden, final, time.time())
+            self._writers[table] = entry
+        entry[0].write_table(batch)
+        self.rows_written += batch.num_rows
+
+    def _rotate_due(self):
+        now = time.time()
+        for table, (writer, hidden, final, opened) in list(self._writers.items()):
+            if now - opened >= COLUMNAR_ROTATE_INTERVAL:
+                self._close_writer(table)
+
+    def _close_writer(self, table):
+        writer, hidden, final, _ = self._writers.pop(table)
+        writer.close()
+        os.replace(hidden, final)
+
+    def _close_writers(self):
+        for table in list(self._writers):
+            self._close_writer(table)
+
+    def close(self):
+        """Flush what is buffered and finish the open files."""
+        if not self.enabled or not self._thread.is_alive(): return
+        self.flush()
+        self._queue.put(StopIteration)
+        self._thread.join(timeout=10)
+
+    def report_lines(self):
+        if not self.enabled: return [f"    {'Columnar log':<25} disabled (pyarrow missing)"]
+        buffered = sum(self._rows.values())
+        return [f"    {'Columnar rows written':<25} {self.rows_written} (buffered {buffered}, dropped batches {self.batches_dropped})"]
@@ -0,0 +1,200 @@
+import math
+import random
+import logging
+import argparse
+
+import numpy as np
+
+logger = logging.getLogger("Contextual_Bandit")
+
+LINUCB_ALPHA = 1.0          # Exploration width, in units of the running reward RMS
+LINUCB_RIDGE = 1.0          # Prior precision (A starts at ridge * I)
+SIGMA_REF = 0.01            # Context scaling: sigma (1h log-return std) of 1% -> 1.0
+FUNDING_REF = 0.0005        # Context scaling: funding rate of 0.05% -> 1.0
+REPLAY_INTERVAL_GAP = 1.0   # ucb rows closer than this (s) belong to the same interval
+
+
+def context_vector(sigma, rsi, funding_rate):
+    """[bias, volatility, RSI lean, funding] scaled to roughly unit range (non-finite inputs -> neutral)."""
+    if not math.isfinite(sigma): sigma = SIGMA_REF
+    if not math.isfinite(rsi): rsi = 50.0
+    if not math.isfinite(funding_rate): funding_rate = 0.0
+    return np.array([
+        1.0,
+        min(max(sigma / SIGMA_REF, 0.0), 5.0),
+        (rsi - 50.0) / 50.0,
+        min(max(funding_rate / FUNDING_REF, -3.0), 3.0),
+    ])
+
+
+CONTEXT_DIM = 4
+
+
+class LinUCBManager:
+    """
+    Disjoint LinUCB over gamma arms, conditioned on the market context the bot
+    already computes (sigma, RSI, funding). Each arm keeps a ridge regression of
+    reward on the context; inverses are maintained with Sherman-Morrison and all
+    arms are scored in one batched einsum. Drop-in for UCBManager: same counts /
+    values / current_arm, select_arm(context), update(reward, arm, context).
+    """
+
+    def __init__(self, arms=None, alpha=LINUCB_ALPHA, ridge=LINUCB_RIDGE):
+        self.arms = list(arms) if arms is not None else [0.1, 0.3, 0.5, 0.7, 0.9]
+        self.alpha = alpha
+        k, d = len(self.arms), CONTEXT_DIM
+        self.A_inv = np.repeat(np.eye(d)[None] / ridge, k, axis=0) # (K, d, d)
+        self.b = np.zeros((k, d))                                   # (K, d)
+        self.reward_sq = 0.0     # Sum of squared rewards -> RMS scales the exploration bonus
+        self.counts = {arm: 0 for arm in self.arms}
+        self.values = {arm: 0.0 for arm in self.arms}
+        self.total_counts = 0
+        self.current_arm = random.choice(self.arms)
+        self.last_arm = self.current_arm
+
+    def _scores(self, x):
+        theta = np.einsum("kij,kj->ki", self.A_inv, self.b)
+        width = np.sqrt(np.einsum("i,kij,j->k", x, self.A_inv, x))
+        rms = math.sqrt(self.reward_sq / self.total_counts) if self.total_counts else 1.0
+        return theta @ x + self.alpha * rms * width
+
+    def select_arm(self, context=None):
+        untried = [arm for arm in self.arms if self.counts[arm] == 0]
+        if untried:
+            self.current_arm = random.choice(untried)
+            logger.info(f"[LinUCB] Cold Start: Trying Gamma={self.current_arm}")
+            return self.current_arm
+
+        x = context if context is not None else context_vector(SIGMA_REF, 50.0, 0.0)
+        scores = self._scores(x)
+        best = random.choice(np.flatnonzero(scores == scores.max()).tolist()) # Random tie-break
+        self.last_arm = self.current_arm
+        self.current_arm = self.arms[best]
+        logger.info(f"[LinUCB] Selected Gamma={self.current_arm} (Score={scores[best]:.4f}, ctx={np.round(x[1:], 2).tolist()})")
+        return self.current_arm
+
+    def update_many(self, rewards, context=None):
+        """rewards: {arm: reward} observed under one context; one batched rank-1 update for all of them."""
+        if not rewards: return
+        x = context if context is not None else context_vector(SIGMA_REF, 50.0, 0.0)
+        idx = np.array([self.arms.index(a) for a in rewards])
+        r = np.array(list(rewards.values()), dtype=np.float64)
+        Ax = self.A_inv[idx] @ x                                    # (m, d)
+        self.A_inv[idx] -= np.einsum("mi,mj->mij", Ax, Ax) / (1.0 + Ax @ x)[:, None, None]
+        self.b[idx] += r[:, None] * x
+        self.reward_sq += float(r @ r)
+        for arm, reward in rewards.items():
+            self.counts[arm] += 1
+            self.total_counts += 1
+            self.values[arm] += (reward - self.values[arm]) / self.counts[arm]
+
+    def update(self, reward, arm=None, context=None):
+        if arm is None: arm = self.current_arm
+        self.update_many({arm: reward}, context)
+        logger.info(f"[LinUCB] Updated Gamma={arm} | Reward={reward:.4f} | Avg={self.values[arm]:.4f} | Count={self.counts[arm]}")
+
+    def to_dict(self):
+        return {"arms": self.arms, "counts": [self.counts[a] for a in self.arms],
+                "values": [self.values[a] for a in self.arms], "total_counts": self.total_counts,
+                "current_arm": self.current_arm, "A_inv": self.A_inv.tolist(), "b": self.b.tolist(),
+                "reward_sq": self.reward_sq}
+
+    def load_dict(self, d):
+        """Restore stats for arms that still exist; a plain UCBManager dict restores counts / values only."""
+        A_inv, b = d.get("A_inv"), d.get("b")
+        for i, (arm, n, v) in enumerate(zip(d["arms"], d["counts"], d["values"])):
+            if arm not in self.counts: continue
+            j = self.arms.index(arm)
+            self.counts[arm] = n
+            self.values[arm] = v
+            if A_inv is not None:
+                self.A_inv[j] = A_inv[i]
+                self.b[j] = b[i]
+        self.total_counts = sum(self.counts.values())
+        self.reward_sq = d.get("reward_sq", sum(n * v * v for n, v in zip(d["counts"], d["values"])))
+        if d.get("current_arm") in self.counts:
+            self.current_arm = self.last_arm = d["current_arm"]
+
+
+# ---------- Offline replay ----------
+def intervals_from_rows(rows):
+    """
+    Group ucb table rows (dicts: ts, arm, reward, shadow, selected, sigma, rsi,
+    funding_rate) into intervals: [(context, {arm: reward}, logged selected arm)].
+    Shadow intervals carry a reward for every arm; live-only ones just the traded arm.
+    """
+    out, cur, last_ts = [], None, None
+    for row in sorted(rows, key=lambda r: r["ts"]):
+        if cur is None or row["ts"] - last_ts > REPLAY_INTERVAL_GAP:
+            cur = [context_vector(row["sigma"], row["rsi"], row["funding_rate"]), {}, None]
+            out.append(cur)
+        cur[1][row["arm"]] = row["reward"]
+        if row.get("selected"): cur[2] = row["arm"]
+        last_ts = row["ts"]
+    return [tuple(i) for i in out]
+
+
+def replay(policy, intervals, full_feedback=False):
+    """
+    Replays logged intervals through a policy (UCBManager or LinUCBManager).
+    Intervals with every arm's reward (shadow logs) are evaluated exactly: the
+    policy earns its chosen arm's reward and regret is against the best arm of
+    that interval. With full_feedback it learns from all arms, otherwise only from
+    the arm it chose. Live-only intervals use rejection replay: they count only
+    when the policy picks the arm that was actually traded.
+    """
+    total = regret = 0.0
+    used = best_hits = 0
+    for x, rewards, logged in intervals:
+        arm = policy.select_arm(x)
+        if len(rewards) == len(policy.arms):
+            r = rewards[arm]
+            best = max(rewards.values())
+            regret += best - r
+            best_hits += r == best
+            if full_feedback: policy.update_many(rewards, x)
+            else: policy.update(r, arm, x)
+        elif arm == logged and arm in rewards:
+            r = rewards[arm]
+            policy.update(r, arm, x)
+        else:
+            continue
+        total += r
+        used += 1
+    return {"intervals": used, "reward": total, "regret": regret,
+            "best_arm_rate": best_hits / used if used else 0.0}
+
+
+def main():
+    from .ucb_manager import UCBManager
+    from .columnar_log import load_table, COLUMNAR_DIR
+
+    parser = argparse.ArgumentParser(description="Replay logged UCB intervals: UCB1 vs LinUCB")
+    parser.add_argument("--dir", default=COLUMNAR_DIR, help="Columnar log directory (ucb table)")
+    parser.add_argument("--alpha", type=float, default=LINUCB_ALPHA)
+    parser.add_argument("--full-feedback", action="store_true", help="Learn from every arm's shadow reward")
+    parser.add_argument("--seeds", type=int, default=10, help="Runs averaged (cold-start order and ties are random)")
+    args = parser.parse_args()
+
+    rows = load_table("ucb", args.dir).to_pylist()
+    intervals = intervals_from_rows(rows)
+    arms = sorted({arm for _, rewards, _ in intervals for arm in rewards})
+    print(f"{len(rows)} rows, {len(intervals)} intervals, arms {arms}")
+
+    for name in ("UCB_Manager", "Contextual_Bandit"):
+        logging.getLogger(name).setLevel(logging.WARNING)
+    policies = {"ucb1": lambda: UCBManager(arms), "linucb": lambda: LinUCBManager(arms, alpha=args.alpha)}
+    print(f"{'policy':<8} {'intervals':>9} {'reward':>12} {'reward sd':>10} {'regret':>12} {'best arm %':>10}")
+    for name, make in policies.items():
+        runs = []
+        for seed in range(args.seeds):
+            random.seed(seed)
+            runs.append(replay(make(), intervals, args.full_feedback))
+        avg = {k: sum(r[k] for r in runs) / len(runs) for k in runs[0]}
+        sd = float(np.std([r["reward"] for r in runs]))
+        print(f"{name:<8} {avg['intervals']:>9.0f} {avg['reward']:>12.4f} {sd:>10.4f} {avg['regret']:>12.4f} "
+              f"{avg['best_arm_rate'] * 100:>9.1f}%")
+
+
+if __name__ == "__main__":
+    main()
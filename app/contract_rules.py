@@ -0,0 +1,132 @@
+import math
+import logging
+from collections import Counter
+
+logger = logging.getLogger("Contract_Rules")
+
+PRICE_BAND_MARGIN = 0.9     # Use this share of the exchange's order_price_deviate band (mark moves between checks)
+SNAP_EPS = 1e-9             # Float slack when snapping to the tick / lot grid
+
+
+def _num(value, default=None):
+    try:
+        return float(value) if value not in (None, "") else default
+    except (TypeError, ValueError):
+        return default
+
+
+class ContractRules:
+    """
+    Order rules of one contract (tick, lot, size limits, price band, leverage range),
+    precomputed once from the ccxt market entry. check() snaps an order onto the
+    tick / lot grid and validates it locally, so an order the exchange would reject
+    never costs a round-trip or a rate-limit token. Entries that break a rule are
+    dropped; reduce-only orders are clamped into range instead (a size below the
+    minimum is raised to it while the position covers it), so an exit goes out
+    whenever the exchange could accept one. Every drop is counted by reason.
+    """
+
+    __slots__ = ("symbol", "tick", "price_precision", "lot", "min_size", "max_size", "band",
+                 "leverage_min", "leverage_max", "contract_size", "checked", "adjusted", "rejects")
+
+    def __init__(self, symbol, tick, lot=1.0, min_size=1.0, max_size=None, band=None,
+                 leverage_min=1.0, leverage_max=None, contract_size=1.0):
+        self.symbol = symbol
+        self.tick = tick
+        self.price_precision = max(0, round(-math.log10(tick))) if tick > 0 else 8
+        self.lot = lot
+        self.min_size = max(min_size, lot)
+        self.max_size = max_size
+        self.band = band                # Max |price / mark - 1| the exchange accepts
+        self.leverage_min = leverage_min
+        self.leverage_max = leverage_max
+        self.contract_size = contract_size
+        self.checked = 0
+        self.adjusted = 0               # Orders whose price / size had to be snapped or clamped
+        self.rejects = Counter()        # reason -> count
+
+    @classmethod
+    def from_market(cls, market):
+        info = market.get("info") or {}
+        precision = market.get("precision") or {}
+        limits = market.get("limits") or {}
+        amount = limits.get("amount") or {}
+        leverage = limits.get("leverage") or {}
+        return cls(
+            market["symbol"],
+            tick=_num(precision.get("price"), 0.0),
+            lot=_num(precision.get("amount"), 1.0),
+            min_size=_num(amount.get("min"), 1.0),
+            max_size=_num(amount.get("max")),
+            band=_num(info.get("order_price_deviate")),
+            leverage_min=_num(leverage.get("min"), 1.0),
+            leverage_max=_num(leverage.get("max")),
+            contract_size=_num(market.get("contractSize"), 1.0),
+        )
+
+    def clamp_leverage(self, leverage):
+        lev = max(leverage, self.leverage_min or leverage)
+        if self.leverage_max: lev = min(lev, self.leverage_max)
+        return lev
+
+    def _snap_price(self, side, price):
+        # Away from the market: bids down, asks up (never turns a maker quote into a taker)
+        if self.tick <= 0: return price
+        snap = math.floor if side == 'buy' else math.ceil
+        steps = price / self.tick
+        return round(snap(steps + (SNAP_EPS if side == 'buy' else -SNAP_EPS)) * self.tick, self.price_precision)
+
+    def snap_size(self, quantity):
+        """Quantity floored onto the lot grid (an int when the lot is whole contracts)."""
+        q = math.floor(quantity / self.lot + SNAP_EPS) * self.lot
+        return int(q) if self.lot >= 1 else round(q, 8)
+
+    def _reject(self, reason):
+        self.rejects[reason] += 1
+        return None
+
+    def check(self, side, price, quantity, reduce_only=False, ref_price=None, position=None):
+        """
+        Returns the (price, quantity) to send, or None if the order must not go out.
+        ref_price is the mark price the exchange's band is measured from; position is
+        the size a reduce-only order closes (caps the min-size bump).
+        """
+        self.checked += 1
+        p = self._snap_price(side, price)
+        if ref_price and self.band:
+            lo = ref_price * (1 - self.band * PRICE_BAND_MARGIN)
+            hi = ref_price * (1 + self.band * PRICE_BAND_MARGIN)
+            if not lo <= p <= hi:
+                if not reduce_only: return self._reject("price_band")
+                p = self._snap_price('sell', lo) if p < lo else self._snap_price('buy', hi)
+        if p <= 0: return self._reject("price")
+
+        q = self.snap_size(quantity)
+        if q < self.min_size:
+            if not reduce_only or quantity <= 0 or (position is not None and position < self.min_size):
+                return self._reject("min_size")
+            q = int(self.min_size) if self.lot >= 1 else self.min_size
+        if self.max_size and q > self.max_size:
+            if not reduce_only: return self._reject("max_size")
+            q = int(self.max_size) if self.lot >= 1 else self.max_size
+
+        if p != price or q != quantity: self.adjusted += 1
+        return p, q
+
+    def report_lines(self):
+        lines = [f"    {'Orders checked / adjusted':<25} {self.checked} / {self.adjusted}"]
+        rejects = ", ".join(f"{k}={v}" for k, v in self.rejects.most_common()) or "none"
+        lines.append(f"    {'Rejected locally':<25} {sum(self.rejects.values())} ({rejects})")
+        return lines
+
+
+def build_rule_table(markets):
+    """{symbol: ContractRules} for every swap contract in a ccxt markets dict (load_markets result)."""
+    table = {}
+    for symbol, market in markets.items():
+        if not market.get("swap"): continue
+        try:
+            table[symbol] = ContractRules.from_market(market)
+        except Exception as e:
+            logger.warning(f"Skipping rules for {symbol}: {e}")
+    return table
@@ -0,0 +1,88 @@
+import time
+import logging
+
+logger = logging.getLogger("Feed_Racer")
+
+# Channels raced across redundant connections: only those whose updates carry an exchange
+# sequence (book_ticker: order book update id "u"). Tickers only have a timestamp, which
+# differs per connection, so they are not raced and come from the primary socket alone.
+RACED_CHANNELS = ("futures.book_ticker",)
+
+
+class FeedStats:
+    __slots__ = ("feed_id", "url", "messages", "wins", "duplicates", "stale",
+                 "lag_sum", "lag_max", "exch_latency_sum", "last_message_at")
+
+    def __init__(self, feed_id, url):
+        self.feed_id = feed_id
+        self.url = url
+        self.messages = 0
+        self.wins = 0
+        self.duplicates = 0        # Same update, arrived after the winner
+        self.stale = 0             # Older than an update already delivered
+        self.lag_sum = 0.0         # Seconds behind the winner (duplicates only)
+        self.lag_max = 0.0
+        self.exch_latency_sum = 0.0  # Exchange time -> local receive (wins only, ms)
+        self.last_message_at = 0.0
+
+
+class FeedRacer:
+    """
+    Deduplicates market data raced over several WebSocket connections.
+    The first copy of each update (by exchange sequence) wins, later copies
+    are dropped and only counted towards per-feed lag stats. Channels without a
+    sequence (tickers: time_ms is stamped per connection) are never raced.
+    """
+
+    def __init__(self):
+        self.feeds = {}
+        self._last_key = {}     # channel -> highest delivered sequence
+        self._first_seen = {}   # channel -> perf_counter of that delivery
+
+    def register(self, feed_id, url):
+        if feed_id not in self.feeds:
+            self.feeds[feed_id] = FeedStats(feed_id, url)
+        return self.feeds[feed_id]
+
+    @staticmethod
+    def _sequence(channel, data):
+        if channel == "futures.book_ticker":
+            return (data.get("result") or {}).get("u")
+        return None
+
+    def accept(self, feed_id, channel, data):
+        """Returns True if this copy should be delivered to the strategy."""
+        now = time.perf_counter()
+        stats = self.feeds.get(feed_id) or self.register(feed_id, None)
+        stats.messages += 1
+        stats.last_message_at = now
+
+        key = self._sequence(channel, data)
+        if key is None: return True
+        last = self._last_key.get(channel)
+
+        if last is None or key > last:
+            self._last_key[channel] = key
+            self._first_seen[channel] = now
+            stats.wins += 1
+            time_ms = data.get("time_ms")
+            if time_ms: stats.exch_latency_sum += time.time() * 1000 - time_ms
+            return True
+
+        if key == last:
+            lag = now - self._first_seen[channel]
+            stats.duplicates += 1
+            stats.lag_sum += lag
+            if lag > stats.lag_max: stats.lag_max = lag
+        else:
+            stats.stale += 1
+        return False
+
+    def report_lines(self):
+        lines = [f"    {'Feed':<10} {'msgs':>8} {'wins':>8} {'win %':>7} {'lag avg':>9} {'lag max':>9} {'exch lat':>9}"]
+        for s in self.feeds.values():
+            win_pct = (s.wins / s.messages * 100) if s.messages else 0.0
+            lag_avg = (s.lag_sum / s.duplicates * 1000) if s.duplicates else 0.0
+            exch_lat = (s.exch_latency_sum / s.wins) if s.wins else 0.0
+            lines.append(f"    {s.feed_id:<10} {s.messages:>8} {s.wins:>8} {win_pct:>6.1f}% {lag_avg:>7.1f}ms {s.lag_max*1000:>7.1f}ms {exch_lat:>7.1f}ms")
+        return lines
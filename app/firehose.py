@@ -0,0 +1,321 @@
+import time
+import json
+import random
+import asyncio
+import argparse
+import multiprocessing as mp
+
+import numpy as np
+import websockets
+
+from .bot import logger, WS_CHANNELS
+from .avellaneda_bot import AvellanedaGridBot, COIN_NAME, GRID_SPACING, INITIAL_QUANTITY, LEVERAGE, TAKE_PROFIT_SPACING
+
+# Default offered load (msgs/s per channel) and burst shape
+FIREHOSE_RATES = {"futures.tickers": 10, "futures.book_ticker": 200, "futures.trades": 100,
+                  "futures.order_book_update": 100, "futures.orders": 2, "futures.usertrades": 1,
+                  "futures.positions": 1, "futures.balances": 1}
+FIREHOSE_TICK = 0.001           # Generator pacing step (s)
+FIREHOSE_MAX_BUFFER = 1 << 20   # Server drops frames while this much is unsent to a slow client (bytes)
+STALE_AFTER = 0.1               # Market data older than this when handled counts as stale (s)
+REST_LATENCY = 0.05             # Simulated exchange round-trip (s), +/-50% jitter
+SEQUENCED = ("futures.book_ticker", "futures.order_book_update")
+
+
+# ---------- Generator (own process, so it never competes with the bot's loop) ----------
+class FrameFactory:
+    """Gate.io-shaped frames on a random-walk price; every frame carries its send time in time_ms."""
+
+    def __init__(self, contract, price=0.5):
+        self.contract = contract
+        self.price = price
+        self.tick = 0.0001
+        self.seq = {ch: 0 for ch in SEQUENCED}
+        self.trade_id = 0
+        self.order_id = 0
+
+    def frame(self, channel):
+        now = time.time()
+        ms = int(now * 1000)
+        self.price = max(self.tick, self.price * (1 + random.gauss(0, 0.00005)))
+        p = round(self.price, 4)
+        bid, ask = f"{p - self.tick:.4f}", f"{p + self.tick:.4f}"
+        c = self.contract
+
+        if channel in self.seq:
+            self.seq[channel] += 1
+        if channel == "futures.tickers":
+            result = [{"contract": c, "last": f"{p:.4f}", "mark_price": f"{p:.4f}", "funding_rate": "0.0001"}]
+        elif channel == "futures.book_ticker":
+            result = {"t": ms, "u": self.seq[channel], "s": c, "b": bid, "B": random.randint(1, 5000),
+                      "a": ask, "A": random.randint(1, 5000)}
+        elif channel == "futures.order_book_update":
+            u = self.seq[channel]
+            result = {"t": ms, "s": c, "U": u, "u": u,
+                      "b": [{"p": bid, "s": random.randint(0, 5000)}], "a": [{"p": ask, "s": random.randint(0, 5000)}]}
+        elif channel == "futures.trades":
+            self.trade_id += 1
+            result = [{"id": self.trade_id, "create_time": int(now), "create_time_ms": ms, "contract": c,
+                       "price": f"{p:.4f}", "size": random.choice((-1, 1)) * random.randint(1, 200)}]
+        elif channel == "futures.orders":
+            self.order_id += 1
+            result = [{"id": self.order_id, "contract": c, "size": random.choice((-1, 1)), "left": 1, "price": f"{p:.4f}",
+                       "is_reduce_only": False, "status": "open", "finish_as": "_new"}]
+        elif channel == "futures.usertrades":
+            result = [{"id": str(self.trade_id), "order_id": str(self.order_id), "contract": c, "size": random.choice((-1, 1)),
+                       "price": f"{p:.4f}", "fee": 0.0001, "create_time_ms": ms}]
+        elif channel == "futures.positions":
+            result = [{"contract": c, "mode": random.choice(("dual_long", "dual_short")), "size": 0, "entry_price": f"{p:.4f}"}]
+        else:
+            result = [{"currency": "USDT", "balance": "1000", "change": "0"}]
+        return json.dumps({"time": int(now), "time_ms": ms, "channel": channel, "event": "update", "result": result})
+
+
+async def _stream(websocket, subscribed, rates, duration, burst_every, burst_len, burst_x, stats):
+    factory = FrameFactory(subscribed["contract"])
+    credit = {ch: 0.0 for ch in rates}
+    started = last = time.perf_counter()
+    while True:
+        now = time.perf_counter()
+        if now - started >= duration: break
+        dt, last = now - last, now
+        stats["max_pacing_gap"] = max(stats["max_pacing_gap"], dt)
+        mult = burst_x if burst_every and (now - started) % burst_every < burst_len else 1.0
+        for ch, rate in rates.items():
+            if ch not in subscribed["channels"]: continue
+            credit[ch] += rate * mult * dt
+            while credit[ch] >= 1:
+                credit[ch] -= 1
+                frame = factory.frame(ch)
+                if websocket.transport.get_write_buffer_size() > FIREHOSE_MAX_BUFFER:
+                    stats["dropped"][ch] = stats["dropped"].get(ch, 0) + 1 # Slow consumer: the exchange sheds load
+                    continue
+                await websocket.send(frame)
+                stats["sent"][ch] = stats["sent"].get(ch, 0) + 1
+        await asyncio.sleep(FIREHOSE_TICK)
+
+
+async def _serve(port_q, stats_q, rates, duration, burst_every, burst_len, burst_x):
+    done = asyncio.get_running_loop().create_future()
+
+    async def handler(websocket):
+        subscribed = {"channels": set(), "contract": ""}
+        stats = {"sent": {}, "dropped": {}, "max_pacing_gap": 0.0}
+
+        async def read_subs():
+            async for message in websocket:
+                req = json.loads(message)
+                if req.get("event") != "subscribe": continue
+                subscribed["channels"].add(req["channel"])
+                subscribed["contract"] = req["payload"][0]
+                await websocket.send(json.dumps({"time": int(time.time()), "channel": req["channel"],
+                                                 "event": "subscribe", "result": {"status": "success"}}))
+
+        reader = asyncio.create_task(read_subs())
+        await asyncio.sleep(0.5) # Let the client subscribe
+        try:
+            await _stream(websocket, subscribed, rates, duration, burst_every, burst_len, burst_x, stats)
+        finally:
+            reader.cancel()
+            if not done.done(): done.set_result(stats)
+
+    async with websockets.serve(handler, "127.0.0.1", 0, max_size=None) as server:
+        port_q.put(server.sockets[0].getsockname()[1])
+        stats_q.put(await done)
+
+
+def _server_process(port_q, stats_q, rates, duration, burst_every, burst_len, burst_x):
+    asyncio.run(_serve(port_q, stats_q, rates, duration, burst_every, burst_len, burst_x))
+
+
+# ---------- Bot side ----------
+class SimulatedExchange:
+    """Just enough of the ccxt surface the receive path touches, with REST-like latency."""
+
+    def __init__(self, bot, latency=REST_LATENCY):
+        self.bot = bot
+        self.latency = latency
+        self.orders = {}
+        self.next_id = 0
+        self.calls = 0
+
+    async def _rtt(self):
+        self.calls += 1
+        await asyncio.sleep(self.latency * random.uniform(0.5, 1.5))
+
+    async def fetch_positions(self, params=None):
+        await self._rtt()
+        return []
+
+    async def fetch_open_orders(self, symbol=None):
+        await self._rtt()
+        return list(self.orders.values())
+
+    async def fetch_balance(self, params=None):
+        await self._rtt()
+        return {"USDT": {"total": 1000.0}}
+
+    async def create_order(self, symbol, type, side, amount, price=None, params=None):
+        await self._rtt()
+        return self._add_order(side, amount, params)
+
+    def _add_order(self, side, amount, params):
+        self.next_id += 1
+        oid = str(self.next_id)
+        self.orders[oid] = {"id": oid, "side": side, "reduceOnly": bool((params or {}).get("reduce_only")),
+                            "info": {"left": str(amount)}}
+        return self.orders[oid]
+
+    async def create_orders(self, orders, params=None):
+        await self._rtt()
+        return [self._add_order(o["side"], o["amount"], o.get("params")) for o in orders]
+
+    async def cancel_order(self, order_id, symbol=None):
+        await self._rtt()
+        self.orders.pop(str(order_id), None)
+
+    async def cancel_all_orders(self, symbol=None):
+        await self._rtt()
+        self.orders.clear()
+
+    async def public_futures_get_settle_order_book(self, params=None):
+        await self._rtt()
+        # Snapshot "taken" just before the oldest buffered diff, so the book can chain
+        buffered = self.bot.order_book._buffer
+        first = int(buffered[0]["U"]) - 1 if buffered else 0
+        return {"id": first, "bids": [], "asks": []}
+
+    async def close(self):
+        pass
+
+
+class ReceiveProbe:
+    """
+    Wraps bot._dispatch (the parsed-dict router, after the bot's own single JSON decode):
+    queueing delay at dispatch, end-to-end at handler return.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.inner = bot._dispatch
+        self.processed = {}
+        self.stale = {}
+        self.gaps = {}
+        self.last_seq = {}
+        self.queue_delay = []
+        self.e2e = {}
+        self.first_at = self.last_at = None
+        bot._dispatch = self.dispatch
+
+    async def dispatch(self, data, feed_id="primary"):
+        t0 = time.time()
+        sent_ms = data.get("time_ms")
+        if data.get("event") != "update" or sent_ms is None:
+            return await self.inner(data, feed_id)
+
+        ch = data["channel"]
+        delay = t0 - sent_ms / 1000
+        self.queue_delay.append(delay)
+        if ch in SEQUENCED:
+            seq = data["result"]["u"]
+            prev = self.last_seq.get(ch)
+            if prev is not None and seq > prev + 1: self.gaps[ch] = self.gaps.get(ch, 0) + seq - prev - 1
+            self.last_seq[ch] = seq
+        if ch in ("futures.tickers", "futures.book_ticker", "futures.order_book_update") and delay > STALE_AFTER:
+            self.stale[ch] = self.stale.get(ch, 0) + 1
+
+        await self.inner(data, feed_id)
+        t1 = time.time()
+        self.processed[ch] = self.processed.get(ch, 0) + 1
+        self.e2e.setdefault(ch, []).append(t1 - sent_ms / 1000)
+        if self.first_at is None: self.first_at = t0
+        self.last_at = t1
+
+
+def _pct(values, q):
+    return float(np.percentile(values, q)) * 1000 if values else 0.0
+
+
+def report(probe, server_stats, duration, loop_monitor):
+    elapsed = max(1e-9, (probe.last_at or 0) - (probe.first_at or 0))
+    total = sum(probe.processed.values())
+    sent = sum(server_stats["sent"].values())
+    dropped = sum(server_stats["dropped"].values())
+    lines = ["\n" + "=" * 78,
+             f"Firehose: {duration:.0f}s | offered {(sent + dropped) / duration:,.0f} msg/s | "
+             f"handled {total / elapsed:,.0f} msg/s sustained",
+             f"Queueing delay p50 / p99 / max: {_pct(probe.queue_delay, 50):.1f} / {_pct(probe.queue_delay, 99):.1f} / "
+             f"{max(probe.queue_delay, default=0) * 1000:.1f} ms",
+             f"Generator max pacing gap: {server_stats['max_pacing_gap'] * 1000:.1f} ms",
+             "",
+             f"{'channel':<28} {'sent':>8} {'dropped':>8} {'handled':>8} {'gaps':>6} {'stale':>7} "
+             f"{'e2e p50':>8} {'p99':>8} {'p99.9':>8} (ms)"]
+    for ch in WS_CHANNELS:
+        e2e = probe.e2e.get(ch, [])
+        lines.append(f"{ch:<28} {server_stats['sent'].get(ch, 0):>8} {server_stats['dropped'].get(ch, 0):>8} "
+                     f"{probe.processed.get(ch, 0):>8} {probe.gaps.get(ch, 0):>6} {probe.stale.get(ch, 0):>7} "
+                     f"{_pct(e2e, 50):>8.1f} {_pct(e2e, 99):>8.1f} {_pct(e2e, 99.9):>8.1f}")
+    lines.append("\nEvent Loop:")
+    lines.extend(loop_monitor.report_lines())
+    lines.append("=" * 78)
+    return "\n".join(lines)
+
+
+async def run_firehose(rates, duration, burst_every, burst_len, burst_x, rest_latency):
+    port_q, stats_q = mp.Queue(), mp.Queue()
+    server = mp.Process(target=_server_process, daemon=True,
+                        args=(port_q, stats_q, rates, duration, burst_every, burst_len, burst_x))
+    server.start()
+    port = port_q.get(timeout=10)
+
+    bot = AvellanedaGridBot("firehose", "firehose", COIN_NAME, GRID_SPACING, INITIAL_QUANTITY, LEVERAGE,
+                            TAKE_PROFIT_SPACING, eta=0.01, sigma=0.01, account_name="firehose")
+    # Nothing from a load test may reach real orders, the real journal / data export or a live bot's state segment
+    await bot.exchange.close()
+    bot.exchange = SimulatedExchange(bot, rest_latency)
+    bot.ws_orders = None
+    bot.journal = None
+    if bot.recorder: bot.recorder.close()
+    bot.recorder = None
+    if bot.state_publisher: bot.state_publisher.close()
+    bot.state_publisher = None
+    bot.ws_url = f"ws://127.0.0.1:{port}"
+
+    probe = ReceiveProbe(bot)
+    tasks = [asyncio.create_task(bot.connect_websocket()), asyncio.create_task(bot.strategy_loop()),
+             asyncio.create_task(bot.loop_monitor.run())]
+    server_stats = await asyncio.get_running_loop().run_in_executor(None, stats_q.get, True, duration + 30)
+    await asyncio.sleep(0.5) # Drain what is already on the socket
+    for t in tasks: t.cancel()
+    server.join(timeout=5)
+    print(report(probe, server_stats, duration, bot.loop_monitor))
+
+
+def _rates(text):
+    rates = dict(FIREHOSE_RATES)
+    for item in filter(None, text.split(",")):
+        name, value = item.split("=")
+        rates[name if name.startswith("futures.") else f"futures.{name}"] = float(value)
+    return rates
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Synthetic Gate.io WS firehose against the bot's receive path (local only)")
+    ap.add_argument("--rates", type=_rates, default=dict(FIREHOSE_RATES),
+                    help="Overrides, e.g. book_ticker=2000,trades=500 (msgs/s)")
+    ap.add_argument("--scale", type=float, default=1.0, help="Multiply every rate")
+    ap.add_argument("--duration", type=float, default=30)
+    ap.add_argument("--burst-every", type=float, default=10, help="Burst period (s), 0 = no bursts")
+    ap.add_argument("--burst-len", type=float, default=2, help="Burst length (s)")
+    ap.add_argument("--burst-x", type=float, default=10, help="Rate multiplier during bursts")
+    ap.add_argument("--rest-latency", type=float, default=REST_LATENCY)
+    args = ap.parse_args()
+
+    rates = {ch: r * args.scale for ch, r in args.rates.items()}
+    logger.info(f"Firehose: {sum(rates.values()):,.0f} msg/s base, x{args.burst_x:g} for {args.burst_len:g}s "
+                f"every {args.burst_every:g}s, REST {args.rest_latency*1000:.0f}ms")
+    asyncio.run(run_firehose(rates, args.duration, args.burst_every, args.burst_len, args.burst_x, args.rest_latency))
+
+
+if __name__ == "__main__":
+    main()
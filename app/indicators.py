@@ -0,0 +1,70 @@
+import math
+
+import numpy as np
+
+# ccxt OHLCV row layout: [timestamp(ms), open, high, low, close, volume]
+TS, OPEN, HIGH, LOW, CLOSE, VOLUME = range(6)
+
+
+def ohlcv_array(ohlcv):
+    """ccxt fetch_ohlcv list -> (N, 6) float64 array (empty (0, 6) if nothing came back)."""
+    if ohlcv is None or len(ohlcv) == 0:
+        return np.empty((0, 6))
+    return np.asarray(ohlcv, dtype=np.float64).reshape(-1, 6)
+
+
+def rolling_mean(x, n):
+    """Trailing mean over n samples; the first n-1 entries are NaN (pandas rolling(n).mean())."""
+    c = np.cumsum(np.insert(x, 0, 0.0))
+    out = np.full(len(x), np.nan)
+    if len(x) >= n:
+        out[n - 1:] = (c[n:] - c[:-n]) / n
+    return out
+
+
+def log_returns(close):
+    return np.diff(np.log(close))
+
+
+def log_return_volatility(close):
+    """Sample std (ddof=1) of close-to-close log returns; NaN with fewer than two returns."""
+    r = log_returns(close)
+    return float(np.std(r, ddof=1)) if len(r) > 1 else float("nan")
+
+
+def rsi_series(close, period=14):
+    """Simple-moving-average RSI per bar, NaN (warm-up, or no losses) filled with 50."""
+    d = np.diff(close, prepend=close[0]) if len(close) else np.empty(0)
+    gain = rolling_mean(np.where(d > 0, d, 0.0), period)
+    loss = rolling_mean(np.where(d < 0, -d, 0.0), period)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rsi = 100 - 100 / (1 + gain / loss)
+    return np.where(np.isnan(rsi), 50.0, rsi)
+
+
+def rsi(close, period=14):
+    """RSI of the latest bar."""
+    return float(rsi_series(close, period)[-1]) if len(close) else 50.0
+
+
+def slope(close, window):
+    """Price change per bar from window bars back to the latest one; 0 if there are not enough bars."""
+    if len(close) <= window:
+        return 0.0
+    return float((close[-1] - close[-window]) / window)
+
+
+def candle_bounds(candles, back=2):
+    """(high, low) of the candle `back` rows from the end (2 = last completed bar); (0, 0) if too short."""
+    if len(candles) < back:
+        return 0, 0
+    return float(candles[-back, HIGH]), float(candles[-back, LOW])
+
+
+def coin_score(candles):
+    """Coin selection score: volatility * 10000 + log(quote turnover). Returns (score, volatility, turnover)."""
+    close = candles[:, CLOSE]
+    volatility = log_return_volatility(close)
+    turnover = float(np.sum(close * candles[:, VOLUME]))
+    score = volatility * 10000 + (math.log(turnover) if turnover > 0 else 0)
+    return score, volatility, turnover
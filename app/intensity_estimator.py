@@ -0,0 +1,86 @@
+import math
+import numpy as np
+
+# Fit Settings
+INTENSITY_WINDOW = 60          # Rolling window (s)
+INTENSITY_CAPACITY = 8192      # Max trades held (ring buffer)
+INTENSITY_BINS = 20            # Depth buckets
+INTENSITY_MAX_DEPTH = 0.002    # 0.2% from mid; deeper trades go in the last bucket
+INTENSITY_MIN_TRADES = 30      # Don't publish a fit on fewer trades
+
+
+class IntensityEstimator:
+    """
+    Online fit of the Avellaneda-Stoikov arrival intensity lambda(d) = A * exp(-k * d),
+    with d the relative distance of a trade from mid (so k plugs straight into
+    term2 = (1/gamma) * log(1 + gamma/k) as eta).
+
+    Trades land in a fixed-size ring buffer and a depth histogram, both updated in
+    O(1); a fit is a log-linear regression over the histogram's tail counts.
+    """
+
+    def __init__(self, window=INTENSITY_WINDOW, capacity=INTENSITY_CAPACITY,
+                 n_bins=INTENSITY_BINS, max_depth=INTENSITY_MAX_DEPTH):
+        self.window = window
+        self.capacity = capacity
+        self.n_bins = n_bins
+        self.bin_width = max_depth / n_bins
+        self.depths = np.arange(n_bins) * self.bin_width # Lower edge of each bucket
+
+        self._ts = np.zeros(capacity)
+        self._bin = np.zeros(capacity, dtype=np.int32)
+        self._tail = 0
+        self._size = 0
+        self.counts = np.zeros(n_bins, dtype=np.int64)
+
+        self.A = 0.0
+        self.k = 0.0
+        self.last_fit = 0.0
+
+    def add(self, ts, price, mid):
+        if mid <= 0: return
+        b = int(abs(price - mid) / mid / self.bin_width)
+        if b >= self.n_bins: b = self.n_bins - 1
+
+        if self._size == self.capacity:
+            self._pop()
+        i = (self._tail + self._size) % self.capacity
+        self._ts[i] = ts
+        self._bin[i] = b
+        self._size += 1
+        self.counts[b] += 1
+
+    def _pop(self):
+        self.counts[self._bin[self._tail]] -= 1
+        self._tail = (self._tail + 1) % self.capacity
+        self._size -= 1
+
+    def _evict(self, now):
+        cutoff = now - self.window
+        while self._size and self._ts[self._tail] < cutoff:
+            self._pop()
+
+    @property
+    def ready(self):
+        return self.k > 0
+
+    def fit(self, now):
+        """Returns the new k, or None if there isn't enough data for a stable fit."""
+        self.last_fit = now
+        self._evict(now)
+        if self._size < INTENSITY_MIN_TRADES: return None
+
+        elapsed = max(min(self.window, now - self._ts[self._tail]), 1.0)
+        # Trades that reached depth >= d: a fill at d fills every quote up to d
+        tail = np.cumsum(self.counts[::-1])[::-1]
+        mask = tail > 0
+        if mask.sum() < 3: return None
+
+        x = self.depths[mask]
+        y = np.log(tail[mask] / elapsed)
+        slope, intercept = np.polyfit(x, y, 1)
+        if slope >= 0 or not math.isfinite(slope): return None
+
+        self.k = float(-slope)
+        self.A = float(math.exp(intercept))
+        return self.k
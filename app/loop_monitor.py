@@ -0,0 +1,113 @@
+import os
+import time
+import asyncio
+import threading
+import sys
+import logging
+from collections import Counter
+
+logger = logging.getLogger("Loop_Monitor")
+
+LOOP_LAG_INTERVAL = 0.05      # Probe period (s)
+LOOP_LAG_THRESHOLD = 0.1      # Lag that counts as a stall and gets logged (s)
+LAG_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, float("inf"))
+
+
+def install_fast_event_loop():
+    """Opt-in (USE_UVLOOP=1): switch asyncio to uvloop if it is installed."""
+    if os.getenv("USE_UVLOOP", "0").lower() not in ("1", "true", "yes"):
+        return False
+    try:
+        import uvloop
+    except ImportError:
+        logger.warning("USE_UVLOOP set but uvloop is not installed, using default loop")
+        return False
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    logger.info("uvloop event loop enabled")
+    return True
+
+
+class LoopLagMonitor:
+    """
+    Measures event-loop scheduling delay: a probe sleeps LOOP_LAG_INTERVAL and
+    records how late it wakes up into a fixed histogram. A watchdog thread notices
+    when the probe is overdue and snapshots the loop thread's stack, which names
+    the callback/task that is blocking the loop while it is still running.
+    """
+
+    def __init__(self, interval=LOOP_LAG_INTERVAL, threshold=LOOP_LAG_THRESHOLD):
+        self.interval = interval
+        self.threshold = threshold
+        self.histogram = [0] * len(LAG_BUCKETS_MS)
+        self.samples = 0
+        self.lag_sum = 0.0
+        self.max_lag = 0.0
+        self.stalls = 0
+        self.culprits = Counter()     # Blocking frame -> total stall seconds
+        self._loop_thread = None
+        self._last_tick = time.perf_counter()
+        self._stall_frame = None
+
+    def _record(self, lag):
+        lag_ms = lag * 1000
+        for i, edge in enumerate(LAG_BUCKETS_MS):
+            if lag_ms <= edge:
+                self.histogram[i] += 1
+                break
+        self.samples += 1
+        self.lag_sum += lag
+        if lag > self.max_lag: self.max_lag = lag
+
+    def percentile(self, pct):
+        """Upper bucket edge (ms) below which pct% of samples fall."""
+        if not self.samples: return 0.0
+        target = self.samples * pct / 100
+        seen = 0
+        for edge, n in zip(LAG_BUCKETS_MS, self.histogram):
+            seen += n
+            if seen >= target: return edge
+        return LAG_BUCKETS_MS[-1]
+
+    def _watchdog(self):
+        while True:
+            time.sleep(self.threshold / 2)
+            overdue = time.perf_counter() - self._last_tick - self.interval
+            if overdue > self.threshold and self._stall_frame is None:
+                frame = sys._current_frames().get(self._loop_thread)
+                if frame is None: continue
+                # Innermost frame from our own code is the most useful culprit
+                culprit = None
+                f = frame
+                while f is not None:
+                    if "site-packages" not in f.f_code.co_filename and "asyncio" not in f.f_code.co_filename:
+                        culprit = f"{f.f_code.co_name} ({os.path.basename(f.f_code.co_filename)}:{f.f_lineno})"
+                        break
+                    f = f.f_back
+                self._stall_frame = culprit or f"{frame.f_code.co_name} ({os.path.basename(frame.f_code.co_filename)}:{frame.f_lineno})"
+
+    async def run(self):
+        self._loop_thread = threading.get_ident()
+        self._last_tick = time.perf_counter()
+        threading.Thread(target=self._watchdog, name="loop-watchdog", daemon=True).start()
+        while True:
+            t0 = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            now = time.perf_counter()
+            lag = max(0.0, now - t0 - self.interval)
+            self._last_tick = now
+            self._record(lag)
+
+            if lag > self.threshold:
+                self.stalls += 1
+                culprit = self._stall_frame or "unknown (stall shorter than watchdog period)"
+                self.culprits[culprit] += lag
+                logger.warning(f"Loop Lag {lag*1000:.0f}ms | Blocked in: {culprit} | Tasks: {len(asyncio.all_tasks())}")
+            self._stall_frame = None
+
+    def report_lines(self):
+        avg = (self.lag_sum / self.samples * 1000) if self.samples else 0.0
+        lines = [f"    {'Loop lag avg / p99 / max':<25} {avg:.1f} / {self.percentile(99):g} / {self.max_lag*1000:.0f} ms",
+                 f"    {'Stalls (>' + str(int(self.threshold*1000)) + 'ms)':<25} {self.stalls}"]
+        for culprit, total in self.culprits.most_common(3):
+            lines.append(f"      {total*1000:>8.0f}ms  {culprit}")
+        return lines
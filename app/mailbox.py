@@ -0,0 +1,49 @@
+import asyncio
+from collections import deque
+
+
+class ConflatingMailbox:
+    """
+    Hand-off from the socket reader to the strategy task.
+
+    Market state goes into keyed latest-value slots: a newer ticker simply replaces
+    one the strategy has not consumed yet. Fills and order events go into a FIFO
+    lane and are never dropped. Posting is synchronous and O(1), so the reader
+    never waits on the strategy.
+    """
+
+    def __init__(self):
+        self._latest = {}
+        self._events = deque()
+        self._wake = asyncio.Event()
+        self.posted = 0
+        self.conflated = 0
+        self.events = 0
+        self.max_backlog = 0
+
+    def post_latest(self, key, value):
+        if key in self._latest: self.conflated += 1
+        self._latest[key] = value
+        self.posted += 1
+        self._wake.set()
+
+    def post_event(self, kind, data):
+        self._events.append((kind, data))
+        self.events += 1
+        if len(self._events) > self.max_backlog: self.max_backlog = len(self._events)
+        self._wake.set()
+
+    async def get(self):
+        """Waits for work; returns (events in arrival order, {key: latest value})."""
+        while not self._events and not self._latest:
+            self._wake.clear()
+            await self._wake.wait()
+        events = list(self._events)
+        self._events.clear()
+        latest, self._latest = self._latest, {}
+        return events, latest
+
+    def report_lines(self):
+        pct = self.conflated / self.posted * 100 if self.posted else 0.0
+        return [f"    {'Ticks posted / conflated':<25} {self.posted} / {self.conflated} ({pct:.1f}%)",
+                f"    {'Events (max backlog)':<25} {self.events} ({self.max_backlog})"]
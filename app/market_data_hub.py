@@ -0,0 +1,94 @@
+import asyncio
+import json
+import random
+import time
+import websockets
+
+from .bot import (logger, subscription_payload, PUBLIC_CHANNELS, WEBSOCKET_URL,
+                  WS_RECONNECT_BASE_DELAY, WS_RECONNECT_MAX_DELAY, MARKET_FEED_STAGGER, MARKET_FEED_STALL_TIMEOUT)
+from .feed_racer import FeedRacer, RACED_CHANNELS
+from .order_book import L2OrderBook
+from .loop_monitor import LoopLagMonitor
+from .profiler import install_profiler_signal
+
+TESTNET_WEBSOCKET_URL = "wss://fx-ws-testnet.gateio.ws/v4/ws/usdt"
+
+
+class MarketDataHub:
+    """
+    One public market-data feed shared by every account bot in the process.
+    Bots registered here subscribe only to their private channels; the hub
+    subscribes to the public channels once, decodes each message once and fans the
+    parsed dict out to all of them. The L2 book is shared too: every bot reads the
+    hub's book, and only the first bot applies diffs and fetches REST snapshots.
+    Per-process tooling (loop lag monitor, SIGUSR1 profiler) lives here once too.
+    Extra URLs are raced exactly like a single bot's MARKET_DATA_URLS.
+    """
+
+    def __init__(self, coin_name, testnet=False, market_data_urls=None):
+        self.ws_symbol = f"{coin_name}_USDT"
+        self.ws_url = TESTNET_WEBSOCKET_URL if testnet else WEBSOCKET_URL
+        self.urls = [self.ws_url] + list(market_data_urls or [])
+        self.bots = []
+        self.feed_racer = FeedRacer() if len(self.urls) > 1 else None
+        self.order_book = L2OrderBook()     # One book per symbol for every account
+        self.loop_monitor = LoopLagMonitor()  # One event loop per process: measured once, shared by every bot
+        self.profiler = None
+        self.messages = 0
+
+    def register(self, bot):
+        bot.order_book = self.order_book
+        bot.loop_monitor = self.loop_monitor
+        self.bots.append(bot)
+
+    async def run(self):
+        self.profiler = install_profiler_signal()
+        asyncio.create_task(self.loop_monitor.run())
+        await asyncio.gather(*(
+            self._run_feed("hub" if i == 0 else f"hub{i}", url, i * MARKET_FEED_STAGGER)
+            for i, url in enumerate(self.urls)
+        ))
+
+    async def _run_feed(self, feed_id, url, start_delay=0):
+        if self.feed_racer: self.feed_racer.register(feed_id, url)
+        await asyncio.sleep(start_delay)
+        attempt = 0
+        while True:
+            try:
+                async with websockets.connect(url, ping_interval=20, ping_timeout=20) as websocket:
+                    channels = PUBLIC_CHANNELS if feed_id == "hub" else RACED_CHANNELS # Backups only race
+                    await asyncio.gather(*(self._subscribe(websocket, chan) for chan in channels))
+                    attempt = 0
+                    logger.info(f"[{feed_id}] Shared market feed up for {len(self.bots)} accounts")
+                    while True:
+                        message = await asyncio.wait_for(websocket.recv(), MARKET_FEED_STALL_TIMEOUT)
+                        await self._fan_out(feed_id, message)
+            except Exception as e:
+                logger.warning(f"[{feed_id}] Shared Feed Error: {e!r}")
+            cap = min(WS_RECONNECT_MAX_DELAY, WS_RECONNECT_BASE_DELAY * (2 ** attempt))
+            attempt += 1
+            await asyncio.sleep(random.uniform(0, cap))
+
+    async def _subscribe(self, websocket, channel):
+        # Public channels need no auth
+        await websocket.send(json.dumps({
+            "time": int(time.time()), "channel": channel, "event": "subscribe",
+            "payload": subscription_payload(channel, self.ws_symbol),
+        }))
+
+    async def _fan_out(self, feed_id, message):
+        data = json.loads(message)
+        if data.get("event") != "update": return
+        channel = data.get("channel")
+        if self.feed_racer and channel in RACED_CHANNELS:
+            if not self.feed_racer.accept(feed_id, channel, data): return
+        elif feed_id != "hub":
+            return # Redundant feeds only carry raced channels
+        self.messages += 1
+        # Book diffs go to the first bot only: it updates the shared book and owns its snapshot fetches
+        bots = self.bots[:1] if channel == "futures.order_book_update" else self.bots
+        for bot in bots:
+            try:
+                await bot._dispatch(data)
+            except Exception as e:
+                logger.error(f"[{bot.account_name}] Market Msg Error: {e}")
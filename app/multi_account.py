@@ -0,0 +1,53 @@
+import asyncio
+
+from .bot import logger, load_accounts
+from .avellaneda_bot import (AvellanedaGridBot, auto_calculate_params, COIN_NAME, GRID_SPACING, INITIAL_QUANTITY,
+                             LEVERAGE, TAKE_PROFIT_SPACING, AVE_GAMMA, AVE_T_END, Taker_Fee_Rate, USE_TESTNET,
+                             ORDER_LAYERS, LAYER_SPREAD, MARKET_DATA_URLS)
+from .market_data_hub import MarketDataHub
+from .loop_monitor import install_fast_event_loop
+
+
+async def main():
+    """
+    Run one AvellanedaGridBot per account (GATEIO_ACCOUNTS) in a single process.
+    Each bot keeps its own authenticated REST session and private WebSocket;
+    public market data comes from one shared MarketDataHub.
+    """
+    accounts = load_accounts()
+    if not accounts:
+        logger.critical("No accounts configured (GATEIO_ACCOUNTS / <NAME>_API_KEY / <NAME>_API_SECRET)")
+        return
+
+    try:
+        sigma, eta, alpha, funding, rsi, h1, l1 = auto_calculate_params(COIN_NAME, Taker_Fee_Rate)
+    except:
+        sigma, eta, alpha, funding, rsi, h1, l1 = 0.01, 0.01, 0.0, 0.0, 50.0, 0, 0
+
+    hub = MarketDataHub(COIN_NAME, testnet=USE_TESTNET, market_data_urls=MARKET_DATA_URLS)
+    bots = []
+    for name, key, secret in accounts:
+        bot = AvellanedaGridBot(
+            key, secret, COIN_NAME,
+            GRID_SPACING, INITIAL_QUANTITY, LEVERAGE,
+            TAKE_PROFIT_SPACING,
+            gamma=AVE_GAMMA, eta=eta, sigma=sigma, T_end=AVE_T_END,
+            trend_alpha=alpha, funding_rate=funding, taker_fee_rate=Taker_Fee_Rate,
+            testnet=USE_TESTNET,
+            order_layers=ORDER_LAYERS, layer_spread=LAYER_SPREAD,
+            market_data_hub=hub, account_name=name
+        )
+        bot.high_1m = h1
+        bot.low_1m = l1
+        bot.rsi_val = rsi
+        bots.append(bot)
+
+    logger.info(f"Multi-Account: {', '.join(b.account_name for b in bots)} on one shared {COIN_NAME} feed")
+    await asyncio.gather(hub.run(), *(bot.run() for bot in bots))
+
+
+if __name__ == "__main__":
+    install_fast_event_loop()
+    try: asyncio.run(main())
+    except KeyboardInterrupt: pass
+    except Exception as e: logger.critical(f"FATAL: {e}")
@@ -0,0 +1,130 @@
+from bisect import bisect_left
+from collections import deque
+
+ORDER_BOOK_DEPTH = 100        # Levels per side (subscription + snapshot)
+ORDER_BOOK_BUFFER = 2000      # Diffs buffered while waiting for a snapshot
+
+
+class BookSide:
+    """
+    One side of the book: a sorted array of price keys (searched with bisect)
+    plus a price -> size map. Bids are keyed by -price so both sides sort best-first.
+
+    Lookups are O(log n), but inserting or removing a level shifts the array, so
+    set() is O(n) in the levels held. n is capped at max_levels (the subscribed
+    depth: levels pushed past it stop receiving diffs and are trimmed), and at
+    n <= 100 that shift is one memmove of under 1 KB, cheaper in CPython than
+    any pure-Python balanced tree.
+    """
+
+    def __init__(self, descending, max_levels=ORDER_BOOK_DEPTH):
+        self.sign = -1.0 if descending else 1.0
+        self.max_levels = max_levels
+        self.keys = []
+        self.sizes = {}
+
+    def clear(self):
+        self.keys.clear()
+        self.sizes.clear()
+
+    def set(self, price, size):
+        key = self.sign * price
+        if size == 0:
+            if self.sizes.pop(price, None) is not None:
+                i = bisect_left(self.keys, key)
+                if i < len(self.keys) and self.keys[i] == key: del self.keys[i]
+        else:
+            if price not in self.sizes:
+                i = bisect_left(self.keys, key)
+                if i >= self.max_levels: return # Beyond the subscribed depth
+                self.keys.insert(i, key)
+                if len(self.keys) > self.max_levels:
+                    del self.sizes[self.sign * self.keys.pop()]
+            self.sizes[price] = size
+
+    def best(self):
+        return self.sign * self.keys[0] if self.keys else None
+
+    def size_at(self, price):
+        return self.sizes.get(price, 0)
+
+    def depth_through(self, price):
+        """Total size at this price and every better level."""
+        end = bisect_left(self.keys, self.sign * price)
+        if end < len(self.keys) and self.keys[end] == self.sign * price: end += 1
+        return sum(self.sizes[self.sign * k] for k in self.keys[:end])
+
+    def levels(self, n=None):
+        keys = self.keys if n is None else self.keys[:n]
+        return [(self.sign * k, self.sizes[self.sign * k]) for k in keys]
+
+
+class L2OrderBook:
+    """
+    Local L2 book built from a REST snapshot plus futures.order_book_update diffs.
+    Diffs must chain (U == last id + 1); any gap marks the book unsynced and
+    needs_snapshot tells the owner to fetch a fresh snapshot.
+    """
+
+    def __init__(self):
+        self.bids = BookSide(descending=True)
+        self.asks = BookSide(descending=False)
+        self.last_update_id = 0
+        self.synced = False
+        self.needs_snapshot = True
+        self.gaps = 0
+        self.updates = 0
+        self._buffer = deque(maxlen=ORDER_BOOK_BUFFER)
+
+    def apply_snapshot(self, snapshot):
+        self.bids.clear()
+        self.asks.clear()
+        for lvl in snapshot.get("bids", []):
+            self.bids.set(float(lvl["p"]), float(lvl["s"]))
+        for lvl in snapshot.get("asks", []):
+            self.asks.set(float(lvl["p"]), float(lvl["s"]))
+        self.last_update_id = int(snapshot["id"])
+        self.synced = True
+        self.needs_snapshot = False
+
+        buffered, self._buffer = list(self._buffer), deque(maxlen=ORDER_BOOK_BUFFER)
+        for update in buffered:
+            if not self.on_update(update): break
+
+    def on_update(self, update):
+        """Returns False when a sequence gap was detected."""
+        if not self.synced:
+            self._buffer.append(update)
+            return True
+
+        first, last = int(update["U"]), int(update["u"])
+        if last <= self.last_update_id: return True # Already in the snapshot
+        if first > self.last_update_id + 1:
+            self.gaps += 1
+            self.synced = False
+            self.needs_snapshot = True
+            self._buffer.clear()
+            self._buffer.append(update)
+            return False
+
+        for lvl in update.get("b", []):
+            self.bids.set(float(lvl["p"]), float(lvl["s"]))
+        for lvl in update.get("a", []):
+            self.asks.set(float(lvl["p"]), float(lvl["s"]))
+        self.last_update_id = last
+        self.updates += 1
+        return True
+
+    def best_bid(self):
+        return self.bids.best()
+
+    def best_ask(self):
+        return self.asks.best()
+
+    def depth_at(self, side, price):
+        """Resting size at exactly this price ('buy' = bids, 'sell' = asks)."""
+        return (self.bids if side == 'buy' else self.asks).size_at(price)
+
+    def queue_ahead(self, side, price):
+        """Size that would fill before a new order at this price: better levels + the level's queue."""
+        return (self.bids if side == 'buy' else self.asks).depth_through(price)
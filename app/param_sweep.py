@@ -0,0 +1,284 @@
+import os
+import csv
+import math
+import time
+import argparse
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .bot import POSITION_LIMIT
+from .avellaneda_bot import (AvellanedaGridBot, COIN_NAME, GRID_SPACING, INITIAL_QUANTITY, AVE_GAMMA, AVE_T_END,
+                             ORDER_LAYERS, LAYER_SPREAD, TP_SPREAD, STOP_LOSS_SPREAD, MAX_ENTRY_SPREAD, Taker_Fee_Rate)
+from .pnl_engine import PnLEngine
+from .indicators import rolling_mean, rsi_series
+from .trade_tape import TradeTape
+from .order_book import L2OrderBook
+
+MAKER_FEE_RATE = 0.0002   # Entries / TPs rest on the book
+STOP_SLIPPAGE = 0.0002    # Stop exits fill this far beyond the stop price (taker)
+SIGMA_WINDOW = 1440       # 1m returns behind each sigma estimate (24h), scaled to 1h like the live bot
+RSI_PERIOD = 14           # On 5m closes, as auto_calculate_params
+ALPHA_WINDOW = 6          # 5m bars in the trend slope
+OHLCV_PAGE = 1000
+
+SWEEP_PARAMS = ("gamma", "t_end", "max_entry_spread", "tp_spread", "stop_loss_spread", "order_layers")
+RESULT_FIELDS = SWEEP_PARAMS + ("net_pnl", "realized", "fees", "fills", "stops",
+                                "max_net_inventory", "max_gross_inventory", "max_drawdown")
+
+
+class SimulatedBot(AvellanedaGridBot):
+    """
+    The AvellanedaGridBot quoting logic with no exchange behind it: only the state
+    read by _calculate_avellaneda_prices / _entry_ladder / _tp_price is set up
+    (GridTradingBot.__init__ is never called). The trade tape stays empty and the
+    book never syncs, so OFI bias and queue stepping are off offline.
+    """
+
+    def __init__(self, cfg, quantity=INITIAL_QUANTITY, contract_size=1.0, funding_rate=0.0):
+        self.gamma = cfg["gamma"]
+        self.T_end = cfg["t_end"]
+        self.max_entry_spread = cfg["max_entry_spread"]
+        self.tp_spread = cfg["tp_spread"]
+        self.sl_floor = self.sl_spread = cfg["stop_loss_spread"]
+        self.order_layers = int(cfg["order_layers"])
+        self.layer_spread = LAYER_SPREAD
+        self.grid_spacing = GRID_SPACING
+        self.initial_quantity = self.long_initial_quantity = self.short_initial_quantity = quantity
+        self.funding_rate = funding_rate
+        self.position_limit = POSITION_LIMIT
+
+        self.eta = self.sigma = 0.01
+        self.trend_alpha = 0.0
+        self.rsi_val = 50.0
+        self.high_1m = self.low_1m = 0.0
+        self.dynamic_refresh_time = 10
+        self.inventory = 0
+        self.best_bid = self.best_ask = 0
+
+        self.long_position = self.short_position = 0.0
+        self.long_entry_price = self.short_entry_price = 0.0
+        self.trade_tape = TradeTape(capacity=1)
+        self.order_book = L2OrderBook()
+        self.tick_size = 0.0
+        self.price_precision = 8
+        self.pnl = PnLEngine(contract_size)
+
+    def fill(self, side, qty, price, reduce_only, fee_rate):
+        self.pnl.on_fill(side, qty, price, price * qty * self.pnl.contract_size * fee_rate, reduce_only)
+        self.long_position, self.long_entry_price = self.pnl.long_qty, self.pnl.long_avg
+        self.short_position, self.short_entry_price = self.pnl.short_qty, self.pnl.short_avg
+
+
+# ---------- Market features (no look-ahead: bar i only sees bars < i) ----------
+def build_features(candles):
+    """candles: (N, 6) array [ts, open, high, low, close, volume] of 1m bars."""
+    close = candles[:, 4]
+    n = len(close)
+
+    # Sigma: std of 1m log returns over SIGMA_WINDOW, scaled to 1h
+    r = np.diff(np.log(close), prepend=np.log(close[0]))
+    m1 = rolling_mean(r, SIGMA_WINDOW)
+    m2 = rolling_mean(r * r, SIGMA_WINDOW)
+    sigma_now = np.sqrt(np.maximum(m2 - m1 * m1, 0.0)) * math.sqrt(60)
+    sigma = np.full(n, np.nan)
+    sigma[1:] = sigma_now[:-1]
+
+    # RSI / Alpha on completed 5m bars
+    c5 = close[4::5]
+    rsi5 = rsi_series(c5, RSI_PERIOD)
+    alpha5 = np.zeros(len(c5))
+    alpha5[ALPHA_WINDOW - 1:] = (c5[ALPHA_WINDOW - 1:] - c5[:len(c5) - ALPHA_WINDOW + 1]) / ALPHA_WINDOW
+    done5 = np.arange(n) // 5 - 1  # Last 5m bar completed before bar i
+    rsi = np.where(done5 >= 0, rsi5[np.clip(done5, 0, None)], 50.0)
+    alpha = np.where(done5 >= 0, alpha5[np.clip(done5, 0, None)], 0.0)
+
+    prev_high = np.concatenate(([0.0], candles[:-1, 2]))
+    prev_low = np.concatenate(([0.0], candles[:-1, 3]))
+    return np.column_stack([sigma, rsi, alpha, prev_high, prev_low])
+
+
+# ---------- Simulation ----------
+def simulate(cfg, candles, features, quantity=INITIAL_QUANTITY, contract_size=1.0, funding_rate=0.0):
+    """
+    Requote at every bar open with the live pricing code, then fill against the bar:
+    stops first (taker), then resting TPs, then entries. A resting order fills only
+    if price trades through it, and a new entry cannot take profit in its own bar.
+    """
+    bot = SimulatedBot(cfg, quantity, contract_size, funding_rate)
+    fills = stops = 0
+    max_net = max_gross = 0.0
+    peak, max_dd = 0.0, 0.0
+    blocked = {"long": -1, "short": -1}
+
+    for i in range(len(candles)):
+        sigma = features[i, 0]
+        if math.isnan(sigma): continue # Warm-up
+        _, o, h, l, c, _ = candles[i]
+        bot.sigma = sigma
+        bot.eta = max(sigma, 0.001)
+        bot.rsi_val, bot.trend_alpha, bot.high_1m, bot.low_1m = features[i, 1:]
+        bot._calculate_dynamic_params()
+        bot.update_mid_price(None, o)
+
+        stopped = set()
+        if bot.long_position > 0 and l <= bot.long_entry_price * (1 - bot.sl_spread):
+            px = min(o, bot.long_entry_price * (1 - bot.sl_spread)) * (1 - STOP_SLIPPAGE)
+            bot.fill("sell", bot.long_position, px, True, Taker_Fee_Rate)
+            stopped.add("long"); blocked["long"] = i + 1
+        if bot.short_position > 0 and h >= bot.short_entry_price * (1 + bot.sl_spread):
+            px = max(o, bot.short_entry_price * (1 + bot.sl_spread)) * (1 + STOP_SLIPPAGE)
+            bot.fill("buy", bot.short_position, px, True, Taker_Fee_Rate)
+            stopped.add("short"); blocked["short"] = i + 1
+        stops += len(stopped)
+        fills += len(stopped)
+
+        if bot.long_position > 0:
+            tp = bot._tp_price("long", o)
+            if h > tp:
+                bot.fill("sell", bot.long_position, tp, True, MAKER_FEE_RATE); fills += 1
+        if bot.short_position > 0:
+            tp = bot._tp_price("short", o)
+            if l < tp:
+                bot.fill("buy", bot.short_position, tp, True, MAKER_FEE_RATE); fills += 1
+
+        if "long" not in stopped and blocked["long"] < i:
+            prices, sizes = bot._entry_ladder("long", o)
+            for p, q in zip(prices.tolist(), sizes.tolist()):
+                if l < p:
+                    bot.fill("buy", q, p, False, MAKER_FEE_RATE); fills += 1
+        if "short" not in stopped and blocked["short"] < i:
+            prices, sizes = bot._entry_ladder("short", o)
+            for p, q in zip(prices.tolist(), sizes.tolist()):
+                if h > p:
+                    bot.fill("sell", q, p, False, MAKER_FEE_RATE); fills += 1
+
+        bot.pnl.mark(c)
+        equity = bot.pnl.net_pnl
+        if equity > peak: peak = equity
+        if peak - equity > max_dd: max_dd = peak - equity
+        max_net = max(max_net, abs(bot.long_position - bot.short_position))
+        max_gross = max(max_gross, bot.long_position + bot.short_position)
+
+    row = {k: cfg[k] for k in SWEEP_PARAMS}
+    row.update(net_pnl=bot.pnl.net_pnl, realized=bot.pnl.realized, fees=bot.pnl.fees, fills=fills, stops=stops,
+               max_net_inventory=max_net, max_gross_inventory=max_gross, max_drawdown=max_dd)
+    return row
+
+
+# ---------- Process pool (market data shipped once per worker) ----------
+_WORKER = {}
+
+
+def _init_worker(candles, features, quantity, contract_size, funding_rate):
+    _WORKER.update(candles=candles, features=features, quantity=quantity,
+                   contract_size=contract_size, funding_rate=funding_rate)
+
+
+def _run_config(cfg):
+    w = _WORKER
+    return simulate(cfg, w["candles"], w["features"], w["quantity"], w["contract_size"], w["funding_rate"])
+
+
+def sweep(candles, grid, workers=None, quantity=INITIAL_QUANTITY, contract_size=1.0, funding_rate=0.0):
+    """grid: {param: [values]} over SWEEP_PARAMS; returns one result row per combination."""
+    features = build_features(candles)
+    configs = [dict(zip(SWEEP_PARAMS, combo)) for combo in itertools.product(*(grid[k] for k in SWEEP_PARAMS))]
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, len(configs) // (workers * 8))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(candles, features, quantity, contract_size, funding_rate)) as pool:
+        return list(pool.map(_run_config, configs, chunksize=chunksize))
+
+
+# ---------- Data ----------
+def load_candles(path):
+    """CSV with timestamp,open,high,low,close,volume (header optional)."""
+    with open(path) as f:
+        rows = [r for r in csv.reader(f) if r and r[0].replace(".", "", 1).isdigit()]
+    return np.array(rows, dtype=float)
+
+
+def fetch_candles(coin_name, days, path):
+    """Download 1m futures candles from Gate.io and cache them as CSV."""
+    import ccxt
+    exchange = ccxt.gate({'enableRateLimit': True, 'timeout': 10000, 'options': {'defaultType': 'swap'}})
+    symbol = f"{coin_name}/USDT:USDT"
+    markets = exchange.load_markets()
+    contract_size = float(markets[symbol].get("contractSize") or 1.0)
+    since = exchange.milliseconds() - days * 86400 * 1000
+    rows = []
+    while True:
+        page = exchange.fetch_ohlcv(symbol, timeframe="1m", since=since, limit=OHLCV_PAGE)
+        if not page: break
+        rows.extend(page)
+        since = page[-1][0] + 60000
+        if len(page) < OHLCV_PAGE: break
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(["timestamp", "open", "high", "low", "close", "volume"])
+        w.writerows(rows)
+    return np.array(rows, dtype=float), contract_size
+
+
+def write_results(rows, path):
+    rows = sorted(rows, key=lambda r: r["net_pnl"], reverse=True)
+    with open(path, "w", newline="") as f:
+        w = csv.DictWriter(f, fieldnames=RESULT_FIELDS)
+        w.writeheader()
+        w.writerows(rows)
+    return rows
+
+
+def _floats(text):
+    return [float(x) for x in text.split(",") if x]
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Offline parameter sweep of AvellanedaGridBot over 1m candles")
+    ap.add_argument("--candles", help="CSV of 1m candles (timestamp,open,high,low,close,volume)")
+    ap.add_argument("--coin", default=COIN_NAME)
+    ap.add_argument("--days", type=int, default=7, help="Days of 1m candles to download when --candles is not given")
+    ap.add_argument("--gamma", type=_floats, default=[AVE_GAMMA])
+    ap.add_argument("--t-end", type=_floats, default=[AVE_T_END])
+    ap.add_argument("--max-entry-spread", type=_floats, default=[MAX_ENTRY_SPREAD])
+    ap.add_argument("--tp-spread", type=_floats, default=[TP_SPREAD])
+    ap.add_argument("--stop-loss-spread", type=_floats, default=[STOP_LOSS_SPREAD])
+    ap.add_argument("--order-layers", type=lambda t: [int(x) for x in t.split(",") if x], default=[ORDER_LAYERS])
+    ap.add_argument("--quantity", type=float, default=INITIAL_QUANTITY)
+    ap.add_argument("--contract-size", type=float, default=None, help="Default: from the exchange when downloading, else 1")
+    ap.add_argument("--funding", type=float, default=0.0)
+    ap.add_argument("--workers", type=int, default=None)
+    ap.add_argument("--out", default=None)
+    args = ap.parse_args()
+
+    contract_size = 1.0
+    if args.candles:
+        candles = load_candles(args.candles)
+    else:
+        candles, contract_size = fetch_candles(args.coin, args.days, f"log/{args.coin}_1m_{args.days}d.csv")
+    if args.contract_size is not None: contract_size = args.contract_size
+
+    grid = {"gamma": args.gamma, "t_end": args.t_end, "max_entry_spread": args.max_entry_spread,
+            "tp_spread": args.tp_spread, "stop_loss_spread": args.stop_loss_spread, "order_layers": args.order_layers}
+    total = math.prod(len(v) for v in grid.values())
+    print(f"Sweeping {total} configs over {len(candles)} bars ({args.workers or os.cpu_count()} workers)...")
+
+    started = time.perf_counter()
+    rows = sweep(candles, grid, args.workers, args.quantity, contract_size, args.funding)
+    out = args.out or f"log/sweep-{args.coin}-{time.strftime('%Y%m%d-%H%M%S')}.csv"
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    rows = write_results(rows, out)
+    print(f"Done in {time.perf_counter() - started:.1f}s -> {out}")
+
+    print(f"{'gamma':>6} {'t_end':>6} {'max_ent':>8} {'tp':>7} {'sl':>6} {'lay':>3} {'net_pnl':>10} {'fees':>9} {'fills':>6} {'max_inv':>7} {'max_dd':>9}")
+    for r in rows[:10]:
+        print(f"{r['gamma']:>6g} {r['t_end']:>6g} {r['max_entry_spread']:>8g} {r['tp_spread']:>7g} {r['stop_loss_spread']:>6g} "
+              f"{r['order_layers']:>3} {r['net_pnl']:>10.4f} {r['fees']:>9.4f} {r['fills']:>6} "
+              f"{r['max_net_inventory']:>7g} {r['max_drawdown']:>9.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+class PnLEngine:
+    """
+    Incremental PnL from fills (Hedge Mode: independent long / short books).
+    Every fill and every mark is O(1); nothing rescans the trade history.
+    Quantities are in contracts, PnL in USDT (qty * contract_size * price).
+    """
+
+    def __init__(self, contract_size=1.0):
+        self.contract_size = contract_size
+
+        # Per-side average cost books
+        self.long_qty = 0.0
+        self.long_avg = 0.0
+        self.short_qty = 0.0
+        self.short_avg = 0.0
+
+        self.realized = 0.0      # Gross, before fees
+        self.fees = 0.0          # Paid (negative = rebate)
+        self.unrealized = 0.0
+        self.mark_price = 0.0
+
+        # Running trade stats (for reports)
+        self.buy_count = 0
+        self.sell_count = 0
+        self.buy_base = 0.0
+        self.sell_base = 0.0
+        self.buy_quote = 0.0
+        self.sell_quote = 0.0
+
+    def seed(self, long_qty, long_entry, short_qty, short_entry):
+        """Adopt positions that existed before the engine started."""
+        self.long_qty, self.long_avg = float(long_qty), float(long_entry)
+        self.short_qty, self.short_avg = float(short_qty), float(short_entry)
+        if self.mark_price: self.mark(self.mark_price)
+
+    def on_fill(self, side, amount, price, fee=0.0, reduce_only=None):
+        """
+        side: 'buy' / 'sell'. reduce_only tells opens from closes in Hedge Mode;
+        when unknown it is inferred from which book is open (a guess while both
+        are; reconcile() repairs the books from exchange positions).
+        """
+        if side == 'buy':
+            self.buy_count += 1
+            self.buy_base += amount
+            self.buy_quote += amount * price
+            if reduce_only is None:
+                reduce_only = self.short_qty > 0 and self.long_qty == 0
+            if reduce_only:
+                qty = min(amount, self.short_qty)
+                self.realized += (self.short_avg - price) * qty * self.contract_size
+                self.short_qty -= qty
+                if self.short_qty <= 0: self.short_qty, self.short_avg = 0.0, 0.0
+            else:
+                total = self.long_qty + amount
+                self.long_avg = (self.long_avg * self.long_qty + price * amount) / total
+                self.long_qty = total
+        else:
+            self.sell_count += 1
+            self.sell_base += amount
+            self.sell_quote += amount * price
+            if reduce_only is None:
+                reduce_only = self.long_qty > 0 and self.short_qty == 0
+            if reduce_only:
+                qty = min(amount, self.long_qty)
+                self.realized += (price - self.long_avg) * qty * self.contract_size
+                self.long_qty -= qty
+                if self.long_qty <= 0: self.long_qty, self.long_avg = 0.0, 0.0
+            else:
+                total = self.short_qty + amount
+                self.short_avg = (self.short_avg * self.short_qty + price * amount) / total
+                self.short_qty = total
+
+        self.fees += fee
+        if self.mark_price: self.mark(self.mark_price)
+
+    def reconcile(self, long_qty, long_entry, short_qty, short_entry):
+        """
+        Adopt exchange positions when the books drifted (e.g. a close booked as an open).
+        Net PnL is kept: the cash flows were right, only their split between realized
+        and unrealized was not, so the unrealized change moves into realized.
+        Returns True if anything changed.
+        """
+        if (abs(self.long_qty - long_qty) < 1e-9 and abs(self.short_qty - short_qty) < 1e-9): return False
+        before = self.mark(self.mark_price) if self.mark_price else 0.0
+        self.long_qty, self.long_avg = float(long_qty), (float(long_entry) if long_qty else 0.0)
+        self.short_qty, self.short_avg = float(short_qty), (float(short_entry) if short_qty else 0.0)
+        if self.mark_price: self.realized += before - self.mark(self.mark_price)
+        return True
+
+    def mark(self, price):
+        self.mark_price = price
+        self.unrealized = ((price - self.long_avg) * self.long_qty
+                           + (self.short_avg - price) * self.short_qty) * self.contract_size
+        return self.unrealized
+
+    @property
+    def net_pnl(self):
+        return self.realized - self.fees + self.unrealized
+
+    def snapshot(self):
+        return {
+            "realized": self.realized, "fees": self.fees, "unrealized": self.unrealized,
+            "net": self.net_pnl, "long_qty": self.long_qty, "long_avg": self.long_avg,
+            "short_qty": self.short_qty, "short_avg": self.short_avg,
+        }
+
+    def to_dict(self):
+        return dict(vars(self))
+
+    def load_dict(self, d):
+        for k, v in d.items():
+            if hasattr(self, k): setattr(self, k, v)
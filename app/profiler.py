@@ -0,0 +1,123 @@
+import os
+import sys
+import time
+import signal
+import asyncio
+import threading
+import logging
+from collections import Counter
+
+logger = logging.getLogger("Profiler")
+
+PROFILE_DURATION = 30         # Default capture length (s)
+PROFILE_INTERVAL = 0.005      # Sampling period (s)
+PROFILE_DIR = "log"
+PROFILED_TASKS = ("connect_websocket", "strategy_loop", "reporting_loop", "update_parameters_periodically")
+
+
+class SamplingProfiler:
+    """
+    On-demand sampling profiler for the event-loop thread.
+
+    A background thread snapshots the target thread's stack every PROFILE_INTERVAL
+    via sys._current_frames(). Nothing is installed while idle, so the cost when
+    disabled is zero. Each capture writes collapsed stacks (flamegraph format) and
+    a per-coroutine summary of on-CPU time for PROFILED_TASKS into log/.
+    """
+
+    def __init__(self, target_thread_id=None, tasks=PROFILED_TASKS, out_dir=PROFILE_DIR):
+        self.target = target_thread_id or threading.get_ident()
+        self.tasks = tasks
+        self.out_dir = out_dir
+        self._thread = None
+        self._stop = threading.Event()
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, duration=PROFILE_DURATION):
+        if self.running:
+            logger.info("Profiler already running")
+            return False
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, args=(duration,), name="profiler", daemon=True)
+        self._thread.start()
+        logger.info(f"Profiler started for {duration}s")
+        return True
+
+    def stop(self):
+        self._stop.set()
+
+    def toggle(self, duration=PROFILE_DURATION):
+        if self.running: self.stop()
+        else: self.start(duration)
+
+    def _run(self, duration):
+        stacks = Counter()
+        task_samples = Counter()
+        samples = 0
+        started = time.perf_counter()
+        deadline = started + duration
+
+        while not self._stop.is_set() and time.perf_counter() < deadline:
+            frame = sys._current_frames().get(self.target)
+            if frame is not None:
+                names = []
+                owner = None
+                innermost = frame.f_code.co_name
+                while frame is not None:
+                    code = frame.f_code
+                    names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                    if code.co_name in self.tasks: owner = code.co_name
+                    frame = frame.f_back
+                if owner is None:
+                    owner = "idle" if innermost in ("select", "poll") else "(other)"
+                stacks[";".join(reversed(names))] += 1
+                task_samples[owner] += 1
+                samples += 1
+            time.sleep(PROFILE_INTERVAL)
+
+        elapsed = time.perf_counter() - started
+        try:
+            self._dump(stacks, task_samples, samples, elapsed)
+        except Exception as e:
+            logger.error(f"Profiler dump failed: {e}")
+
+    def _dump(self, stacks, task_samples, samples, elapsed):
+        os.makedirs(self.out_dir, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        stack_path = os.path.join(self.out_dir, f"profile-{stamp}.folded")
+        summary_path = os.path.join(self.out_dir, f"profile-{stamp}.txt")
+
+        with open(stack_path, "w") as f:
+            for stack, n in stacks.most_common():
+                f.write(f"{stack} {n}\n")
+
+        per_sample = elapsed / samples if samples else 0.0
+        lines = [f"Samples: {samples} over {elapsed:.1f}s (~{per_sample*1000:.2f}ms each)", "",
+                 f"{'Coroutine':<32} {'samples':>8} {'share':>7} {'~time':>9}"]
+        for name in list(self.tasks) + ["(other)", "idle"]:
+            n = task_samples.get(name, 0)
+            share = n / samples * 100 if samples else 0.0
+            lines.append(f"{name:<32} {n:>8} {share:>6.1f}% {n*per_sample:>8.2f}s")
+        lines += ["", "Top stacks:"]
+        for stack, n in stacks.most_common(20):
+            lines.append(f"{n:>8}  {stack.rsplit(';', 1)[-1]}")
+
+        with open(summary_path, "w") as f:
+            f.write("\n".join(lines) + "\n")
+        logger.info(f"Profile written: {summary_path}, {stack_path}")
+
+
+def install_profiler_signal():
+    """`kill -USR1 <pid>` starts a PROFILE_DURATION capture (again to stop early). One per process."""
+    if not hasattr(signal, "SIGUSR1"): return None
+    try:
+        profiler = SamplingProfiler()
+        asyncio.get_running_loop().add_signal_handler(signal.SIGUSR1, profiler.toggle)
+        logger.info(f"Profiler armed: kill -USR1 {os.getpid()}")
+        return profiler
+    except (NotImplementedError, RuntimeError, ValueError) as e:
+        logger.warning(f"Profiler signal unavailable: {e}")
+        return None
@@ -0,0 +1,53 @@
+import numpy as np
+
+LADDER_INV_K = 4.0          # Inventory shrink: size * exp(-K * gamma * inventory / limit) on the side that adds to it
+LADDER_DEPTH_MAX = 3.0      # Cap on the depth multiplier (outer levels sized up by distance / sigma)
+
+
+def build_ladder(side, base_price, layers, layer_spread, tick, base_qty, inventory, side_position, position_limit,
+                 gamma, sigma, bound=None):
+    """
+    Entry ladder for one side in one NumPy pass.
+
+    side: 'buy' (levels step down from base_price) or 'sell' (step up). base_price is
+    the already guarded / clamped top of book quote. bound is the far edge of the
+    entry tunnel (lowest bid / highest ask): levels past it are pulled back onto
+    it. Prices snap away from the market to the tick (the bound snaps inward) and
+    collapse if several land on one tick, keeping the innermost level. Sizes:
+      - grow with depth in units of sigma (a level one sigma out is worth more), capped;
+      - shrink exponentially with inventory already leaning this way (scaled by gamma);
+      - are cut so the side's position plus the whole ladder never exceeds position_limit.
+    Returns (prices float64[], sizes int64[]), best level first, zero sizes dropped.
+    """
+    if layers <= 0 or base_price <= 0:
+        return np.empty(0), np.empty(0, dtype=np.int64)
+    i = np.arange(layers, dtype=np.float64)
+    sign = -1.0 if side == 'buy' else 1.0
+    prices = base_price * (1 + sign * i * layer_spread)
+
+    if tick > 0:
+        snap = np.floor if side == 'buy' else np.ceil
+        prices = snap(prices / tick + sign * -1e-9) * tick
+        if bound is not None:
+            inward = np.ceil if side == 'buy' else np.floor
+            bound = inward(bound / tick + sign * 1e-9) * tick
+    if bound is not None: # Never pulled past the top level either
+        prices = np.maximum(prices, min(bound, prices[0])) if side == 'buy' else np.minimum(prices, max(bound, prices[0]))
+    # Several levels on one tick (spread < tick, or pulled onto the bound): keep the first of each
+    keep = np.concatenate(([True], np.diff(prices) != 0))
+    prices, i = prices[keep], i[keep]
+    pos = prices > 0
+    prices, i = prices[pos], i[pos]
+
+    depth = np.minimum(1 + i * layer_spread / max(sigma, layer_spread), LADDER_DEPTH_MAX)
+    lean = inventory if side == 'buy' else -inventory        # > 0: this side adds to the lean
+    limit = max(position_limit, 1e-9)
+    shrink = np.exp(-LADDER_INV_K * gamma * max(lean, 0.0) / limit)
+    sizes = np.rint(base_qty * depth * shrink)
+
+    room = max(position_limit - side_position, 0.0)
+    sizes = np.diff(np.minimum(np.cumsum(sizes), room), prepend=0.0)
+    sizes = np.floor(sizes + 1e-9).astype(np.int64)
+
+    live = sizes > 0
+    return prices[live], sizes[live]
@@ -0,0 +1,173 @@
+import os
+import math
+import time
+import struct
+import asyncio
+import hashlib
+import logging
+import mmap
+import tempfile
+import contextvars
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError: # Not POSIX: each process keeps ccxt's own limiter
+    fcntl = None
+
+logger = logging.getLogger("Rate_Limit")
+
+RATE_LIMIT_DIR = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+RATE_LIMIT_BURST = 20.0         # Bucket capacity (ccxt cost units, 1 = one default-cost call)
+RATE_LIMIT_RESERVE = 0.25       # Share of the bucket only risk-reducing calls (cancels, reduce-only) may use
+RATE_LIMIT_SLOTS = 64           # Max processes sharing one budget
+RATE_ACTIVE_WINDOW = 10.0       # A process that requested within this window counts toward the fair share (s)
+RATE_USAGE_WINDOW = 5.0         # Decay window of per-process usage (s)
+RATE_SLOT_TTL = 60.0            # A slot silent for this long may be taken over by a new process (s)
+RATE_MIN_WAIT = 0.005           # Shortest sleep between acquire attempts (s)
+
+RATE_PRIORITY = contextvars.ContextVar("rate_priority", default=False)
+
+# Shared file layout: header, then RATE_LIMIT_SLOTS process slots
+HEADER = struct.Struct("<dd")   # tokens, updated_at (monotonic, host-wide)
+SLOT = struct.Struct("<qdd")    # pid, last_seen, decayed usage (cost units)
+
+
+@contextmanager
+def rate_priority(enabled=True):
+    """REST calls made inside this block draw on the reserved part of the shared budget."""
+    token = RATE_PRIORITY.set(bool(enabled))
+    try:
+        yield
+    finally:
+        RATE_PRIORITY.reset(token)
+
+
+def budget_key(api_key):
+    return hashlib.sha1((api_key or "public").encode()).hexdigest()[:12]
+
+
+class RateLimitBroker:
+    """
+    One token bucket per Gate.io account, shared by every process on the host
+    through a small mmap'ed file guarded by flock. The bucket refills at the
+    account's rate (ccxt cost units per second); each call takes its ccxt cost.
+
+    - Priority: the last RATE_LIMIT_RESERVE of the bucket is only handed to calls
+      made under rate_priority() (cancels, reduce-only exits), so a process busy
+      requoting can never starve another one's stop-loss.
+    - Fair share: every process that requested within RATE_ACTIVE_WINDOW is
+      entitled to rate / active of the refill. A process above its share only
+      gets tokens while the bucket is at least half full (nobody is contending).
+    """
+
+    def __init__(self, key, rate, burst=RATE_LIMIT_BURST):
+        self.rate = rate
+        self.burst = burst
+        self.path = os.path.join(RATE_LIMIT_DIR, f"gate-ratelimit-{key}.bin")
+        self.pid = os.getpid()
+        self.slot = None
+        size = HEADER.size + SLOT.size * RATE_LIMIT_SLOTS
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        if os.fstat(self._fd).st_size < size:
+            os.ftruncate(self._fd, size)
+        self._mm = mmap.mmap(self._fd, size)
+        self.acquired = 0
+        self.priority_acquired = 0
+        self.waits = 0
+        self.wait_time = 0.0
+        self.active = 1
+
+    def _find_slot(self, now):
+        mm = self._mm
+        if self.slot is not None and SLOT.unpack_from(mm, HEADER.size + self.slot * SLOT.size)[0] == self.pid:
+            return self.slot
+        free = oldest = None
+        oldest_seen = math.inf
+        for i in range(RATE_LIMIT_SLOTS):
+            pid, seen, _ = SLOT.unpack_from(mm, HEADER.size + i * SLOT.size)
+            if pid == self.pid: return i
+            if free is None and (pid == 0 or now - seen > RATE_SLOT_TTL): free = i
+            if seen < oldest_seen: oldest, oldest_seen = i, seen
+        if free is not None:
+            SLOT.pack_into(mm, HEADER.size + free * SLOT.size, self.pid, now, 0.0)
+            return free
+        # Table full: take over the least recently seen slot, keeping its usage so nobody's share resets
+        off = HEADER.size + oldest * SLOT.size
+        pid, seen, used = SLOT.unpack_from(mm, off)
+        logger.warning(f"Rate limit table full ({RATE_LIMIT_SLOTS} processes), taking over slot of pid {pid}")
+        SLOT.pack_into(mm, off, self.pid, seen, used)
+        return oldest
+
+    def _try_acquire(self, cost, priority):
+        """One locked read-modify-write of the shared bucket. Returns 0 if granted, else seconds to wait."""
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            mm = self._mm
+            now = time.monotonic()
+            tokens, updated = HEADER.unpack_from(mm, 0)
+            if updated <= 0 or updated > now: tokens, updated = self.burst, now # Fresh file / host reboot
+            tokens = min(self.burst, tokens + (now - updated) * self.rate)
+
+            self.slot = self._find_slot(now)
+            active = 0
+            for i in range(RATE_LIMIT_SLOTS):
+                pid, seen, _ = SLOT.unpack_from(mm, HEADER.size + i * SLOT.size)
+                if pid and now - seen < RATE_ACTIVE_WINDOW: active += 1
+            self.active = max(active, 1)
+            off = HEADER.size + self.slot * SLOT.size
+            _, seen, used = SLOT.unpack_from(mm, off)
+            used *= math.exp(-max(now - seen, 0.0) / RATE_USAGE_WINDOW)
+
+            floor = 0.0 if priority else self.burst * RATE_LIMIT_RESERVE
+            share = self.rate * RATE_USAGE_WINDOW / self.active
+            over_share = not priority and used >= share and tokens < self.burst / 2
+            if tokens >= cost + floor and not over_share:
+                tokens -= cost
+                used += cost
+                wait = 0.0
+            elif over_share:
+                wait = max((self.burst / 2 - tokens) / self.rate, RATE_MIN_WAIT)
+            else:
+                wait = max((cost + floor - tokens) / self.rate, RATE_MIN_WAIT)
+
+            HEADER.pack_into(mm, 0, tokens, now)
+            SLOT.pack_into(mm, off, self.pid, now, used)
+            return wait
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    async def acquire(self, cost=1.0, priority=False):
+        waited = 0.0
+        while True:
+            wait = self._try_acquire(cost, priority)
+            if wait <= 0: break
+            waited += wait
+            await asyncio.sleep(wait)
+        self.acquired += 1
+        if priority: self.priority_acquired += 1
+        if waited:
+            self.waits += 1
+            self.wait_time += waited
+
+    def close(self):
+        try:
+            self._mm.close()
+            os.close(self._fd)
+        except (OSError, ValueError): pass
+
+    def report_lines(self):
+        avg = self.wait_time / self.waits * 1000 if self.waits else 0.0
+        return [f"    {'Processes sharing':<25} {self.active} ({self.rate / self.active:.1f} cost/s each)",
+                f"    {'Acquired (priority)':<25} {self.acquired} ({self.priority_acquired})",
+                f"    {'Throttled (avg wait)':<25} {self.waits} ({avg:.1f} ms)"]
+
+
+def create_broker(api_key, rate):
+    """Shared broker for this account, or None where flock / mmap are unavailable."""
+    if fcntl is None: return None
+    try:
+        return RateLimitBroker(budget_key(api_key), rate)
+    except OSError as e:
+        logger.warning(f"Shared rate limit unavailable ({e}), using per-process limiter")
+        return None
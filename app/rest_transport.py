@@ -0,0 +1,144 @@
+import ssl
+import time
+import asyncio
+import logging
+import contextvars
+from contextlib import contextmanager
+
+import aiohttp
+
+logger = logging.getLogger("REST_Transport")
+
+# Per request class: connection pool size, warm connections, timeout (ms)
+REST_POOL_SIZES = {"order": 8, "poll": 4}
+REST_PREWARM = {"order": 4, "poll": 2}
+REST_TIMEOUTS = {"order": 5000, "poll": 10000}
+REST_KEEPALIVE_TIMEOUT = 60     # Idle keep-alive connections kept this long (s)
+REST_KEEPALIVE_INTERVAL = 15    # Ping a pool that has been idle this long (s)
+REST_DNS_TTL = 300              # DNS cache (s)
+
+REQUEST_CLASS = contextvars.ContextVar("rest_request_class", default="poll")
+
+
+@contextmanager
+def request_class(name):
+    """Tag the REST calls made inside this block (e.g. 'order' vs the default 'poll')."""
+    token = REQUEST_CLASS.set(name)
+    try:
+        yield
+    finally:
+        REQUEST_CLASS.reset(token)
+
+
+class PoolStats:
+    __slots__ = ("requests", "created", "reused", "errors", "latency_sum", "last_request_at")
+
+    def __init__(self):
+        self.requests = 0
+        self.created = 0
+        self.reused = 0
+        self.errors = 0
+        self.latency_sum = 0.0
+        self.last_request_at = 0.0
+
+
+class RestTransport:
+    """
+    Explicit HTTP transport for a ccxt exchange: one keep-alive aiohttp session per
+    request class, so polling can never queue orders behind it. Pools are pre-warmed
+    at startup and kept warm with cheap public requests while idle; connection
+    creation vs reuse is counted through aiohttp tracing.
+    """
+
+    def __init__(self, exchange, ping_url):
+        self.exchange = exchange
+        self.ping_url = ping_url
+        self.sessions = {}
+        self.stats = {}
+
+    def _trace(self, stats):
+        trace = aiohttp.TraceConfig()
+
+        async def on_start(session, ctx, params):
+            ctx.started = time.perf_counter()
+
+        async def on_end(session, ctx, params):
+            stats.requests += 1
+            stats.latency_sum += time.perf_counter() - ctx.started
+            stats.last_request_at = time.time()
+
+        async def on_error(session, ctx, params):
+            stats.errors += 1
+
+        async def on_create(session, ctx, params):
+            stats.created += 1
+
+        async def on_reuse(session, ctx, params):
+            stats.reused += 1
+
+        trace.on_request_start.append(on_start)
+        trace.on_request_end.append(on_end)
+        trace.on_request_exception.append(on_error)
+        trace.on_connection_create_end.append(on_create)
+        trace.on_connection_reuseconn.append(on_reuse)
+        return trace
+
+    async def install(self):
+        """Create the pools (inside the running loop) and hand them to the exchange."""
+        ex = self.exchange
+        if ex.session is not None: # Replace any default session ccxt opened lazily
+            await ex.session.close()
+            ex.session = None
+            await ex.close_connector()
+        ssl_context = ssl.create_default_context(cafile=ex.cafile) if ex.verify else False
+        for name, size in REST_POOL_SIZES.items():
+            stats = PoolStats()
+            connector = aiohttp.TCPConnector(ssl=ssl_context, limit=size, keepalive_timeout=REST_KEEPALIVE_TIMEOUT,
+                                             ttl_dns_cache=REST_DNS_TTL, enable_cleanup_closed=True)
+            self.sessions[name] = aiohttp.ClientSession(connector=connector, trace_configs=[self._trace(stats)],
+                                                        trust_env=ex.aiohttp_trust_env)
+            self.stats[name] = stats
+        ex.session = self.sessions["poll"]
+        ex.open() # Sets loop / throttler; keeps our session
+
+    def session_for(self, name):
+        return self.sessions.get(name) or self.sessions["poll"]
+
+    def timeout_for(self, name):
+        return REST_TIMEOUTS.get(name, REST_TIMEOUTS["poll"])
+
+    async def _ping(self, session):
+        try:
+            async with session.get(self.ping_url, timeout=aiohttp.ClientTimeout(total=5)) as resp:
+                await resp.read()
+        except Exception as e:
+            logger.debug(f"Keep-alive ping failed: {e}")
+
+    async def prewarm(self):
+        """Open REST_PREWARM connections per pool: concurrent requests force distinct sockets."""
+        started = time.perf_counter()
+        await asyncio.gather(*(self._ping(self.sessions[name])
+                               for name, n in REST_PREWARM.items() for _ in range(n)))
+        logger.info(f"REST pools pre-warmed in {(time.perf_counter() - started)*1000:.0f}ms "
+                    f"({', '.join(f'{k}={v}' for k, v in REST_PREWARM.items())})")
+
+    async def keepalive_loop(self):
+        while True:
+            await asyncio.sleep(REST_KEEPALIVE_INTERVAL)
+            now = time.time()
+            for name, n in REST_PREWARM.items():
+                if now - self.stats[name].last_request_at >= REST_KEEPALIVE_INTERVAL:
+                    await asyncio.gather(*(self._ping(self.sessions[name]) for _ in range(n)))
+
+    async def close(self):
+        for session in self.sessions.values():
+            await session.close()
+
+    def report_lines(self):
+        lines = [f"    {'Pool':<8} {'reqs':>8} {'new conn':>9} {'reused':>8} {'reuse %':>8} {'avg ms':>8} {'errors':>7}"]
+        for name, s in self.stats.items():
+            total = s.created + s.reused
+            reuse_pct = s.reused / total * 100 if total else 0.0
+            avg_ms = s.latency_sum / s.requests * 1000 if s.requests else 0.0
+            lines.append(f"    {name:<8} {s.requests:>8} {s.created:>9} {s.reused:>8} {reuse_pct:>7.1f}% {avg_ms:>8.1f} {s.errors:>7}")
+        return lines
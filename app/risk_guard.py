@@ -0,0 +1,33 @@
+RISK_EXIT_RETRY = 2.0         # Re-fire an unfilled exit for the same side after (s)
+RISK_ENTRY_COOLDOWN = 30.0    # New entries on a stopped side stay blocked for (s)
+
+
+class RiskGuard:
+    """
+    Per-tick stop-loss check, O(1) against cached positions. Called on every
+    ticker / book_ticker update, independent of the quote refresh throttle.
+    check() says when to fire an exit (at most once per RISK_EXIT_RETRY per side);
+    entries_blocked() keeps that side from re-entering while the stop plays out.
+    """
+
+    def __init__(self):
+        self._exit_at = {'long': 0.0, 'short': 0.0}
+        self._blocked_until = {'long': 0.0, 'short': 0.0}
+        self.triggers = 0
+
+    def check(self, side, position, entry_price, price, sl_spread, now):
+        if position <= 0 or entry_price <= 0 or not price: return False
+        if side == 'long':
+            hit = price < entry_price * (1 - sl_spread)
+        else:
+            hit = price > entry_price * (1 + sl_spread)
+        if not hit: return False
+
+        self._blocked_until[side] = now + RISK_ENTRY_COOLDOWN
+        if now - self._exit_at[side] < RISK_EXIT_RETRY: return False
+        self._exit_at[side] = now
+        self.triggers += 1
+        return True
+
+    def entries_blocked(self, side, now):
+        return now < self._blocked_until[side]
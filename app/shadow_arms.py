@@ -0,0 +1,132 @@
+import logging
+
+from .param_sweep import SimulatedBot, MAKER_FEE_RATE
+from .risk_guard import RiskGuard
+
+logger = logging.getLogger("Shadow_Arms")
+
+# Market context copied from the live bot onto every shadow before it requotes
+SHADOW_CONTEXT = ("eta", "sigma", "sl_spread", "trend_alpha", "funding_rate", "rsi_val", "high_1m", "low_1m",
+                  "trade_tape", "order_book", "tick_size", "price_precision", "dynamic_refresh_time")
+
+
+class ShadowArm:
+    """One gamma quoting virtually: resting orders are [price, remaining qty, reduce_only]."""
+
+    def __init__(self, gamma, sim):
+        self.gamma = gamma
+        self.sim = sim
+        self.guard = RiskGuard()
+        self.bids = []
+        self.asks = []
+        self.fills = 0
+        self.last_net = 0.0
+
+
+class ShadowArms:
+    """
+    Every UCB arm quotes a lightweight SimulatedBot copy of the live strategy on the
+    same feed: requotes follow the live refresh cadence with the live market context,
+    resting virtual orders fill when a public trade prints through them, and stops
+    go through a per-arm RiskGuard. collect() returns each arm's PnL change since
+    the last call, so the bandit gets one reward per arm per interval while only the
+    selected arm actually trades.
+    """
+
+    def __init__(self, bot, arms):
+        self.bot = bot
+        self.arms = {}
+        for gamma in arms:
+            cfg = {"gamma": gamma, "t_end": bot.T_end, "max_entry_spread": bot.max_entry_spread,
+                   "tp_spread": bot.tp_spread, "stop_loss_spread": bot.sl_floor, "order_layers": bot.order_layers}
+            sim = SimulatedBot(cfg, bot.initial_quantity, bot.contract_size, bot.funding_rate)
+            sim.layer_spread = bot.layer_spread
+            sim.grid_spacing = bot.grid_spacing
+            sim.position_limit = bot.position_limit
+            self.arms[gamma] = ShadowArm(gamma, sim)
+        self.last_quote = 0.0
+
+    def _requote(self, arm, price, now):
+        bot, sim = self.bot, arm.sim
+        for name in SHADOW_CONTEXT:
+            setattr(sim, name, getattr(bot, name))
+        sim.pnl.contract_size = bot.contract_size
+        sim.update_mid_price(None, price)
+
+        arm.bids, arm.asks = [], []
+        if not arm.guard.entries_blocked('long', now):
+            prices, sizes = sim._entry_ladder('long', price)
+            arm.bids += [[p, q, False] for p, q in zip(prices.tolist(), sizes.tolist())]
+        if not arm.guard.entries_blocked('short', now):
+            prices, sizes = sim._entry_ladder('short', price)
+            arm.asks += [[p, q, False] for p, q in zip(prices.tolist(), sizes.tolist())]
+        if sim.long_position > 0:
+            arm.asks.append([sim._tp_price('long', price), sim.long_position, True])
+        if sim.short_position > 0:
+            arm.bids.append([sim._tp_price('short', price), sim.short_position, True])
+
+    def on_tick(self, price, now):
+        if not price: return
+        taker = self.bot.taker_fee_rate
+        for arm in self.arms.values():
+            sim = arm.sim
+            if arm.guard.check('long', sim.long_position, sim.long_entry_price, price, sim.sl_spread, now):
+                sim.fill('sell', sim.long_position, price, True, taker)
+                arm.fills += 1
+                arm.bids = [o for o in arm.bids if o[2]]
+                arm.asks = [o for o in arm.asks if not o[2]]
+            if arm.guard.check('short', sim.short_position, sim.short_entry_price, price, sim.sl_spread, now):
+                sim.fill('buy', sim.short_position, price, True, taker)
+                arm.fills += 1
+                arm.asks = [o for o in arm.asks if o[2]]
+                arm.bids = [o for o in arm.bids if not o[2]]
+
+        if now - self.last_quote >= self.bot.dynamic_refresh_time:
+            self.last_quote = now
+            for arm in self.arms.values():
+                self._requote(arm, price, now)
+
+    def on_trade(self, price, size):
+        """A taker sell (size < 0) trading below a resting bid fills it; a taker buy above an ask likewise."""
+        if size < 0:
+            side, book, hit = 'buy', 'bids', lambda p: price < p
+        else:
+            side, book, hit = 'sell', 'asks', lambda p: price > p
+        for arm in self.arms.values():
+            orders = getattr(arm, book)
+            if not orders: continue
+            left = abs(size)
+            for o in orders:
+                if left <= 0: break
+                if not hit(o[0]): continue
+                sim = arm.sim
+                if o[2]:
+                    held = sim.short_position if side == 'buy' else sim.long_position
+                    q = min(o[1], left, held)
+                else:
+                    q = min(o[1], left)
+                if q > 0:
+                    sim.fill(side, q, o[0], o[2], MAKER_FEE_RATE)
+                    arm.fills += 1
+                    left -= q
+                o[1] -= q
+                if o[2] and q == 0: o[1] = 0 # Position already gone
+            setattr(arm, book, [o for o in orders if o[1] > 0])
+
+    def collect(self, price):
+        """Per-arm reward: net PnL change (marked at price) since the previous collect()."""
+        rewards = {}
+        for gamma, arm in self.arms.items():
+            if price: arm.sim.pnl.mark(price)
+            net = arm.sim.pnl.net_pnl
+            rewards[gamma] = net - arm.last_net
+            arm.last_net = net
+        return rewards
+
+    def report_lines(self):
+        lines = []
+        for gamma, arm in self.arms.items():
+            sim = arm.sim
+            lines.append(f"    Gamma={gamma:<5} Net {sim.pnl.net_pnl:>10.4f} | Fills {arm.fills:>5} | "
+                         f"L {sim.long_position:g} / S {sim.short_position:g}")
+        return lines
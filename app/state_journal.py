@@ -0,0 +1,140 @@
+import os
+import json
+import time
+import logging
+import threading
+
+logger = logging.getLogger("State_Journal")
+
+JOURNAL_DIR = "log"
+JOURNAL_SNAPSHOT_EVERY = 1000   # Events between compact snapshots
+
+
+class StateJournal:
+    """
+    Append-only JSONL journal of state-changing events plus a compact snapshot.
+
+    Every event carries a sequence number. snapshot() writes the full state
+    atomically (tmp file + os.replace) tagged with the last sequence it covers,
+    then starts a fresh journal. recover() loads the snapshot and returns only
+    the events after it, so a crash between the two steps replays nothing twice.
+    Lines are flushed on write (survives a process crash, not a power loss).
+
+    snapshot(background=True) keeps the file write and fsync off the caller: the
+    state is serialized and the journal rotated to a .prev file in place (a
+    rename, no disk wait), then a thread writes the snapshot and deletes .prev
+    once it is durable. Until then recover() still replays .prev.
+    """
+
+    def __init__(self, name, directory=JOURNAL_DIR, snapshot_every=JOURNAL_SNAPSHOT_EVERY):
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, f"state-{name}.jsonl")
+        self.snapshot_path = os.path.join(directory, f"state-{name}.snap.json")
+        self.prev_path = self.path + ".prev"     # Journal rotated out by a snapshot still being written
+        self.snapshot_every = snapshot_every
+        self.seq = 0
+        self.since_snapshot = 0
+        self.last_ts = None
+        self._file = None
+        self._writer = None                      # Background snapshot thread in flight
+
+    def recover(self):
+        """Returns (snapshot state or None, [(kind, data), ...] to replay after it)."""
+        started = time.perf_counter()
+        state, snap_seq = None, 0
+        try:
+            with open(self.snapshot_path) as f:
+                snap = json.load(f)
+            state, snap_seq = snap["state"], snap["seq"]
+            self.last_ts = snap["ts"]
+        except FileNotFoundError:
+            pass
+        except (ValueError, KeyError) as e:
+            logger.error(f"Unreadable snapshot {self.snapshot_path}: {e}")
+
+        events = []
+        self.seq = snap_seq
+        for path in (self.prev_path, self.path):
+            try:
+                with open(path) as f:
+                    for line in f:
+                        try:
+                            ev = json.loads(line)
+                        except ValueError:
+                            break # Torn last line from a crash mid-write
+                        if ev["s"] <= self.seq: continue
+                        events.append((ev["k"], ev["d"]))
+                        self.seq = ev["s"]
+                        self.last_ts = ev["t"]
+            except FileNotFoundError:
+                pass
+
+        self.since_snapshot = len(events)
+        if state is not None or events:
+            logger.info(f"Journal recovered: snapshot seq {snap_seq} + {len(events)} events "
+                        f"in {(time.perf_counter() - started)*1000:.1f}ms")
+        return state, events
+
+    def _open(self):
+        if self._file is None:
+            self._file = open(self.path, "a", buffering=1)
+        return self._file
+
+    def append(self, kind, data):
+        self.seq += 1
+        self.since_snapshot += 1
+        self.last_ts = time.time()
+        self._open().write(json.dumps({"s": self.seq, "t": self.last_ts, "k": kind, "d": data}, separators=(",", ":")) + "\n")
+
+    @property
+    def snapshot_due(self):
+        return self.since_snapshot >= self.snapshot_every and not (self._writer and self._writer.is_alive())
+
+    def _write_snapshot(self, payload):
+        tmp = self.snapshot_path + ".tmp"
+        with open(tmp, "w") as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.snapshot_path)
+
+    def _write_rotated(self, payload):
+        try:
+            self._write_snapshot(payload)
+            os.remove(self.prev_path) # Covered by the snapshot now
+        except Exception as e:
+            logger.error(f"Snapshot write failed ({e}), keeping {self.prev_path} for replay")
+
+    def snapshot(self, state, background=False):
+        self.wait()
+        payload = json.dumps({"seq": self.seq, "ts": time.time(), "state": state}, separators=(",", ":"))
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self.since_snapshot = 0
+
+        if not background or os.path.exists(self.prev_path): # A failed background write left .prev: don't rotate over it
+            self._write_snapshot(payload)
+            # Everything so far is in the snapshot: start an empty journal
+            open(self.path, "w").close()
+            if os.path.exists(self.prev_path): os.remove(self.prev_path)
+            return
+        # Events from here on go to a fresh journal; the rotated one stays replayable until the snapshot lands
+        if os.path.exists(self.path): os.replace(self.path, self.prev_path)
+        self._writer = threading.Thread(target=self._write_rotated, args=(payload,), name="journal-snapshot", daemon=True)
+        self._writer.start()
+
+    def wait(self):
+        """Block until a background snapshot in flight is on disk."""
+        if self._writer is not None:
+            self._writer.join()
+            self._writer = None
+
+    def age(self):
+        return time.time() - self.last_ts if self.last_ts else None
+
+    def close(self):
+        self.wait()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
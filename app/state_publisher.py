@@ -0,0 +1,200 @@
+import os
+import time
+import struct
+import atexit
+import logging
+import argparse
+from multiprocessing import shared_memory
+
+logger = logging.getLogger("State_Publisher")
+
+SEGMENT_PREFIX = "gatebot-"     # Shared memory name: gatebot-<coin>-<account>
+LAYOUT_VERSION = 1              # Bump whenever FIELDS changes
+READ_RETRIES = 1000             # Seqlock retries before a reader gives up on a busy writer
+
+# Snapshot fields, in layout order (d = float64, Q = uint64)
+FIELDS = (
+    ("ts", "d"), ("latest_price", "d"), ("best_bid", "d"), ("best_ask", "d"),
+    ("long_position", "d"), ("long_entry_price", "d"), ("short_position", "d"), ("short_entry_price", "d"),
+    ("reserve_price", "d"), ("gamma", "d"), ("sigma", "d"),
+    ("balance", "d"), ("equity", "d"), ("net_pnl", "d"), ("realized_pnl", "d"), ("unrealized_pnl", "d"),
+    ("fees_paid", "d"),
+    ("open_bids", "Q"), ("open_asks", "Q"), ("open_bid_qty", "d"), ("open_ask_qty", "d"),
+    ("top_open_bid", "d"), ("top_open_ask", "d"),
+    ("loop_lag_p99_ms", "d"), ("loop_stalls", "Q"), ("ws_order_rtt_ms", "d"), ("ws_orders_sent", "Q"),
+    ("ticks_posted", "Q"), ("ticks_conflated", "Q"), ("updates", "Q"),
+)
+FIELD_NAMES = tuple(name for name, _ in FIELDS)
+
+SEQ = struct.Struct("<Q")               # Offset 0: seqlock counter (odd while a write is in progress)
+HEADER = struct.Struct("<4sHHII")       # Offset 8: magic, layout version, field count, writer pid, reserved
+PAYLOAD = struct.Struct("<" + "".join(fmt for _, fmt in FIELDS))
+MAGIC = b"GBST"
+PAYLOAD_OFFSET = SEQ.size + HEADER.size
+SEGMENT_SIZE = PAYLOAD_OFFSET + PAYLOAD.size
+
+
+def segment_name(name):
+    return name if name.startswith(SEGMENT_PREFIX) else SEGMENT_PREFIX + name
+
+
+def _segment_owner(buf):
+    """Writer pid from an existing segment's header, or 0 if it is not one of ours."""
+    if len(buf) < PAYLOAD_OFFSET: return 0
+    magic, _, _, pid, _ = HEADER.unpack_from(buf, SEQ.size)
+    return pid if magic == MAGIC else 0
+
+
+def _attach(name):
+    """Open an existing segment without letting the resource tracker unlink it when this process exits."""
+    try:
+        return shared_memory.SharedMemory(name, track=False)
+    except TypeError: # Python < 3.13
+        from multiprocessing import resource_tracker
+        shm = shared_memory.SharedMemory(name)
+        resource_tracker.unregister(shm._name, "shared_memory")
+        return shm
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError: # Exists, owned by another user
+        return True
+    return True
+
+
+class StatePublisher:
+    """
+    Writer side: one fixed-layout snapshot per bot in a named shared memory
+    segment, rewritten in place under a seqlock (counter odd while writing, even
+    when consistent). A publish is a few struct.pack_into calls with no syscalls
+    and no locks, so the trading loop never waits for readers. Readers copy the
+    payload and retry if the counter moved underneath them.
+    """
+
+    def __init__(self, name):
+        self.name = segment_name(name)
+        try:
+            self.shm = shared_memory.SharedMemory(self.name, create=True, size=SEGMENT_SIZE)
+        except FileExistsError: # Left behind by a crashed run of the same bot: take it over
+            self.shm = _attach(self.name)
+            owner = _segment_owner(self.shm.buf)
+            if owner and owner != os.getpid() and _pid_alive(owner):
+                self.shm.close()
+                raise FileExistsError(f"{self.name} is published by running pid {owner}")
+            if self.shm.size < SEGMENT_SIZE:
+                self.shm.close()
+                self.shm.unlink()
+                self.shm = shared_memory.SharedMemory(self.name, create=True, size=SEGMENT_SIZE)
+        self.buf = self.shm.buf
+        self.seq = 0
+        SEQ.pack_into(self.buf, 0, 1) # Odd until the first snapshot lands
+        HEADER.pack_into(self.buf, SEQ.size, MAGIC, LAYOUT_VERSION, len(FIELDS), os.getpid(), 0)
+        self.updates = 0
+        atexit.register(self.close)
+
+    def publish(self, values):
+        """values: tuple in FIELDS order, with 'updates' left out (the publisher fills it in)."""
+        self.updates += 1
+        buf = self.buf
+        seq = self.seq
+        SEQ.pack_into(buf, 0, seq + 1)
+        PAYLOAD.pack_into(buf, PAYLOAD_OFFSET, *values, self.updates)
+        SEQ.pack_into(buf, 0, seq + 2)
+        self.seq = seq + 2
+
+    def close(self):
+        if self.buf is None: return
+        self.buf = None
+        try:
+            self.shm.close()
+            self.shm.unlink()
+        except (OSError, BufferError): pass
+
+
+def create_publisher(name):
+    """Publisher for this bot, or None if shared memory is unavailable."""
+    try:
+        return StatePublisher(name)
+    except OSError as e:
+        logger.warning(f"State publisher disabled ({e})")
+        return None
+
+
+class StateReader:
+    """Reader side: attaches read-only to a bot's segment; read() returns a consistent snapshot dict."""
+
+    def __init__(self, name):
+        self.name = segment_name(name)
+        self.shm = _attach(self.name)
+        self.buf = self.shm.buf
+        magic, version, n_fields, self.pid, _ = HEADER.unpack_from(self.buf, SEQ.size)
+        if magic != MAGIC or version != LAYOUT_VERSION or n_fields != len(FIELDS):
+            self.close()
+            raise ValueError(f"{self.name}: layout {magic!r} v{version} ({n_fields} fields), expected v{LAYOUT_VERSION}")
+        self.retries = 0
+
+    def read(self):
+        """Latest consistent snapshot, or None if nothing has been published yet."""
+        buf = self.buf
+        for _ in range(READ_RETRIES):
+            before = SEQ.unpack_from(buf, 0)[0]
+            if before & 1:
+                if before == 1: return None
+                self.retries += 1
+                continue
+            values = PAYLOAD.unpack_from(buf, PAYLOAD_OFFSET)
+            if SEQ.unpack_from(buf, 0)[0] == before:
+                return dict(zip(FIELD_NAMES, values))
+            self.retries += 1
+        raise TimeoutError(f"{self.name}: no consistent snapshot after {READ_RETRIES} tries")
+
+    def close(self):
+        self.buf = None
+        self.shm.close()
+
+
+def list_segments():
+    """Names of published bot segments on this host (Linux /dev/shm)."""
+    try:
+        return sorted(n[len(SEGMENT_PREFIX):] for n in os.listdir("/dev/shm") if n.startswith(SEGMENT_PREFIX))
+    except FileNotFoundError:
+        return []
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Live bot state from shared memory (no exchange API calls)")
+    parser.add_argument("name", nargs="?", help="<coin>-<account>, e.g. XRP-default (omit to list)")
+    parser.add_argument("--interval", type=float, default=1.0, help="Refresh period (s)")
+    parser.add_argument("--once", action="store_true", help="Print one snapshot and exit")
+    args = parser.parse_args()
+
+    if not args.name:
+        for name in list_segments(): print(name)
+        return
+
+    reader = StateReader(args.name)
+    try:
+        while True:
+            snap = reader.read()
+            if snap is None:
+                print("(no snapshot yet)")
+            else:
+                age = time.time() - snap["ts"]
+                print(f"\n{args.name} pid {reader.pid} | age {age:.3f}s | updates {snap['updates']}")
+                for name in FIELD_NAMES[1:-1]:
+                    value = snap[name]
+                    print(f"  {name:<20} {value:g}" if isinstance(value, float) else f"  {name:<20} {value}")
+            if args.once: break
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        reader.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -4,11 +4,11 @@ import time
 import random
 import logging
 import math
-import pandas as pd
 import requests
 import os
 from avellaneda_bot import AvellanedaGridBot
 from avellaneda_utils import get_gateio_kline
+from indicators import coin_score
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -49,30 +49,25 @@ class CoinSelector:
         """
         metrics = []
         for coin in self.coins:
-            pair = f"{coin}_USDT"
             try:
                 # 獲取最近 24H 數據
-                df = get_gateio_kline(pair, interval="1h", limit=24)
-                if df.empty:
+                candles = get_gateio_kline(coin, interval="1h", limit=24)
+                if candles is None or len(candles) < 3:
                     continue
                 
-                # 計算波動率 (標準差)
-                df['log_ret'] = math.log(df['close'] / df['close'].shift(1))
-                volatility = df['log_ret'].std()
-                
-                # 計算成交量 (簡單加總)
-                volume = df['close'] * df['volume_base'] # 近似成交額
-                total_volume = volume.sum()
+                # 波動率 (對數報酬標準差) + 成交額 (close * volume 加總)
+                score, volatility, total_volume = coin_score(candles)
                 
                 metrics.append({
                     "coin": coin,
                     "volatility": volatility,
-                    "volume": total_volume
+                    "volume": total_volume,
+                    "score": score
                 })
             except Exception as e:
                 logger.error(f"獲取 {coin} 數據失敗: {e}")
         
-        return pd.DataFrame(metrics)
+        return metrics
 
     def select_best_coin(self):
         """
@@ -80,26 +75,20 @@ class CoinSelector:
         策略: 選擇波動率最高 且 成交量足夠 的幣種 (適合網格/AS策略)
         """
         logger.info("正在進行選幣分析 (AI Sorting Proxy)...")
-        metrics_df = self.get_market_metrics()
+        metrics = self.get_market_metrics()
         
-        if metrics_df.empty:
+        if not metrics:
             logger.warning("無法獲取市場數據，隨機選擇默認幣種 XRP")
             return "XRP"
             
-        # 簡單評分: 波動率 * 1000 + 成交量(對數)
+        # 簡單評分: 波動率 * 10000 + 成交量(對數)
         # 我們希望波動率大 (有價差賺)，流動性好 (成交量高)
-        metrics_df['score'] = metrics_df['volatility'] * 10000 + dataframe_log_volume(metrics_df) 
-        
-        best_coin_row = metrics_df.sort_values('score', ascending=False).iloc[0]
-        best_coin = best_coin_row['coin']
+        best = max(metrics, key=lambda m: m["score"])
+        best_coin = best["coin"]
         
-        logger.info(f"選幣結果: {best_coin} (Vol: {best_coin_row['volatility']:.4f})")
+        logger.info(f"選幣結果: {best_coin} (Vol: {best['volatility']:.4f})")
         return best_coin
 
-def dataframe_log_volume(df):
-    # 輔助函數: 處理 log volume 避免 0
-    return df['volume'].apply(lambda x: math.log(x) if x > 0 else 0)
-
 
 # ==================== 2. UCB 參數優化 ====================
 class UCBOptimizer:
@@ -0,0 +1,104 @@
+import numpy as np
+
+TAPE_WINDOWS = (1, 5, 30, 60)   # Rolling windows (s)
+TAPE_CAPACITY = 65536           # Trades held; sized for peak-volatility rates over the longest window
+TAPE_OFFSET_ALPHA = 0.05        # EWMA weight of each trade's (local receive - exchange ts) sample
+
+
+class TradeTape:
+    """
+    Public trade tape with rolling order-flow features over several windows.
+
+    Trades are written into preallocated numeric ring buffers. Each window keeps
+    its own tail index and running buy/sell sums, so add() and eviction are O(1)
+    amortized per trade and per window, with no per-trade containers.
+
+    Windows run on exchange time. add() with the local receive time tracks the
+    exchange-to-local offset (clock skew plus feed lag), and exchange_time() maps
+    a local clock reading onto the tape's clock, so windows still decay when the
+    tape goes quiet without being shifted or emptied by skew.
+    """
+
+    def __init__(self, windows=TAPE_WINDOWS, capacity=TAPE_CAPACITY):
+        self.windows = tuple(windows)
+        self.capacity = capacity
+        self._ts = np.zeros(capacity)
+        self._size = np.zeros(capacity)   # Signed: > 0 taker buy, < 0 taker sell
+        self._head = 0                    # Monotonic write index
+
+        n = len(self.windows)
+        self._tails = [0] * n
+        self.buy_vol = [0.0] * n
+        self.sell_vol = [0.0] * n
+        self.count = [0] * n
+        self.clock_offset = None          # EWMA of local receive time - exchange ts (s)
+
+    def add(self, ts, size, received=None):
+        if received is not None:
+            lag = received - ts
+            self.clock_offset = lag if self.clock_offset is None else self.clock_offset + TAPE_OFFSET_ALPHA * (lag - self.clock_offset)
+        head = self._head
+        # Ring full: drop the slot about to be overwritten from any window still holding it
+        if head >= self.capacity:
+            for j in range(len(self.windows)):
+                if head - self._tails[j] >= self.capacity:
+                    self._drop(j)
+
+        i = head % self.capacity
+        self._ts[i] = ts
+        self._size[i] = size
+        self._head = head + 1
+
+        for j in range(len(self.windows)):
+            if size > 0: self.buy_vol[j] += size
+            else: self.sell_vol[j] -= size
+            self.count[j] += 1
+        self._evict(ts)
+
+    def _drop(self, j):
+        size = float(self._size[self._tails[j] % self.capacity])
+        if size > 0: self.buy_vol[j] -= size
+        else: self.sell_vol[j] += size
+        self.count[j] -= 1
+        self._tails[j] += 1
+
+    def _evict(self, now):
+        for j, w in enumerate(self.windows):
+            cutoff = now - w
+            while self._tails[j] < self._head and self._ts[self._tails[j] % self.capacity] < cutoff:
+                self._drop(j)
+            if self.count[j] == 0: # Reset float drift
+                self.buy_vol[j] = 0.0
+                self.sell_vol[j] = 0.0
+
+    def exchange_time(self, local_now):
+        """Local wall-clock time mapped onto the exchange timestamps the tape is filled with."""
+        return local_now - (self.clock_offset or 0.0)
+
+    def _index(self, window):
+        return self.windows.index(window)
+
+    def ofi(self, window, now=None):
+        """Order-flow imbalance in [-1, 1]: (buy - sell) / (buy + sell)."""
+        if now is not None: self._evict(now)
+        j = self._index(window)
+        total = self.buy_vol[j] + self.sell_vol[j]
+        return (self.buy_vol[j] - self.sell_vol[j]) / total if total > 0 else 0.0
+
+    def trade_rate(self, window, now=None):
+        if now is not None: self._evict(now)
+        return self.count[self._index(window)] / window
+
+    def features(self, now=None):
+        if now is not None: self._evict(now)
+        out = {}
+        for j, w in enumerate(self.windows):
+            total = self.buy_vol[j] + self.sell_vol[j]
+            out[w] = {
+                "buy_vol": self.buy_vol[j],
+                "sell_vol": self.sell_vol[j],
+                "ofi": (self.buy_vol[j] - self.sell_vol[j]) / total if total > 0 else 0.0,
+                "trade_rate": self.count[j] / w,
+                "count": self.count[j],
+            }
+        return out
@@ -19,16 +19,18 @@ class UCBManager:
         self.current_arm = random.choice(self.arms)
         self.last_arm = self.current_arm
 
-    def select_arm(self):
+    def select_arm(self, context=None):
         """
         Selects the next arm (Gamma) using the UCB1 algorithm.
+        context: ignored (UCB1 is context-free; accepted for LinUCBManager parity).
         """
-        # 1. Ensure every arm is played at least once
-        for arm in self.arms:
-            if self.counts[arm] == 0:
-                self.current_arm = arm
-                logger.info(f"[UCB] Cold Start: Trying Gamma={arm}")
-                return arm
+        # 1. Ensure every arm is played at least once (in random order)
+        untried = [arm for arm in self.arms if self.counts[arm] == 0]
+        if untried:
+            arm = random.choice(untried)
+            self.current_arm = arm
+            logger.info(f"[UCB] Cold Start: Trying Gamma={arm}")
+            return arm
 
         # 2. UCB1 Logic
         best_arm = None
@@ -48,11 +50,13 @@ class UCBManager:
         logger.info(f"[UCB] Selected Gamma={best_arm} (Score={max_ucb:.4f})")
         return best_arm
 
-    def update(self, reward):
+    def update(self, reward, arm=None, context=None):
         """
         Updates the Q-value (Average Reward) for the *last used* arm using the received reward.
+        arm: credit a specific arm instead (shadow evaluation scores every arm each interval).
         """
-        arm = self.current_arm # The arm that just generated this reward
+        if arm is None:
+            arm = self.current_arm # The arm that just generated this reward
         
         self.counts[arm] += 1
         self.total_counts += 1
@@ -65,3 +69,23 @@ class UCBManager:
         self.values[arm] = new_value
         
         logger.info(f"[UCB] Updated Gamma={arm} | Reward={reward:.4f} | New Avg={new_value:.4f} | Count={n}")
+
+    def update_many(self, rewards, context=None):
+        """rewards: {arm: reward} for one interval (shadow evaluation)."""
+        for arm, reward in rewards.items():
+            self.update(reward, arm)
+
+    def to_dict(self):
+        return {"arms": self.arms, "counts": [self.counts[a] for a in self.arms],
+                "values": [self.values[a] for a in self.arms], "total_counts": self.total_counts,
+                "current_arm": self.current_arm}
+
+    def load_dict(self, d):
+        """Restore learned stats for the arms that still exist."""
+        for arm, n, v in zip(d["arms"], d["counts"], d["values"]):
+            if arm in self.counts:
+                self.counts[arm] = n
+                self.values[arm] = v
+        self.total_counts = sum(self.counts.values())
+        if d.get("current_arm") in self.counts:
+            self.current_arm = self.last_arm = d["current_arm"]
@@ -0,0 +1,167 @@
+import asyncio
+import hashlib
+import hmac
+import itertools
+import json
+import logging
+import random
+import time
+
+import websockets
+
+logger = logging.getLogger("WS_Trading")
+
+WS_API_ACK_TIMEOUT = 1.0      # Server must ack receipt within (s)
+WS_API_TIMEOUT = 3.0          # Final result within (s)
+WS_API_RECONNECT_MAX = 5      # Backoff ceiling (s)
+
+
+class WsTransportError(Exception):
+    """The request did not reach the exchange (not connected / send failed): safe to retry over REST."""
+
+
+class WsOrderTimeout(Exception):
+    """Sent but no result in time: outcome unknown, do not blindly resend."""
+
+
+class WsApiError(Exception):
+    """The exchange answered with an error (e.g. INSUFFICIENT_AVAILABLE)."""
+
+    def __init__(self, label, message):
+        super().__init__(f"{label}: {message}")
+        self.label = label
+
+
+class WsOrderGateway:
+    """
+    Order entry over Gate.io's futures WebSocket API (futures.order_place / order_cancel /
+    order_amend / order_batch_place) on its own authenticated socket, so acks are read
+    even while the market-data socket is busy. Requests are correlated by req_id;
+    each waits for the server ack and then for the final result, with timeouts.
+    """
+
+    def __init__(self, url, api_key, api_secret):
+        self.url = url
+        self.api_key = api_key
+        self.api_secret = api_secret
+        self.ready = False
+        self._ws = None
+        self._pending = {}
+        self._seq = itertools.count(1)
+        self._prefix = f"{int(time.time()) % 100000}"
+
+        self.sent = 0
+        self.ok = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self.latency_sum = 0.0
+
+    async def run(self):
+        attempt = 0
+        while True:
+            try:
+                async with websockets.connect(self.url, ping_interval=20, ping_timeout=20) as websocket:
+                    self._ws = websocket
+                    reader = asyncio.create_task(self._read(websocket))
+                    try:
+                        await self._request("futures.login", "", require_ready=False, signed=True)
+                        self.ready = True
+                        attempt = 0
+                        logger.info("WS order gateway logged in")
+                        await reader
+                    finally:
+                        reader.cancel()
+            except Exception as e:
+                logger.warning(f"WS order gateway down: {e!r}")
+            self.ready = False
+            self._ws = None
+            for ack, result in self._pending.values():
+                if not result.done(): result.set_exception(WsOrderTimeout("connection lost after send"))
+            cap = min(WS_API_RECONNECT_MAX, 0.1 * (2 ** attempt))
+            attempt += 1
+            await asyncio.sleep(random.uniform(0, cap))
+
+    async def _read(self, websocket):
+        async for message in websocket:
+            try:
+                self._on_message(json.loads(message))
+            except Exception as e:
+                logger.error(f"WS API Msg Error: {e}")
+
+    def _on_message(self, data):
+        entry = self._pending.get(data.get("request_id"))
+        if entry is None: return
+        ack, result = entry
+        if not ack.done(): ack.set_result(True)
+        if data.get("ack") or result.done(): return
+
+        status = str((data.get("header") or {}).get("status", "200"))
+        body = data.get("data") or {}
+        if status != "200":
+            errs = body.get("errs") or {}
+            result.set_exception(WsApiError(errs.get("label", status), errs.get("message", "")))
+        else:
+            result.set_result(body.get("result"))
+
+    def _sign(self, channel, req_param, ts):
+        msg = f"api\n{channel}\n{req_param}\n{ts}"
+        return hmac.new(self.api_secret.encode("utf-8"), msg.encode("utf-8"), hashlib.sha512).hexdigest()
+
+    async def _request(self, channel, req_param, require_ready=True, signed=False):
+        if (require_ready and not self.ready) or self._ws is None:
+            raise WsTransportError("not connected")
+
+        ts = int(time.time())
+        req_id = f"{self._prefix}-{next(self._seq)}"
+        payload = {"req_id": req_id}
+        if req_param != "": payload["req_param"] = req_param
+        if signed:
+            payload.update({"api_key": self.api_key, "timestamp": str(ts),
+                            "signature": self._sign(channel, req_param if isinstance(req_param, str) else json.dumps(req_param), ts)})
+
+        loop = asyncio.get_running_loop()
+        ack, result = loop.create_future(), loop.create_future()
+        self._pending[req_id] = (ack, result)
+        started = time.perf_counter()
+        try:
+            try:
+                await self._ws.send(json.dumps({"time": ts, "channel": channel, "event": "api", "payload": payload}))
+            except Exception as e:
+                raise WsTransportError(f"send failed: {e}")
+            self.sent += 1
+            try:
+                await asyncio.wait_for(asyncio.shield(ack), WS_API_ACK_TIMEOUT)
+                res = await asyncio.wait_for(result, WS_API_TIMEOUT)
+            except asyncio.TimeoutError:
+                self.timeouts += 1
+                raise WsOrderTimeout(f"{channel} {req_id}: no response")
+            except WsApiError:
+                self.rejected += 1
+                raise
+            self.ok += 1
+            self.latency_sum += time.perf_counter() - started
+            return res
+        finally:
+            self._pending.pop(req_id, None)
+
+    # ---------- Order API ----------
+    async def place_order(self, order):
+        """order: Gate futures order dict (contract, size (+buy / -sell), price, tif, reduce_only, text)."""
+        return await self._request("futures.order_place", order)
+
+    async def batch_place(self, orders):
+        return await self._request("futures.order_batch_place", orders)
+
+    async def cancel_order(self, order_id):
+        return await self._request("futures.order_cancel", {"order_id": str(order_id)})
+
+    async def amend_order(self, order_id, price=None, size=None):
+        param = {"order_id": str(order_id)}
+        if price is not None: param["price"] = str(price)
+        if size is not None: param["size"] = size
+        return await self._request("futures.order_amend", param)
+
+    def report_lines(self):
+        avg = self.latency_sum / self.ok * 1000 if self.ok else 0.0
+        return [f"    {'WS orders sent / ok':<25} {self.sent} / {self.ok} (rejected {self.rejected}, timeouts {self.timeouts})",
+                f"    {'WS order round-trip avg':<25} {avg:.1f} ms"]
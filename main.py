@@ -4,9 +4,11 @@ import os
 
 from app.avellaneda_bot import main as bot_main
 from app.bot import logger
+from app.loop_monitor import install_fast_event_loop
 
 if __name__ == "__main__":
     logger.info("Starting via Root main.py...")
+    install_fast_event_loop()
     try:
         asyncio.run(bot_main())
     except KeyboardInterrupt:
@@ -0,0 +1,54 @@
+import pytest
+
+from app.pnl_engine import PnLEngine
+
+
+def test_hedge_mode_opens_and_closes_both_books():
+    pnl = PnLEngine()
+    pnl.on_fill('buy', 10, 1.00, reduce_only=False)    # Open long
+    pnl.on_fill('sell', 10, 1.02, reduce_only=False)   # Open short
+    assert (pnl.long_qty, pnl.short_qty) == (10, 10)
+    assert pnl.realized == 0.0
+
+    pnl.on_fill('buy', 10, 1.00, reduce_only=True)     # Close short
+    assert pnl.short_qty == 0 and pnl.long_qty == 10
+    assert pnl.realized == pytest.approx(0.2)
+
+    pnl.on_fill('sell', 4, 1.01, reduce_only=True)     # Partial long close
+    assert pnl.long_qty == 6 and pnl.long_avg == pytest.approx(1.00)
+    assert pnl.realized == pytest.approx(0.24)
+
+
+def test_open_averages_entry_and_fees_reduce_net():
+    pnl = PnLEngine(contract_size=10)
+    pnl.on_fill('sell', 1, 2.0, fee=0.01, reduce_only=False)
+    pnl.on_fill('sell', 3, 1.0, fee=0.01, reduce_only=False)
+    assert pnl.short_avg == pytest.approx(1.25)
+    pnl.mark(1.0)
+    assert pnl.unrealized == pytest.approx(10.0)
+    assert pnl.net_pnl == pytest.approx(10.0 - 0.02)
+
+
+def test_unknown_reduce_only_with_both_books_open_is_repaired_by_reconcile():
+    pnl = PnLEngine()
+    pnl.on_fill('buy', 10, 1.00, reduce_only=False)
+    pnl.on_fill('sell', 10, 1.02, reduce_only=False)
+    pnl.on_fill('buy', 10, 1.00)                       # Close of unknown kind: booked as an open
+    pnl.mark(1.01)
+    net = pnl.net_pnl
+    assert pnl.long_qty == 20 and pnl.realized == 0.0
+
+    assert pnl.reconcile(10, 1.00, 0, 0.0)
+    assert (pnl.long_qty, pnl.short_qty, pnl.short_avg) == (10, 0, 0.0)
+    assert pnl.realized == pytest.approx(0.2)
+    assert pnl.net_pnl == pytest.approx(net)
+    assert not pnl.reconcile(10, 1.00, 0, 0.0)
+
+
+def test_seed_adopts_existing_positions():
+    pnl = PnLEngine()
+    pnl.mark(1.1)
+    pnl.seed(5, 1.0, 0, 0.0)
+    assert pnl.unrealized == pytest.approx(0.5)
+    pnl.on_fill('sell', 5, 1.2, reduce_only=True)
+    assert pnl.realized == pytest.approx(1.0) and pnl.long_qty == 0
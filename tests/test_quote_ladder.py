@@ -0,0 +1,65 @@
+import numpy as np
+
+from app.quote_ladder import build_ladder, LADDER_DEPTH_MAX
+
+
+def ladder(side="buy", base=1.0, layers=5, spread=0.001, tick=0.0001, qty=1, inventory=0.0, position=0.0,
+           limit=100, gamma=0.5, sigma=0.01, bound=None):
+    return build_ladder(side, base, layers, spread, tick, qty, inventory, position, limit, gamma, sigma, bound=bound)
+
+
+def test_prices_step_away_from_base_and_snap_to_tick():
+    bids, _ = ladder("buy", base=1.00005)
+    asks, _ = ladder("sell", base=0.99995)
+    assert np.allclose(bids, [1.0, 0.9990, 0.9980, 0.9970, 0.9960])
+    assert np.allclose(asks, [1.0, 1.0010, 1.0020, 1.0030, 1.0040])
+    # Snapped away from the market: bids never rise, asks never fall
+    assert np.all(bids <= 1.00005) and np.all(asks >= 0.99995)
+
+
+def test_levels_on_one_tick_collapse():
+    prices, sizes = ladder(base=1.0005, spread=0.00001, tick=0.001)
+    assert len(prices) == 1
+    assert len(sizes) == 1
+
+
+def test_bound_pulls_outer_levels_in_and_merges_them():
+    bids, _ = ladder("buy", layers=10, spread=0.0005, bound=0.999)
+    asks, _ = ladder("sell", layers=10, spread=0.0005, bound=1.001)
+    assert np.allclose(bids, [1.0, 0.9995, 0.999])
+    assert np.allclose(asks, [1.0, 1.0005, 1.001])
+
+
+def test_bound_snaps_inward_and_never_beyond_top_level():
+    bids, _ = ladder("buy", layers=3, spread=0.001, bound=0.99875)
+    assert bids.min() >= 0.99875
+    bids, _ = ladder("buy", base=0.9999, layers=3, spread=0.001, bound=0.99995)
+    assert np.allclose(bids, [0.9999])
+
+
+def test_sizes_grow_with_depth_and_are_capped():
+    _, sizes = ladder(layers=8, qty=10, spread=0.01, sigma=0.01, limit=1000)
+    assert np.all(np.diff(sizes) >= 0)
+    assert sizes.max() <= 10 * LADDER_DEPTH_MAX
+
+
+def test_inventory_shrinks_only_the_side_adding_to_it():
+    _, flat = ladder("buy", qty=10, inventory=0.0)
+    _, long_bids = ladder("buy", qty=10, inventory=50.0)
+    _, long_asks = ladder("sell", qty=10, inventory=50.0)
+    assert long_bids.sum() < flat.sum()
+    assert long_asks.sum() == flat.sum()
+
+
+def test_cumulative_size_capped_by_position_limit():
+    prices, sizes = ladder(layers=10, qty=10, position=85, limit=100)
+    assert sizes.sum() == 15
+    assert len(prices) == len(sizes)
+    prices, sizes = ladder(position=100, limit=100)
+    assert len(prices) == 0 and len(sizes) == 0
+
+
+def test_empty_inputs():
+    for kwargs in ({"layers": 0}, {"base": 0.0}):
+        prices, sizes = ladder(**kwargs)
+        assert len(prices) == 0 and sizes.dtype == np.int64
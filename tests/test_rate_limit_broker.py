@@ -0,0 +1,65 @@
+import os
+
+import pytest
+
+from app import rate_limit_broker
+from app.rate_limit_broker import RateLimitBroker, RATE_LIMIT_SLOTS, RATE_LIMIT_RESERVE, HEADER, SLOT
+
+pytest.importorskip("fcntl")
+
+
+@pytest.fixture
+def make_broker(tmp_path, monkeypatch):
+    monkeypatch.setattr(rate_limit_broker, "RATE_LIMIT_DIR", str(tmp_path))
+    brokers = []
+
+    def make(pid=None, rate=1.0):
+        broker = RateLimitBroker("test", rate)
+        if pid is not None: broker.pid = pid
+        brokers.append(broker)
+        return broker
+
+    yield make
+    for broker in brokers: broker.close()
+
+
+def tokens(broker):
+    return HEADER.unpack_from(broker._mm, 0)[0]
+
+
+def test_reserve_is_left_for_priority_calls(make_broker):
+    broker = make_broker()
+    granted = 0
+    while broker._try_acquire(1.0, False) == 0: granted += 1
+    assert granted > 0
+    assert tokens(broker) >= broker.burst * RATE_LIMIT_RESERVE - 1
+
+    priority = 0
+    while broker._try_acquire(1.0, True) == 0: priority += 1
+    assert priority >= broker.burst * RATE_LIMIT_RESERVE - 1
+    assert tokens(broker) < 1.0
+
+
+def test_process_over_its_share_yields_to_others(make_broker):
+    busy = make_broker()
+    quiet = make_broker(pid=os.getpid() + 1_000_000)
+    assert quiet._try_acquire(1.0, False) == 0 # Registers as active
+    while busy._try_acquire(1.0, False) == 0: pass
+    assert busy.active == 2
+    assert tokens(busy) < busy.burst / 2
+    assert quiet._try_acquire(1.0, False) == 0 # Still under its share
+
+
+def test_full_table_takes_over_oldest_slot_and_keeps_its_usage(make_broker):
+    first = make_broker()
+    first._try_acquire(1.0, False)
+    mm = first._mm
+    for i in range(RATE_LIMIT_SLOTS):
+        SLOT.pack_into(mm, HEADER.size + i * SLOT.size, 10_000_000 + i, 1e12, 3.0) # All live
+    SLOT.pack_into(mm, HEADER.size + 5 * SLOT.size, 10_000_005, 1e12 - 1, 7.0) # Least recently seen
+
+    late = make_broker(pid=20_000_000)
+    assert late._find_slot(1e12 + 10) == 5
+    pid, seen, used = SLOT.unpack_from(mm, HEADER.size + 5 * SLOT.size)
+    assert (pid, used) == (20_000_000, 7.0)
+    assert SLOT.unpack_from(mm, HEADER.size)[0] == 10_000_000 # Slot 0 untouched
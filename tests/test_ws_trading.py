@@ -0,0 +1,206 @@
+import asyncio
+import json
+import time
+from collections import OrderedDict
+
+import pytest
+import websockets
+
+from app import ws_trading
+from app.ws_trading import WsOrderGateway, WsTransportError, WsOrderTimeout, WsApiError
+
+
+class StandIn:
+    """Local stand-in for Gate's futures WS API: logs in, then hands each request to a per-channel script."""
+
+    def __init__(self, scripts=None):
+        self.scripts = scripts or {}
+        self.requests = []
+        self.logins = 0
+
+    async def handler(self, websocket):
+        async for message in websocket:
+            req = json.loads(message)
+            payload = req["payload"]
+            if req["channel"] == "futures.login":
+                assert payload["api_key"] == "key" and payload["signature"]
+                self.logins += 1
+                await websocket.send(json.dumps(ok(payload["req_id"], {"uid": "1"})))
+                continue
+            self.requests.append(req)
+            script = self.scripts.get(req["channel"], reply_ok)
+            await script(websocket, payload, self)
+
+
+def ack(req_id):
+    return {"request_id": req_id, "ack": True, "header": {"status": "200"}}
+
+
+def ok(req_id, result):
+    return {"request_id": req_id, "header": {"status": "200"}, "data": {"result": result}}
+
+
+async def reply_ok(websocket, payload, server):
+    await websocket.send(json.dumps(ack(payload["req_id"])))
+    await websocket.send(json.dumps(ok(payload["req_id"], {"id": payload["req_param"].get("text", "1")})))
+
+
+def run_with_gateway(server, body):
+    """Starts the stand-in and a logged-in gateway, runs body(gateway), tears both down."""
+    async def main():
+        async with websockets.serve(server.handler, "127.0.0.1", 0) as srv:
+            port = srv.sockets[0].getsockname()[1]
+            gateway = WsOrderGateway(f"ws://127.0.0.1:{port}", "key", "secret")
+            task = asyncio.create_task(gateway.run())
+            try:
+                for _ in range(200):
+                    if gateway.ready: break
+                    await asyncio.sleep(0.01)
+                return await body(gateway)
+            finally:
+                task.cancel()
+    return asyncio.run(main())
+
+
+@pytest.fixture
+def short_timeouts(monkeypatch):
+    monkeypatch.setattr(ws_trading, "WS_API_ACK_TIMEOUT", 0.2)
+    monkeypatch.setattr(ws_trading, "WS_API_TIMEOUT", 0.3)
+
+
+def test_login_then_place():
+    server = StandIn()
+
+    async def body(gateway):
+        assert gateway.ready
+        return await gateway.place_order({"contract": "XRP_USDT", "size": 1, "price": "1.0", "text": "t-a"})
+
+    assert run_with_gateway(server, body) == {"id": "t-a"}
+    assert server.logins == 1
+    assert server.requests[0]["channel"] == "futures.order_place"
+
+
+def test_results_are_matched_by_request_id_out_of_order():
+    held = []
+
+    async def reply_reversed(websocket, payload, server):
+        await websocket.send(json.dumps(ack(payload["req_id"])))
+        held.append(payload)
+        if len(held) == 2:
+            for p in reversed(held):
+                await websocket.send(json.dumps(ok(p["req_id"], {"id": p["req_param"]["text"]})))
+
+    async def body(gateway):
+        return await asyncio.gather(
+            gateway.place_order({"contract": "XRP_USDT", "size": 1, "price": "1.0", "text": "t-first"}),
+            gateway.place_order({"contract": "XRP_USDT", "size": -1, "price": "1.1", "text": "t-second"}))
+
+    first, second = run_with_gateway(StandIn({"futures.order_place": reply_reversed}), body)
+    assert first == {"id": "t-first"} and second == {"id": "t-second"}
+
+
+@pytest.mark.parametrize("send_ack", [False, True])
+def test_missing_ack_or_result_times_out(short_timeouts, send_ack):
+    async def silent(websocket, payload, server):
+        if send_ack: await websocket.send(json.dumps(ack(payload["req_id"])))
+
+    async def body(gateway):
+        with pytest.raises(WsOrderTimeout):
+            await gateway.place_order({"contract": "XRP_USDT", "size": 1, "price": "1.0"})
+        return gateway.timeouts
+
+    assert run_with_gateway(StandIn({"futures.order_place": silent}), body) == 1
+
+
+def test_error_header_maps_to_api_error():
+    async def reject(websocket, payload, server):
+        await websocket.send(json.dumps(ack(payload["req_id"])))
+        await websocket.send(json.dumps({"request_id": payload["req_id"], "header": {"status": "400"},
+                                         "data": {"errs": {"label": "INSUFFICIENT_AVAILABLE", "message": "no margin"}}}))
+
+    async def body(gateway):
+        with pytest.raises(WsApiError) as err:
+            await gateway.place_order({"contract": "XRP_USDT", "size": 1, "price": "1.0"})
+        return err.value.label, gateway.rejected
+
+    assert run_with_gateway(StandIn({"futures.order_place": reject}), body) == ("INSUFFICIENT_AVAILABLE", 1)
+
+
+def test_pending_request_fails_on_disconnect():
+    async def drop(websocket, payload, server):
+        await websocket.send(json.dumps(ack(payload["req_id"])))
+        await websocket.close()
+
+    async def body(gateway):
+        started = time.monotonic()
+        with pytest.raises(WsOrderTimeout):
+            await gateway.place_order({"contract": "XRP_USDT", "size": 1, "price": "1.0"})
+        return time.monotonic() - started
+
+    assert run_with_gateway(StandIn({"futures.order_place": drop}), body) < ws_trading.WS_API_TIMEOUT
+
+
+def test_not_connected_raises_transport_error():
+    gateway = WsOrderGateway("ws://127.0.0.1:9", "key", "secret")
+    with pytest.raises(WsTransportError):
+        asyncio.run(gateway.place_order({"contract": "XRP_USDT", "size": 1, "price": "1.0"}))
+
+
+# ---------- GridTradingBot._send_order: REST only when the WS request never left ----------
+class FakeExchange:
+    def __init__(self):
+        self.orders = []
+
+    async def create_order(self, symbol, type, side, amount, price, params):
+        self.orders.append((side, amount, price, params))
+        return {"id": "rest-1"}
+
+
+def make_bot(gateway):
+    from app.bot import GridTradingBot
+    bot = GridTradingBot.__new__(GridTradingBot)
+    bot.ws_orders = gateway
+    bot.exchange = FakeExchange()
+    bot.contract_rules = None
+    bot.ws_symbol = "XRP_USDT"
+    bot.ccxt_symbol = "XRP/USDT:USDT"
+    bot.price_precision = 4
+    bot.order_reduce_only = OrderedDict()
+    return bot
+
+
+@pytest.mark.parametrize("script, rest_calls", [
+    (None, 0),                                                  # WS ok
+    ("reject", 0),                                              # WsApiError: the exchange said no
+    ("silent", 0),                                              # WsOrderTimeout: outcome unknown
+])
+def test_send_order_stays_on_ws_unless_transport_fails(short_timeouts, script, rest_calls):
+    async def reject(websocket, payload, server):
+        await websocket.send(json.dumps({"request_id": payload["req_id"], "header": {"status": "400"},
+                                         "data": {"errs": {"label": "ORDER_POC_IMMEDIATE", "message": ""}}}))
+
+    async def silent(websocket, payload, server):
+        await websocket.send(json.dumps(ack(payload["req_id"])))
+
+    scripts = {"futures.order_place": {"reject": reject, "silent": silent}[script]} if script else {}
+
+    async def body(gateway):
+        bot = make_bot(gateway)
+        await bot._send_order('buy', 1.0, 1, False, 'long')
+        return bot
+
+    bot = run_with_gateway(StandIn(scripts), body)
+    assert len(bot.exchange.orders) == rest_calls
+
+
+def test_send_order_falls_back_to_rest_on_transport_error():
+    class Down:
+        ready = True
+
+        async def place_order(self, order):
+            raise WsTransportError("send failed")
+
+    bot = make_bot(Down())
+    asyncio.run(bot._send_order('sell', 1.1, 2, True, 'long'))
+    assert bot.exchange.orders == [('sell', 2, 1.1, {'reduce_only': True, 'positionSide': 'long'})]
+    assert bot.order_reduce_only["rest-1"] is True